@@ -1,39 +1,36 @@
 #main.py
-from typing import Callable, Optional, Any
+import argparse
+import os
+from typing import Callable, Optional, Any, List, Tuple
 from datetime import datetime, timedelta
 
-from modules.edinet.operations import EDINETOperations
+from modules.app_context import AppContext
 from modules.edinet.config import EDINETConfig
+from modules.edinet.operations import EDINETOperations
 from modules.spreadsheet_to_edinet import process_spreadsheet_data
-from utils.spreadsheet import SpreadsheetService
 from utils.environment import EnvironmentUtils as env
 from utils.date_utils import parse_date_string
 from utils.logging_config import get_logger
+from utils.quota import get_quota_manager
+from utils.run_log_store import RunLogStore
 
 # 名前付きロガーを取得
 logger = get_logger(__name__)
 
-def run_process(process_func: Callable, config: Optional[Any] = None) -> None:
+def run_process(process_func: Callable, config: Optional[Any] = None, **kwargs: Any) -> None:
     """汎用プロセス実行関数"""
     try:
         logger.info(f"Starting process: {process_func.__name__}")
-        process_func(config)
+        process_func(config, **kwargs)
         logger.info(f"Process {process_func.__name__} completed successfully.")
     except Exception as e:
         logger.error(f"Error in {process_func.__name__}: {e}", exc_info=True)
         raise RuntimeError(f"Process {process_func.__name__} failed.") from e
 
-def edinet_process(config: EDINETConfig) -> None:
+def get_date_range() -> Tuple[datetime, datetime]:
     """
-    EDINET API を使用して指定された期間内のドキュメントを取得
+    settings.ini の DATE_RANGE から対象期間を取得
     """
-    edinet = EDINETOperations(
-        base_url=config.base_url,
-        api_key=config.api_key,
-        parent_folder_id=config.parent_folder_id,
-        service_account_file=config.service_account_file,
-    )
-
     start_date_str = env.get_config_value("DATE_RANGE", "start_date")
     end_date_str = env.get_config_value("DATE_RANGE", "end_date")
 
@@ -41,23 +38,21 @@ def edinet_process(config: EDINETConfig) -> None:
         raise ValueError("DATE_RANGE section or required keys are missing in the settings.ini file.")
 
     # 動的な日付解析
-    start_date = parse_date_string(start_date_str)
-    end_date = parse_date_string(end_date_str)
-    
-    logger.debug(f"Fetching documents from {start_date} to {end_date}")
+    return parse_date_string(start_date_str), parse_date_string(end_date_str)
 
-    spreadsheet_service = SpreadsheetService()
-    spreadsheet_id = spreadsheet_service.get_spreadsheet_id("SPREADSHEET", "ss_id_list")
-    list_data = spreadsheet_service.get_sheet_data(spreadsheet_id, "list")
+def edinet_process(config: EDINETConfig, context: Optional[AppContext] = None) -> None:
+    """
+    EDINET API を使用して指定された期間内のドキュメントを取得
+    """
+    if context is None:
+        context = AppContext(config)
+    edinet = context.edinet_operations
 
-    if not list_data or len(list_data) < 2:
-        logger.error("Spreadsheet data is empty or invalid format.")
-        raise ValueError("Spreadsheet data is empty or invalid format.")
+    start_date, end_date = get_date_range()
+    
+    logger.debug(f"Fetching documents from {start_date} to {end_date}")
 
-    headers = list_data[0]
-    data_rows = list_data[1:]
-    edinet_code_index = headers.index("EDINET_code")
-    edinet_codes_from_sheet = [row[edinet_code_index] for row in data_rows]
+    edinet_codes_from_sheet = context.list_snapshot.edinet_codes
 
     logger.info(f"Edinet codes retrieved from spreadsheet.")
 
@@ -71,8 +66,105 @@ def edinet_process(config: EDINETConfig) -> None:
     for document in documents:
         logger.debug(f"Retrieved Document - ID: {document.get('docID')}, Description: {document.get('docDescription')}")
 
-def main() -> None:
+def list_filings(config: EDINETConfig, context: Optional[AppContext] = None, dry_run: bool = False) -> None:
+    """
+    処理対象（check 列が TRUE で IR ページ URL がある行）の提出書類を一覧表示する。
+    PDF の取得、Drive へのアップロード、要約、Slack 通知は行わない。
+
+    Args:
+        config (EDINETConfig): EDINETの設定
+        context (AppContext, optional): 実行中に共有するリソース
+        dry_run (bool): True の場合、log シートを参照して処理済みかどうかも表示する
+    """
+    if context is None:
+        context = AppContext(config)
+
+    start_date, end_date = get_date_range()
+    rows = {row.edinet_code: row for row in context.list_snapshot.checked_rows() if row.ir_page_url}
+
+    documents = context.edinet_operations.get_documents_for_date_range(
+        start_date=start_date,
+        end_date=end_date,
+        edinet_codes_from_sheet=list(rows)
+    )
+
+    run_log_store = None
+    if dry_run:
+        # log シートは読み込みのみ行い、ローカルのログストアをメモリ上に複製したものに取り込んで判定する
+        # （ローカルのデータベースには書き込まない）
+        run_log_store = RunLogStore.snapshot()
+        run_log_store.import_sheet_rows(
+            context.spreadsheet_service.get_sheet_data(context.spreadsheet_id, "log")
+        )
+
+    documents.sort(key=lambda document: (document.get("submitDateTime") or "", document.get("docID") or ""))
+    for document in documents:
+        row = rows.get(document.get("edinetCode"))
+        doc_id = document.get("docID")
+        columns = [
+            (document.get("submitDateTime") or "").split(" ")[0],
+            document.get("edinetCode") or "",
+            row.corp_name if row else "",
+            EDINETOperations.TARGET_DOC_TYPES.get(document.get("docTypeCode"), "不明"),
+            doc_id or "",
+        ]
+        if run_log_store is not None:
+            columns.append("processed" if run_log_store.is_processed(doc_id) else "new")
+        print("\t".join(columns))
+    if run_log_store is not None:
+        run_log_store.close()
+
+    print(f"{len(documents)} filings between {start_date:%Y-%m-%d} and {end_date:%Y-%m-%d}")
+
+def prefetch_assets_command() -> None:
+    """
+    要約処理で使用するアセット（tiktoken のエンコーディング、センテンスエンベディングモデル）をダウンロードする
+    """
+    from modules.pdfSummary.assets import prefetch_assets
+
+    asset_dir = prefetch_assets([env.get_openai_model()])
+    print(f"Assets saved to: {asset_dir}")
+
+def ledger_report_command() -> None:
+    """
+    レジャーに記録した最新の実行のレポート（文書ごとのトークン数・費用・処理時間）を表示する
+    """
+    from utils.ledger import RunLedger
+
+    ledger = RunLedger()
+    print(ledger.report(ledger.latest_run_id()))
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description="EDINET の提出書類を取得・要約して Slack に通知します。")
+    parser.add_argument("command", nargs="?", choices=["run", "prefetch-assets", "ledger-report"], default="run",
+                        help="run: 通常実行（デフォルト） / prefetch-assets: トークナイザーと埋め込みモデルをアセットディレクトリにダウンロード"
+                             " / ledger-report: 最新の実行の文書ごとのトークン数・費用・処理時間を表示")
+    parser.add_argument("--env", choices=["development", "production"],
+                        help="実行環境（APP_ENV を上書きします）")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--list-only", action="store_true",
+                      help="対象の提出書類を一覧表示のみ行います（要約・アップロード・通知なし）")
+    mode.add_argument("--dry-run", action="store_true",
+                      help="--list-only に加えて、log シートを参照して処理済みかどうかを表示します")
+    mode.add_argument("--batch", action="store_true",
+                      help="過去分の取り込み用に、全文書のアップロード後に OpenAI の Batch API でまとめて要約します"
+                           "（中断した場合は再実行でポーリングを再開します）")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
     """メイン処理"""
+    args = parse_args(argv)
+    if args.env:
+        os.environ["APP_ENV"] = args.env
+
+    if args.command == "prefetch-assets":
+        prefetch_assets_command()
+        return
+    if args.command == "ledger-report":
+        ledger_report_command()
+        return
+
     try:
         # 環境変数のロード
         env.load_env()
@@ -87,12 +179,30 @@ def main() -> None:
 
         logger.info(f"Current environment: {env.get_environment()}")
 
+        # 長寿命のリソース（各種クライアント、list シート）は実行中に1度だけ生成し、全ステージで共有する
+        context = AppContext(edinet_config)
+
+        if args.list_only or args.dry_run:
+            list_filings(edinet_config, context, dry_run=args.dry_run)
+            return
+
+        # オフラインモードではアセットの不足を処理開始前に検出する
+        from modules.pdfSummary.assets import is_offline, verify_assets, get_sentence_model_name
+        from modules.pdfSummary.tokenizer import get_chunking_mode
+        if is_offline():
+            # センテンスエンベディングモデルは semantic モードでのみ使用する
+            sentence_models = [get_sentence_model_name()] if get_chunking_mode() == "semantic" else []
+            verify_assets([env.get_openai_model()], sentence_models)
+
         # 各プロセスの実行
-        run_process(edinet_process, edinet_config)
-        run_process(process_spreadsheet_data, edinet_config)
+        run_process(edinet_process, edinet_config, context=context)
+        run_process(process_spreadsheet_data, edinet_config, context=context, batch=args.batch)
 
     except Exception as e:
         logger.error(f"Fatal error in main execution: {e}", exc_info=True)
+    finally:
+        # Google API の呼び出し回数を出力
+        get_quota_manager().log_summary()
 
 if __name__ == "__main__":
     main()
@@ -1,3 +1,10 @@
 # src/modules/__init__.py
-from . import pdfSummary
-from . import edinet
\ No newline at end of file
+# サブパッケージは重い依存関係（torch、openai など）を含むため、初回アクセス時に読み込む
+import importlib
+
+__all__ = ["pdfSummary", "edinet"]
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,86 @@
+# src/modules/app_context.py
+
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from modules.edinet.config import EDINETConfig
+from modules.edinet.operations import EDINETOperations
+from utils.drive_handler import DriveHandler
+from utils.ledger import RunLedger
+from utils.list_sheet import ListSheetSnapshot
+from utils.run_log_store import RunLogStore
+from utils.spreadsheet import SpreadsheetService
+from utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from modules.pdfSummary.pdf_main import SummarizationResources
+    from modules.slack.slack_notify import SlackNotifier
+
+logger = get_logger(__name__)
+
+class AppContext:
+    """
+    1回の実行で使用する長寿命のリソースを保持するコンテキスト。
+    main() で生成して各ステージに渡し、各クライアントは初回アクセス時に1度だけ生成します。
+    Slack や要約処理の重い依存関係は、そのリソースに初めてアクセスしたときにインポートします。
+    """
+
+    def __init__(self, config: EDINETConfig):
+        """
+        Args:
+            config (EDINETConfig): EDINETの設定
+        """
+        self.config = config
+
+    @cached_property
+    def spreadsheet_service(self) -> SpreadsheetService:
+        """Google Sheets API のサービス"""
+        return SpreadsheetService()
+
+    @cached_property
+    def spreadsheet_id(self) -> str:
+        """list / log シートを含むスプレッドシートのID"""
+        return self.spreadsheet_service.get_spreadsheet_id("SPREADSHEET", "ss_id_list")
+
+    @cached_property
+    def list_snapshot(self) -> ListSheetSnapshot:
+        """実行中に1度だけ取得する list シートのスナップショット"""
+        return ListSheetSnapshot.load(self.spreadsheet_service, self.spreadsheet_id)
+
+    @cached_property
+    def drive_handler(self) -> DriveHandler:
+        """Google Drive API のハンドラー"""
+        return DriveHandler(str(self.config.service_account_file))
+
+    @cached_property
+    def edinet_operations(self) -> EDINETOperations:
+        """EDINET API の操作クラス"""
+        return EDINETOperations(
+            base_url=self.config.base_url,
+            api_key=self.config.api_key,
+            parent_folder_id=self.config.parent_folder_id,
+            service_account_file=self.config.service_account_file,
+        )
+
+    @cached_property
+    def slack_notifier(self) -> "SlackNotifier":
+        """Slack 通知クライアント"""
+        from modules.slack.slack_notify import SlackNotifier
+        return SlackNotifier(env_path="config/secrets.env")
+
+    @cached_property
+    def run_log_store(self) -> RunLogStore:
+        """処理済みドキュメントのローカルログ"""
+        return RunLogStore()
+
+    @cached_property
+    def ledger(self) -> RunLedger:
+        """文書ごとのトークン数・費用・処理時間のレジャー"""
+        return RunLedger()
+
+    @cached_property
+    def summarization(self) -> "SummarizationResources":
+        """要約処理のリソース（プロンプト、Tokenizer、Summarizer）"""
+        from modules.pdfSummary.pdf_main import SummarizationResources
+        logger.info("要約処理のリソースを初期化します。")
+        return SummarizationResources.from_environment()
@@ -23,9 +23,12 @@ class EDINETOperations:
 
     def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, 
                  parent_folder_id: Optional[str] = None, service_account_file: Optional[str] = None, 
-                 max_workers: int = 10):
+                 max_workers: int = 10, drive_service=None):
         """
         EDINETOperations クラスの初期化
+
+        Args:
+            drive_service (optional): 既存の Google Drive API サービス。指定しない場合は新たに初期化します。
         """
         logger.info("EDINET Operations を初期化中...")
 
@@ -57,13 +60,19 @@ class EDINETOperations:
             logger.error(f"EDINETOperations の初期化に失敗しました: {e}")
             raise
 
-        # Google Drive APIを初期化
-        self.drive_service = None
-        self.initialize_drive_service()
+        # Google Drive APIは初回アクセス時に初期化（既存のサービスがあれば使用）
+        self._drive_service = drive_service
 
         # ThreadPoolExecutorの最大スレッド数
         self.max_workers = max_workers
 
+    @property
+    def drive_service(self):
+        """Google Drive APIサービス（初回アクセス時に初期化）"""
+        if self._drive_service is None:
+            self.initialize_drive_service()
+        return self._drive_service
+
     def initialize_drive_service(self):
         """Google Drive APIサービスの初期化"""
         try:
@@ -71,11 +80,11 @@ class EDINETOperations:
                 str(self.service_account_file),
                 scopes=['https://www.googleapis.com/auth/drive.file']
             )
-            self.drive_service = build('drive', 'v3', credentials=credentials)
+            self._drive_service = build('drive', 'v3', credentials=credentials)
             logger.info("Google Drive サービスを正常に初期化しました。")
         except Exception as e:
             logger.error(f"Drive サービスの初期化に失敗しました: {e}")
-            self.drive_service = None
+            self._drive_service = None
 
     def get_documents_for_date_range(self, start_date: datetime, end_date: datetime, edinet_codes_from_sheet: List[str]) -> List[Dict]:
         """
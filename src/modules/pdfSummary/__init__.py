@@ -1,6 +1,10 @@
- 
 # src/modules/pdfSummary/__init__.py
-from . import pdf_main
-from . import extractor
-from . import tokenizer
-from . import summarizer
\ No newline at end of file
+# 各モジュールは要約処理を実行するときにだけ読み込む（sentence_transformers / openai などの読み込みを遅延させる）
+import importlib
+
+__all__ = ["pdf_main", "extractor", "tokenizer", "summarizer"]
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
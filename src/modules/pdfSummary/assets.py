@@ -0,0 +1,234 @@
+# src/modules/pdfSummary/assets.py
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.environment import EnvironmentUtils as env
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+DEFAULT_SENTENCE_MODEL = "all-MiniLM-L6-v2"
+
+# プロセス内で共有するセンテンスエンベディングモデル（モデル名ごとに1度だけ読み込む）
+_sentence_models: Dict[str, Any] = {}
+_sentence_models_lock = threading.Lock()
+
+class AssetMissingError(RuntimeError):
+    """オフラインモードで必要なアセットがローカルに存在しない場合の例外"""
+
+def get_asset_dir() -> Path:
+    """
+    トークナイザーと埋め込みモデルを保存するローカルディレクトリを取得します。
+
+    Returns:
+        Path: アセットディレクトリの絶対パス
+    """
+    asset_dir = Path(env.get_config_value("ASSETS", "asset_dir", default="assets"))
+    if not asset_dir.is_absolute():
+        asset_dir = env.get_project_root() / asset_dir
+    return asset_dir
+
+def is_offline() -> bool:
+    """settings.ini の [ASSETS] offline が有効かどうかを返します。"""
+    return bool(env.get_config_value("ASSETS", "offline", default=False))
+
+def get_sentence_model_name() -> str:
+    """使用するセンテンスエンベディングモデル名を返します。"""
+    return env.get_config_value("ASSETS", "sentence_model", default=DEFAULT_SENTENCE_MODEL)
+
+def configure_asset_environment() -> Path:
+    """
+    tiktoken と Hugging Face がアセットディレクトリを参照するよう環境変数を設定します。
+    tiktoken / sentence_transformers がアセットを読み込む前に呼び出す必要があります。
+
+    Returns:
+        Path: アセットディレクトリの絶対パス
+    """
+    asset_dir = get_asset_dir()
+    os.environ["TIKTOKEN_CACHE_DIR"] = str(asset_dir / "tiktoken")
+    if is_offline():
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    return asset_dir
+
+def _sentence_model_path(asset_dir: Path, model_name: str) -> Path:
+    return asset_dir / "sentence_transformers" / model_name.replace("/", "__")
+
+def _read_manifest(asset_dir: Path) -> Dict:
+    manifest_path = asset_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        return {"tiktoken": {}, "sentence_transformers": []}
+    with open(manifest_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+def _write_manifest(asset_dir: Path, manifest: Dict) -> None:
+    asset_dir.mkdir(parents=True, exist_ok=True)
+    with open(asset_dir / MANIFEST_FILE, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+def verify_assets(models: List[str], sentence_models: Optional[List[str]] = None) -> None:
+    """
+    オフラインモードで必要なアセットが揃っているかを、ライブラリを読み込まずに確認します。
+
+    Args:
+        models (List[str]): tiktoken のエンコーディングが必要な OpenAI モデル名
+        sentence_models (Optional[List[str]]): 必要なセンテンスエンベディングモデル名
+
+    Raises:
+        AssetMissingError: アセットが不足している場合
+    """
+    asset_dir = get_asset_dir()
+    manifest = _read_manifest(asset_dir)
+    missing = [f"tiktoken:{model}" for model in models if model not in manifest.get("tiktoken", {})]
+    for model_name in sentence_models or []:
+        if not (_sentence_model_path(asset_dir, model_name) / "modules.json").exists():
+            missing.append(f"sentence_transformers:{model_name}")
+
+    if missing:
+        raise AssetMissingError(
+            f"オフラインモードで必要なアセットが {asset_dir} にありません: {', '.join(missing)}。"
+            " 'python src/main.py prefetch-assets' を実行してください。"
+        )
+
+def get_encoding(model: str):
+    """
+    OpenAI モデルに対応する tiktoken のエンコーディングをアセットディレクトリから読み込みます。
+
+    Args:
+        model (str): OpenAI モデル名
+
+    Returns:
+        tiktoken.Encoding: エンコーディング
+    """
+    configure_asset_environment()
+    if is_offline():
+        verify_assets([model])
+
+    import tiktoken
+    return tiktoken.encoding_for_model(model)
+
+def load_sentence_model(model_name: Optional[str] = None):
+    """
+    センテンスエンベディングモデルをアセットディレクトリから読み込みます。
+    ローカルにない場合、オンラインであればダウンロードしてアセットディレクトリに保存します。
+
+    Args:
+        model_name (Optional[str]): モデル名（デフォルトは [ASSETS] sentence_model）
+
+    Returns:
+        SentenceTransformer: 読み込んだモデル
+
+    Raises:
+        AssetMissingError: オフラインモードでモデルがローカルにない場合
+    """
+    model_name = model_name or get_sentence_model_name()
+    asset_dir = configure_asset_environment()
+    model_path = _sentence_model_path(asset_dir, model_name)
+
+    from sentence_transformers import SentenceTransformer
+
+    if (model_path / "modules.json").exists():
+        logger.info(f"センテンスエンベディングモデルをローカルから読み込みます: {model_path}")
+        return SentenceTransformer(str(model_path))
+
+    if is_offline():
+        verify_assets([], [model_name])
+
+    logger.info(f"センテンスエンベディングモデルをダウンロードします: {model_name}")
+    model = SentenceTransformer(model_name)
+    model.save(str(model_path))
+    manifest = _read_manifest(asset_dir)
+    if model_name not in manifest.setdefault("sentence_transformers", []):
+        manifest["sentence_transformers"].append(model_name)
+        _write_manifest(asset_dir, manifest)
+    return model
+
+def load_onnx_sentence_model(model_name: Optional[str] = None, quantization: str = "avx2"):
+    """
+    センテンスエンベディングモデルを、動的量子化した ONNX モデルとして読み込みます（CPU 専用のワーカー向け）。
+    量子化モデルがアセットディレクトリにない場合は、ローカルのモデルから書き出して保存します。
+    onnxruntime と optimum が必要です（pip install "sentence-transformers[onnx]"）。
+
+    Args:
+        model_name (Optional[str]): モデル名（デフォルトは [ASSETS] sentence_model）
+        quantization (str): 量子化の設定（avx2 / avx512 / avx512_vnni / arm64）
+
+    Returns:
+        SentenceTransformer: ONNX バックエンドで読み込んだモデル
+    """
+    model_name = model_name or get_sentence_model_name()
+    asset_dir = configure_asset_environment()
+    model_path = _sentence_model_path(asset_dir, model_name)
+    file_name = f"model_qint8_{quantization}.onnx"
+
+    if not (model_path / "modules.json").exists():
+        # PyTorch 版のモデルをアセットディレクトリに保存してから書き出す
+        load_sentence_model(model_name)
+
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    quantized_path = model_path / "onnx" / file_name
+    if not quantized_path.exists():
+        if is_offline():
+            raise AssetMissingError(
+                f"オフラインモードで量子化 ONNX モデルが {quantized_path} にありません。"
+                " オンラインの環境で一度実行して書き出してください。"
+            )
+        logger.info(f"量子化 ONNX モデルを書き出します: {quantized_path}")
+        export_dynamic_quantized_onnx_model(SentenceTransformer(str(model_path), backend="onnx"), quantization, str(model_path))
+
+    logger.info(f"量子化 ONNX モデルを読み込みます: {quantized_path}")
+    return SentenceTransformer(str(model_path), backend="onnx", model_kwargs={"file_name": f"onnx/{file_name}"})
+
+def get_sentence_model(model_name: Optional[str] = None):
+    """
+    プロセス内で共有するセンテンスエンベディングモデルを返します。
+    初回呼び出し時にのみ load_sentence_model() で読み込み、以降は同じインスタンスを返します。
+
+    Args:
+        model_name (Optional[str]): モデル名（デフォルトは [ASSETS] sentence_model）
+
+    Returns:
+        SentenceTransformer: 読み込んだモデル
+    """
+    model_name = model_name or get_sentence_model_name()
+    with _sentence_models_lock:
+        if model_name not in _sentence_models:
+            _sentence_models[model_name] = load_sentence_model(model_name)
+        return _sentence_models[model_name]
+
+def prefetch_assets(models: List[str], sentence_models: Optional[List[str]] = None) -> Path:
+    """
+    tiktoken のエンコーディングとセンテンスエンベディングモデルをアセットディレクトリにダウンロードします。
+
+    Args:
+        models (List[str]): OpenAI モデル名
+        sentence_models (Optional[List[str]]): センテンスエンベディングモデル名（デフォルトは [ASSETS] sentence_model）
+
+    Returns:
+        Path: アセットディレクトリの絶対パス
+    """
+    asset_dir = configure_asset_environment()
+    (asset_dir / "tiktoken").mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(asset_dir)
+
+    import tiktoken
+    from tiktoken.model import encoding_name_for_model
+
+    for model in models:
+        encoding_name = encoding_name_for_model(model)
+        tiktoken.get_encoding(encoding_name)
+        manifest.setdefault("tiktoken", {})[model] = encoding_name
+        logger.info(f"tiktoken のエンコーディングを保存しました: {model} ({encoding_name})")
+    _write_manifest(asset_dir, manifest)
+
+    for model_name in sentence_models or [get_sentence_model_name()]:
+        load_sentence_model(model_name)
+        logger.info(f"センテンスエンベディングモデルを保存しました: {model_name}")
+
+    return asset_dir
@@ -0,0 +1,364 @@
+# src/modules/pdfSummary/batch.py
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from utils.environment import EnvironmentUtils as env
+from utils.drive_handler import DriveHandler
+from utils.ledger import RunLedger, current_document, record_request, stage
+from utils.logging_config import get_logger
+from .llm_engine import SummaryEngine, create_openai_client
+from .pdf_main import SummarizationResources, prepare_document, save_summary
+from .response_cache import ResponseCache
+from .summarizer import Summarizer
+
+logger = get_logger(__name__)
+
+# バッチの終了状態
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+# 実行中の要約のコルーチンがどの文書のものか（gather の子タスクにも引き継がれる）
+_current_document: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("batch_document", default=None)
+
+class BatchState:
+    """
+    バッチモードの再開用の状態ファイル（JSON）。
+    Drive にアップロード済みで要約待ちの文書と、送信済みで完了を待っているバッチを保持します。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path (Optional[Path]): 状態ファイルのパス（デフォルトは [BATCH] state_path）
+        """
+        if path is None:
+            path = Path(env.get_config_value("BATCH", "state_path", default="data/batch/state.json"))
+            if not path.is_absolute():
+                path = env.get_project_root() / path
+        self.path = Path(path)
+        data = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        self.documents: Dict[str, Dict[str, Any]] = data.get("documents", {})
+        self.batch: Optional[Dict[str, Any]] = data.get("batch")
+
+    def save(self) -> None:
+        """状態を一時ファイルに書き込んでから置き換えます（書き込み中に中断しても壊れない）。"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump({"documents": self.documents, "batch": self.batch}, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def add_document(self, doc_id: str, record: Dict[str, Any]) -> None:
+        """要約待ちの文書を追加します。"""
+        self.documents[doc_id] = record
+        self.save()
+
+    def remove_document(self, doc_id: str) -> None:
+        """処理が完了した文書を削除します。"""
+        if self.documents.pop(doc_id, None) is not None:
+            self.save()
+
+class BatchEngine(SummaryEngine):
+    """
+    要約のリクエストを即時に送信せず、OpenAI の Batch API でまとめて送信するエンジン。
+    summarize_all() で全文書の要約のコルーチンを並行に実行し、すべての文書が応答待ちになった時点で
+    待っているリクエストを1つの JSONL のバッチとして送信し、完了をポーリングして結果を返します。
+    map-reduce の要約は、部分要約のバッチ、再要約のバッチと段階ごとにバッチを送信します。
+    完了したバッチの結果は応答キャッシュに保存し、送信済みのバッチは状態ファイルに記録するため、
+    ポーリング中に中断しても、再実行時は完了済みの段階をキャッシュから再現し、同じバッチのポーリングを再開します。
+    """
+
+    def __init__(self, client, cache: ResponseCache, state: BatchState, input_dir: Optional[Path] = None,
+                 poll_interval: Optional[float] = None, completion_window: Optional[str] = None):
+        """
+        Args:
+            client: AsyncOpenAI のクライアント（files / batches を使用）
+            cache (ResponseCache): 完了したリクエストの応答を保存するキャッシュ
+            state (BatchState): 再開用の状態ファイル
+            input_dir (Optional[Path]): 送信する JSONL の保存先（デフォルトは状態ファイルと同じディレクトリ）
+            poll_interval (Optional[float]): バッチの状態を確認する間隔（秒、デフォルトは [BATCH] poll_interval_seconds）
+            completion_window (Optional[str]): バッチの完了期限（デフォルトは [BATCH] completion_window）
+        """
+        super().__init__(client, cache=cache)
+        self.state = state
+        self.input_dir = Path(input_dir) if input_dir else state.path.parent
+        self.poll_interval = poll_interval if poll_interval is not None else \
+            env.get_config_value("BATCH", "poll_interval_seconds", default=60)
+        self.completion_window = completion_window or env.get_config_value("BATCH", "completion_window", default="24h")
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._waiting: Dict[str, int] = {}
+        self.stats = {"batches": 0, "requests": 0}
+
+    async def complete(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                       temperature: float = 0.7, input_tokens: Optional[int] = None) -> str:
+        """
+        リクエストを次のバッチに追加し、バッチの完了後に応答のテキストを返します（キャッシュ済みの場合はすぐに返す）。
+        """
+        key = ResponseCache.make_key(model, messages, temperature, max_tokens)
+        cached = self.cache.get(key)
+        if cached is not None:
+            record_request(model, source="cache")
+            return cached
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = {
+                "future": asyncio.get_running_loop().create_future(),
+                "body": {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature},
+                # 結果はバッチの回収時に受け取るため、レジャーの記録先をここで保持する
+                "document": current_document(),
+            }
+            self._pending[key] = pending
+
+        document = _current_document.get()
+        self._waiting[document] = self._waiting.get(document, 0) + 1
+        try:
+            return await pending["future"]
+        finally:
+            self._waiting[document] -= 1
+
+    async def gather(self, coroutines: List[Awaitable], limit: Optional[int] = None) -> List[Any]:
+        """バッチではまとめて送信するほど段階が減るため、同時実行数の制限は行いません。"""
+        return list(await asyncio.gather(*coroutines))
+
+    async def map(self, func: Callable[[Any], Awaitable], items: Iterable, limit: Optional[int] = None) -> List[Any]:
+        """すべての要素を取り出してから、同時実行数を制限せずに実行します（1つのバッチにまとめるため）。"""
+        items = await asyncio.to_thread(list, items)
+        return await self.gather([func(item) for item in items])
+
+    def summarize_all(self, summarize: Dict[str, Callable[[], Awaitable[str]]]) -> Dict[str, Any]:
+        """
+        複数の文書の要約をバッチで実行します。
+
+        Args:
+            summarize (Dict[str, Callable[[], Awaitable[str]]]): doc_id と要約のコルーチンを返す関数の対応
+
+        Returns:
+            Dict[str, Any]: doc_id と要約（失敗した文書は例外）の対応
+        """
+        return self.run(self._summarize_all(summarize))
+
+    async def _summarize_all(self, summarize: Dict[str, Callable[[], Awaitable[str]]]) -> Dict[str, Any]:
+        async def run_document(doc_id, factory):
+            _current_document.set(doc_id)
+            return await factory()
+
+        tasks = {doc_id: asyncio.create_task(run_document(doc_id, factory)) for doc_id, factory in summarize.items()}
+        try:
+            while True:
+                unfinished = await self._wait_until_blocked(tasks)
+                if not unfinished:
+                    break
+                await self._flush()
+        except BaseException:
+            # 中断した場合、送信済みのバッチは状態ファイルに残し、次回の実行で再開する
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            self._pending.clear()
+            raise
+
+        results = {}
+        for doc_id, task in tasks.items():
+            try:
+                results[doc_id] = task.result()
+            except Exception as e:
+                results[doc_id] = e
+        return results
+
+    async def _wait_until_blocked(self, tasks: Dict[str, asyncio.Task]) -> List[str]:
+        """
+        未完了の文書がすべて応答待ちになるまで待ち、未完了の doc_id を返します。
+        gather の子タスクがリクエストを追加し終えるまで、続けて2回確認します。
+        """
+        confirmed = 0
+        while True:
+            unfinished = [doc_id for doc_id, task in tasks.items() if not task.done()]
+            if all(self._waiting.get(doc_id, 0) > 0 for doc_id in unfinished):
+                confirmed += 1
+                if confirmed >= 2 or not unfinished:
+                    return unfinished
+            else:
+                confirmed = 0
+            await asyncio.sleep(0.01)
+
+    async def _flush(self) -> None:
+        """待っているリクエストをバッチで送信し（送信済みのバッチがあればそのポーリングを再開）、結果を返します。"""
+        if not self._pending:
+            return
+        batch = self.state.batch
+        if batch is None or not set(batch["custom_ids"]) & set(self._pending):
+            batch = await self._submit(list(self._pending))
+        else:
+            logger.info(f"送信済みのバッチ {batch['id']} のポーリングを再開します。")
+
+        status = await self._poll(batch["id"])
+        await self._collect(batch, status)
+        self.state.batch = None
+        self.state.save()
+
+    async def _submit(self, keys: List[str]) -> Dict[str, Any]:
+        """リクエストを JSONL に書き出してアップロードし、バッチを作成します。"""
+        self.input_dir.mkdir(parents=True, exist_ok=True)
+        input_path = self.input_dir / f"batch_{time.time_ns()}.jsonl"
+        with open(input_path, "w", encoding="utf-8") as file:
+            for key in keys:
+                line = {"custom_id": key, "method": "POST", "url": "/v1/chat/completions",
+                        "body": self._pending[key]["body"]}
+                file.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+        with open(input_path, "rb") as file:
+            input_file = await self.client.files.create(file=file, purpose="batch")
+        created = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        batch = {"id": created.id, "input_file_id": input_file.id, "custom_ids": keys, "created_at": time.time()}
+        # ポーリング中に中断しても同じバッチを再開できるよう、送信直後に記録する
+        self.state.batch = batch
+        self.state.save()
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(keys)
+        logger.info(f"{len(keys)} 件のリクエストをバッチ {created.id} として送信しました（{input_path}）。")
+        return batch
+
+    async def _poll(self, batch_id: str):
+        """バッチが終了状態になるまで状態を確認します。"""
+        while True:
+            status = await self.client.batches.retrieve(batch_id)
+            counts = status.request_counts
+            if counts is not None:
+                logger.info(f"バッチ {batch_id}: {status.status}（完了 {counts.completed}/{counts.total}、失敗 {counts.failed}）")
+            if status.status in TERMINAL_BATCH_STATUSES:
+                return status
+            await asyncio.sleep(self.poll_interval)
+
+    async def _collect(self, batch: Dict[str, Any], status) -> None:
+        """バッチの出力を応答キャッシュに保存し、待っているリクエストに結果を返します。"""
+        errors: Dict[str, str] = {}
+        for file_id in (status.output_file_id, status.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                key = item["custom_id"]
+                response = item.get("response") or {}
+                if response.get("status_code") == 200:
+                    body = response["body"]
+                    text = body["choices"][0]["message"]["content"].strip()
+                    self.cache.put(key, body.get("model", ""), text)
+                    if key in self._pending:
+                        record_request(self._pending[key]["body"]["model"], body.get("usage"), source="batch",
+                                       document=self._pending[key]["document"])
+                    self._resolve(key, result=text)
+                else:
+                    errors[key] = json.dumps(item.get("error") or response.get("body"), ensure_ascii=False)
+
+        for key in batch["custom_ids"]:
+            if key not in self._pending:
+                continue
+            message = errors.get(key) or f"バッチ {batch['id']} が {status.status} で終了し、応答がありません。"
+            self._resolve(key, error=RuntimeError(message))
+
+    def _resolve(self, key: str, result: Optional[str] = None, error: Optional[Exception] = None) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None or pending["future"].done():
+            return
+        if error is not None:
+            pending["future"].set_exception(error)
+        else:
+            pending["future"].set_result(result)
+
+    def log_summary(self) -> None:
+        """送信したバッチ数とリクエスト数を出力します。"""
+        logger.info(f"バッチモード: バッチ {self.stats['batches']} 件、リクエスト {self.stats['requests']} 件を送信しました。")
+
+def create_batch_engine(state: Optional[BatchState] = None) -> BatchEngine:
+    """
+    settings.ini の [OPENAI] base_url / [BATCH] の設定でバッチ用のエンジンを生成します。
+    応答キャッシュは中断からの再開に使用するため、[OPENAI] response_cache の設定にかかわらず有効にします。
+    """
+    return BatchEngine(create_openai_client(), ResponseCache(), state or BatchState())
+
+def process_pdfs_in_batch(documents: Dict[str, Dict[str, Any]], drive_handler: DriveHandler,
+                          summarization: SummarizationResources, engine: Optional[BatchEngine] = None,
+                          ledger: Optional[RunLedger] = None) -> Dict[str, List[str]]:
+    """
+    Drive にアップロード済みの複数の PDF をバッチで要約し、要約を Google Drive に保存します。
+
+    Args:
+        documents (Dict[str, Dict[str, Any]]): doc_id と文書の情報（file_id、folder_id を含む）の対応
+        drive_handler (DriveHandler): DriveHandler インスタンス
+        summarization (SummarizationResources): 要約処理のリソース
+        engine (Optional[BatchEngine]): バッチ用のエンジン（デフォルトは create_batch_engine()）
+        ledger (Optional[RunLedger]): 文書ごとのトークン数と処理時間を記録するレジャー
+
+    Returns:
+        Dict[str, List[str]]: doc_id と要約ファイルの ID のリスト（失敗した文書は空のリスト）の対応
+    """
+    close_engine = engine is None
+    engine = engine or create_batch_engine()
+    summarizer = Summarizer(engine, summarization.model, summarization.summarizer.max_summary_tokens,
+                            summarization.prompt_messages, summarization.summarizer.capabilities)
+
+    def ledger_document(doc_id):
+        return ledger.document(doc_id) if ledger is not None else contextlib.nullcontext()
+
+    # PDF のダウンロードとテキスト抽出は、Drive のクライアントを共有するため順に行う
+    inputs = {}
+    for doc_id, document in documents.items():
+        with ledger_document(doc_id):
+            try:
+                with stage("download"):
+                    pdf_path = drive_handler.download_pdf_from_drive(document["file_id"])
+                if not pdf_path:
+                    logger.error(f"PDFのダウンロードに失敗しました: ID={doc_id}")
+                    continue
+                with stage("extract"):
+                    pages, tables_text, extraction = prepare_document(pdf_path, summarization)
+                    pages = list(pages)
+                    extraction.save()
+                inputs[doc_id] = (pdf_path, pages, tables_text)
+            except Exception as e:
+                logger.error(f"PDF テキスト抽出中にエラーが発生しました: ID={doc_id}: {e}")
+
+    async def summarize_document(doc_id, pages, tables_text):
+        with ledger_document(doc_id):
+            return await summarizer.asummarize_pages(pages, summarization.tokenizer, tables_text=tables_text)
+
+    summarize = {
+        doc_id: (lambda doc_id=doc_id, pages=pages, tables_text=tables_text:
+                 summarize_document(doc_id, pages, tables_text))
+        for doc_id, (_, pages, tables_text) in inputs.items()
+    }
+    try:
+        summaries = engine.summarize_all(summarize)
+    finally:
+        engine.log_summary()
+        if close_engine:
+            engine.close()
+
+    results = {doc_id: [] for doc_id in documents}
+    for doc_id, summary in summaries.items():
+        if isinstance(summary, Exception):
+            logger.error(f"Failed to summarize PDF: ID={doc_id}: {summary}")
+            continue
+        pdf_path = inputs[doc_id][0]
+        try:
+            with ledger_document(doc_id), stage("save"):
+                results[doc_id] = save_summary(pdf_path, summary, documents[doc_id]["folder_id"], drive_handler)
+        except Exception as e:
+            logger.error(f"要約の保存に失敗しました: ID={doc_id}: {e}")
+    return results
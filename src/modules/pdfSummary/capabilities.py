@@ -0,0 +1,104 @@
+# src/modules/pdfSummary/capabilities.py
+
+from dataclasses import dataclass
+from typing import Dict
+
+from utils.environment import EnvironmentUtils as env
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# settings.ini に設定がない場合のモデルごとのコンテキストウィンドウと最大出力トークン数
+DEFAULT_CONTEXT_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_OUTPUT_LIMITS = {
+    "gpt-4o": 16384,
+    "gpt-4o-mini": 16384,
+    "gpt-4-turbo": 4096,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 4096,
+}
+# テーブルにないモデルの場合に使用する控えめな値
+FALLBACK_CONTEXT_WINDOW = 8192
+FALLBACK_OUTPUT_LIMIT = 4096
+
+@dataclass(frozen=True)
+class ModelCapabilities:
+    """モデルの入出力の上限"""
+    model: str
+    context_window: int
+    max_output_tokens: int
+    max_summary_tokens: int
+    reserve_tokens: int
+
+    def input_budget(self, prompt_tokens: int) -> int:
+        """
+        プロンプトと出力、余裕分を差し引いた、1回の呼び出しで本文に使用できるトークン数。
+
+        Args:
+            prompt_tokens (int): プロンプトのメッセージのトークン数
+
+        Returns:
+            int: 本文に使用できるトークン数
+        """
+        return max(0, self.context_window - prompt_tokens - self.max_summary_tokens - self.reserve_tokens)
+
+def parse_model_table(value) -> Dict[str, int]:
+    """
+    "gpt-4o:128000, gpt-4o-mini:128000" 形式の設定値を辞書に変換します。
+
+    Args:
+        value: 設定値（未設定の場合は None）
+
+    Returns:
+        Dict[str, int]: モデル名と値の対応
+    """
+    table = {}
+    for item in str(value or "").split(","):
+        if ":" not in item:
+            continue
+        model, limit = item.rsplit(":", 1)
+        table[model.strip()] = int(limit.strip())
+    return table
+
+def _lookup(table: Dict[str, int], model: str):
+    """モデル名に一致する値を返します（"gpt-4o-2024-08-06" のような日付付きの名前は最長一致で判定）。"""
+    if model in table:
+        return table[model]
+    prefixes = [name for name in table if model.startswith(name + "-")]
+    return table[max(prefixes, key=len)] if prefixes else None
+
+def get_model_capabilities(model: str) -> ModelCapabilities:
+    """
+    settings.ini の [OPENAI] context_windows / output_limits（未設定のモデルは既定のテーブル）から
+    モデルの入出力の上限を取得します。
+
+    Args:
+        model (str): OpenAI モデル名
+
+    Returns:
+        ModelCapabilities: モデルの入出力の上限
+    """
+    context_windows = {**DEFAULT_CONTEXT_WINDOWS, **parse_model_table(env.get_config_value("OPENAI", "context_windows"))}
+    output_limits = {**DEFAULT_OUTPUT_LIMITS, **parse_model_table(env.get_config_value("OPENAI", "output_limits"))}
+
+    context_window = _lookup(context_windows, model)
+    max_output_tokens = _lookup(output_limits, model)
+    if context_window is None or max_output_tokens is None:
+        logger.warning(f"モデル {model} の上限が設定されていないため、既定値を使用します。")
+        context_window = context_window or FALLBACK_CONTEXT_WINDOW
+        max_output_tokens = max_output_tokens or FALLBACK_OUTPUT_LIMIT
+
+    max_summary_tokens = min(env.get_config_value("OPENAI", "max_summary_tokens", default=2000), max_output_tokens)
+    return ModelCapabilities(
+        model=model,
+        context_window=context_window,
+        max_output_tokens=max_output_tokens,
+        max_summary_tokens=max_summary_tokens,
+        reserve_tokens=env.get_config_value("OPENAI", "reserve_tokens", default=1000),
+    )
@@ -0,0 +1,316 @@
+# src/modules/pdfSummary/embeddings.py
+
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from utils.environment import EnvironmentUtils as env
+from utils.logging_config import get_logger
+from .assets import get_sentence_model, get_sentence_model_name, load_onnx_sentence_model
+
+logger = get_logger(__name__)
+
+EMBEDDING_BACKENDS = ("torch", "onnx")
+
+def sentence_hash(sentence: str) -> str:
+    """キャッシュのキーとする文のハッシュ。"""
+    return hashlib.sha1(sentence.encode("utf-8")).hexdigest()
+
+class SentenceTransformerBackend:
+    """sentence_transformers（PyTorch）でエンベディングを計算するバックエンド"""
+
+    def __init__(self, model_name: str, batch_size: int = 256):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_key = model_name
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        model = get_sentence_model(self.model_name)
+        vectors = model.encode(sentences, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+class OnnxBackend(SentenceTransformerBackend):
+    """量子化した ONNX モデルで CPU 上でエンベディングを計算するバックエンド"""
+
+    def __init__(self, model_name: str, batch_size: int = 256, quantization: str = "avx2"):
+        super().__init__(model_name, batch_size)
+        self.quantization = quantization
+        # 量子化モデルのベクトルは PyTorch のものと完全には一致しないため、キャッシュは分けて保持する
+        self.cache_key = f"{model_name}@onnx-{quantization}"
+        self._model = None
+        self._lock = threading.Lock()
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        with self._lock:
+            if self._model is None:
+                self._model = load_onnx_sentence_model(self.model_name, self.quantization)
+        vectors = self._model.encode(sentences, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+class EmbeddingCache:
+    """
+    文のハッシュをキーにエンベディングを保持するキャッシュ。
+    ベクトルはメモリマップしたファイルに追記し、ハッシュと行番号の対応は SQLite に保持します。
+    """
+
+    INITIAL_CAPACITY = 4096
+
+    def __init__(self, cache_dir: Path, model_key: str):
+        """
+        Args:
+            cache_dir (Path): キャッシュの保存先
+            model_key (str): モデル名（バックエンドごとに異なるキー）
+        """
+        self.directory = Path(cache_dir) / model_key.replace("/", "__")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.directory / "vectors.f32"
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.directory / "index.sqlite3"), check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS vectors (hash TEXT PRIMARY KEY, row INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        self.dim = int(row[0]) if row else None
+        self.count = self.connection.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+        self._vectors = None
+
+    def _open(self, capacity: int) -> None:
+        """ベクトルのファイルを capacity 行分に拡張してメモリマップします。"""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        size = capacity * self.dim * 4
+        with open(self.vectors_path, "ab") as file:
+            if file.tell() < size:
+                file.truncate(size)
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_open(self, required: int) -> None:
+        capacity = len(self._vectors) if self._vectors is not None else 0
+        if self._vectors is None or required > capacity:
+            existing = self.vectors_path.stat().st_size // (self.dim * 4) if self.vectors_path.exists() else 0
+            capacity = max(capacity, existing, self.INITIAL_CAPACITY)
+            while capacity < required:
+                capacity *= 2
+            self._open(capacity)
+
+    def _find_rows(self, hashes: Sequence[str]) -> Dict[str, int]:
+        rows = {}
+        unique = list(dict.fromkeys(hashes))
+        for start in range(0, len(unique), 500):
+            batch = unique[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(self.connection.execute(
+                f"SELECT hash, row FROM vectors WHERE hash IN ({placeholders})", batch
+            ).fetchall())
+        return rows
+
+    def lookup(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        キャッシュ済みのエンベディングを取得します。
+
+        Args:
+            hashes (Sequence[str]): 文のハッシュ
+
+        Returns:
+            Dict[str, np.ndarray]: ハッシュとベクトルの対応（キャッシュにないものは含まない）
+        """
+        if self.dim is None or not hashes:
+            return {}
+        with self._lock:
+            rows = self._find_rows(hashes)
+            if not rows:
+                return {}
+            self._ensure_open(self.count)
+            return {key: np.array(self._vectors[row]) for key, row in rows.items()}
+
+    def add(self, hashes: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        エンベディングをキャッシュに追加します（キャッシュ済みのハッシュは無視します）。
+
+        Args:
+            hashes (Sequence[str]): 文のハッシュ
+            vectors (np.ndarray): 各文のベクトル
+        """
+        if not hashes:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dim', ?)", (str(self.dim),))
+
+            existing = self._find_rows(hashes)
+            new = {}
+            for key, vector in zip(hashes, vectors):
+                if key not in existing:
+                    new.setdefault(key, vector)
+            if not new:
+                return
+
+            # ベクトルを書き込んでから索引を登録し、索引が未書き込みの行を指さないようにする
+            self._ensure_open(self.count + len(new))
+            self._vectors[self.count:self.count + len(new)] = np.stack(list(new.values()))
+            self._vectors.flush()
+            self.connection.executemany(
+                "INSERT INTO vectors (hash, row) VALUES (?, ?)",
+                [(key, self.count + offset) for offset, key in enumerate(new)],
+            )
+            self.connection.commit()
+            self.count += len(new)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            self.connection.close()
+
+class EmbeddingService:
+    """
+    文のエンベディングを計算するサービス。
+    複数の文書から同時に届いた文をバックグラウンドのスレッドでまとめて1回のバッチで計算し、
+    計算済みのベクトルは文のハッシュとモデル名をキーにキャッシュします。
+    """
+
+    def __init__(self, backend, cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = 256, max_wait_seconds: float = 0.05):
+        """
+        Args:
+            backend: エンベディングを計算するバックエンド（encode(sentences) -> np.ndarray）
+            cache (Optional[EmbeddingCache]): ベクトルのキャッシュ（None の場合はキャッシュしない）
+            batch_size (int): 1回のバッチでまとめる文の目安
+            max_wait_seconds (float): 他の文書からの文を待つ最大時間
+        """
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.stats = {"requested": 0, "cached": 0, "encoded": 0, "batches": 0}
+
+    def embed(self, sentences: Sequence[str]) -> np.ndarray:
+        """
+        文のエンベディング（正規化済み）を返します。
+
+        Args:
+            sentences (Sequence[str]): 文のリスト
+
+        Returns:
+            np.ndarray: 文数 × 次元 の配列
+        """
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        hashes = [sentence_hash(sentence) for sentence in sentences]
+        vectors = self.cache.lookup(hashes) if self.cache is not None else {}
+
+        missing = {}
+        for key, sentence in zip(hashes, sentences):
+            if key not in vectors:
+                missing.setdefault(key, sentence)
+        if missing:
+            encoded = self._submit(list(missing.values())).result()
+            vectors.update(zip(missing.keys(), encoded))
+
+        self.stats["requested"] += len(sentences)
+        self.stats["cached"] += len(sentences) - sum(1 for key in hashes if key in missing)
+        return np.stack([vectors[key] for key in hashes])
+
+    def _submit(self, sentences: List[str]) -> Future:
+        future: Future = Future()
+        self._queue.put((sentences, future))
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+        return future
+
+    def _collect(self) -> list:
+        """最初の要求から max_wait_seconds の間、batch_size に達するまで他の要求をまとめます。"""
+        requests = [self._queue.get()]
+        total = len(requests[0][0])
+        deadline = time.monotonic() + self.max_wait_seconds
+        while total < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            requests.append(request)
+            total += len(request[0])
+        return requests
+
+    def _run(self) -> None:
+        while True:
+            requests = self._collect()
+            unique = list(dict.fromkeys(sentence for sentences, _ in requests for sentence in sentences))
+            try:
+                encoded = self.backend.encode(unique)
+                if self.cache is not None:
+                    self.cache.add([sentence_hash(sentence) for sentence in unique], encoded)
+                rows = {sentence: vector for sentence, vector in zip(unique, encoded)}
+                self.stats["encoded"] += len(unique)
+                self.stats["batches"] += 1
+                logger.debug(f"{len(requests)} 件の要求の {len(unique)} 文をまとめてエンコードしました。")
+                for sentences, future in requests:
+                    future.set_result(np.stack([rows[sentence] for sentence in sentences]))
+            except Exception as e:
+                logger.error(f"エンベディングの計算に失敗しました: {e}")
+                for _, future in requests:
+                    future.set_exception(e)
+
+    def log_summary(self) -> None:
+        """キャッシュのヒット数とバッチ数を出力します。"""
+        stats = self.stats
+        logger.info(
+            f"エンベディング: {stats['requested']} 文（キャッシュ {stats['cached']} 文）、"
+            f"{stats['encoded']} 文を {stats['batches']} バッチで計算"
+        )
+
+_embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
+
+def create_backend(model_name: Optional[str] = None):
+    """settings.ini の [EMBEDDINGS] backend に応じたバックエンドを生成します。"""
+    model_name = model_name or get_sentence_model_name()
+    backend = str(env.get_config_value("EMBEDDINGS", "backend", default="torch")).lower()
+    batch_size = env.get_config_value("EMBEDDINGS", "batch_size", default=256)
+    if backend == "onnx":
+        quantization = env.get_config_value("EMBEDDINGS", "onnx_quantization", default="avx2")
+        return OnnxBackend(model_name, batch_size, quantization)
+    if backend != "torch":
+        raise ValueError(f"[EMBEDDINGS] backend は {', '.join(EMBEDDING_BACKENDS)} のいずれかを指定してください: {backend}")
+    return SentenceTransformerBackend(model_name, batch_size)
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    プロセス内で共有するエンベディングサービスを返します（初回呼び出し時に settings.ini の [EMBEDDINGS] から生成）。
+    """
+    global _embedding_service
+    with _embedding_service_lock:
+        if _embedding_service is None:
+            backend = create_backend()
+            cache = None
+            if env.get_config_value("EMBEDDINGS", "cache", default=True):
+                cache_dir = Path(env.get_config_value("EMBEDDINGS", "cache_dir", default="data/embeddings"))
+                if not cache_dir.is_absolute():
+                    cache_dir = env.get_project_root() / cache_dir
+                cache = EmbeddingCache(cache_dir, backend.cache_key)
+            _embedding_service = EmbeddingService(
+                backend,
+                cache,
+                batch_size=backend.batch_size,
+                max_wait_seconds=env.get_config_value("EMBEDDINGS", "max_wait_ms", default=50) / 1000,
+            )
+        return _embedding_service
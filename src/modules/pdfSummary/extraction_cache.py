@@ -0,0 +1,209 @@
+# src/modules/pdfSummary/extraction_cache.py
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+import pymupdf
+from utils.environment import EnvironmentUtils as env
+from utils.logging_config import get_logger
+from .extractor import EXTRACTOR_VERSION, iter_pdf_pages
+from .sections import locate_relevant_pages
+from .tables import extract_financial_tables, page_text_without_tables, table_label
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+def file_sha256(pdf_path) -> str:
+    """PDFファイルの SHA-256 を計算します。"""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class CachedExtraction:
+    """
+    1つのPDFの抽出結果（ページ単位のテキスト、メタデータ、対象セクション、財務表）。
+    キャッシュにない項目は初回アクセス時にPDFから抽出し、save() でまとめて保存します。
+    """
+
+    def __init__(self, pdf_path, cache_path: Optional[Path], data: Dict):
+        self.pdf_path = pdf_path
+        self.cache_path = cache_path
+        self.data = data
+        self._dirty = False
+
+    @property
+    def page_count(self) -> int:
+        return self.data["metadata"]["page_count"]
+
+    def relevant_pages(self) -> Optional[List[int]]:
+        """要約に必要なセクションのページ（None の場合は文書全体）。"""
+        if "relevant_pages" not in self.data:
+            self.data["relevant_pages"] = locate_relevant_pages(self.pdf_path)
+            self._dirty = True
+        return self.data["relevant_pages"]
+
+    def tables(self, pages: Optional[List[int]] = None) -> List["pd.DataFrame"]:
+        """財務数値を含む表。"""
+        import pandas as pd
+
+        key = "all" if pages is None else ",".join(map(str, pages))
+        cached = self.data.setdefault("tables", {})
+        if key not in cached:
+            cached[key] = [
+                {"page": df.attrs.get("page"), "bbox": df.attrs.get("bbox"),
+                 "columns": list(df.columns), "rows": df.to_numpy().tolist()}
+                for df in extract_financial_tables(self.pdf_path, pages=pages)
+            ]
+            self._dirty = True
+
+        tables = []
+        for table in cached[key]:
+            df = pd.DataFrame(table["rows"], columns=table["columns"])
+            df.attrs["page"] = table["page"]
+            df.attrs["bbox"] = table.get("bbox")
+            tables.append(df)
+        return tables
+
+    def iter_pages(self, pages: Optional[List[int]] = None,
+                   tables: Optional[List["pd.DataFrame"]] = None) -> Iterator[str]:
+        """
+        ページ単位のテキストをページ順に返します。
+        キャッシュにないページのみをPDFから抽出します。
+
+        Args:
+            pages (Optional[List[int]]): 0始まりのページ番号（デフォルトは全ページ）。
+            tables (Optional[List[pd.DataFrame]]): 本文とは別に要約へ渡す表（tables() の戻り値）。
+                表のあるページは、表の領域を見出しに置き換えたテキストを返します。
+
+        Yields:
+            str: 各ページのテキスト。
+        """
+        page_numbers = list(range(self.page_count)) if pages is None else list(pages)
+        regions: Dict[int, List] = {}
+        for index, df in enumerate(tables or [], start=1):
+            if df.attrs.get("bbox") and df.attrs.get("page"):
+                regions.setdefault(df.attrs["page"] - 1, []).append((table_label(index, df), df.attrs["bbox"]))
+
+        cached = self.data.setdefault("pages", {})
+        missing = [page_num for page_num in page_numbers if str(page_num) not in cached and page_num not in regions]
+        if missing:
+            logger.info(f"キャッシュにない {len(missing)}/{len(page_numbers)} ページを抽出します。")
+        else:
+            logger.info(f"抽出済みテキストをキャッシュから読み込みました: {len(page_numbers)} ページ")
+
+        extracted = iter_pdf_pages(self.pdf_path, pages=missing) if missing else iter([])
+        for page_num in page_numbers:
+            if page_num in regions:
+                yield self._page_without_tables(page_num, regions[page_num])
+                continue
+            if str(page_num) not in cached:
+                cached[str(page_num)] = next(extracted)
+                self._dirty = True
+            yield cached[str(page_num)]
+
+    def _page_without_tables(self, page_num: int, regions: List) -> str:
+        """表の領域を除いたページのテキスト（表の見出しが変わると結果も変わるため、見出しごとに保持する）。"""
+        key = f"{page_num}:" + ",".join(label for label, _ in regions)
+        cached = self.data.setdefault("pages_without_tables", {})
+        if key not in cached:
+            cached[key] = page_text_without_tables(self.pdf_path, page_num, regions)
+            self._dirty = True
+        return cached[key]
+
+    def save(self) -> None:
+        """新たに抽出した項目がある場合、キャッシュファイルに書き込みます。"""
+        if self.cache_path is None or not self._dirty:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+                json.dump(self.data, file, ensure_ascii=False)
+            os.replace(temp_path, self.cache_path)
+            self._dirty = False
+            logger.info(f"抽出結果をキャッシュに保存しました: {self.cache_path}")
+        except OSError as e:
+            # キャッシュは再実行を高速化するためのものなので、保存に失敗しても処理は継続する
+            logger.warning(f"抽出結果のキャッシュ保存に失敗しました: {e}")
+
+class ExtractionCache:
+    """
+    PDFの抽出結果を、ファイルの SHA-256 と抽出処理のバージョンをキーに gzip 圧縮した JSON で保存するキャッシュ。
+    プロンプトやモデルを変更して再要約する場合に、PDFの抽出処理を省略できます。
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, enabled: Optional[bool] = None):
+        """
+        Args:
+            cache_dir (Optional[Path]): キャッシュの保存先（デフォルトは [PDF] extraction_cache_dir）
+            enabled (Optional[bool]): キャッシュを使用するか（デフォルトは [PDF] extraction_cache）
+        """
+        if enabled is None:
+            enabled = env.get_config_value("PDF", "extraction_cache", default=True)
+        if cache_dir is None:
+            cache_dir = Path(env.get_config_value("PDF", "extraction_cache_dir", default="data/extraction_cache"))
+            if not cache_dir.is_absolute():
+                cache_dir = env.get_project_root() / cache_dir
+        self.cache_dir = Path(cache_dir)
+        self.enabled = bool(enabled)
+
+    def cache_path(self, sha256: str) -> Path:
+        return self.cache_dir / sha256[:2] / f"{sha256}.v{EXTRACTOR_VERSION}.json.gz"
+
+    def _load(self, cache_path: Path) -> Optional[Dict]:
+        if not cache_path.exists():
+            return None
+        try:
+            with gzip.open(cache_path, "rt", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"抽出結果のキャッシュを読み込めないため、再抽出します: {cache_path}: {e}")
+            return None
+
+    def open(self, pdf_path) -> CachedExtraction:
+        """
+        PDFの抽出結果を取得します。キャッシュがない場合は、メタデータのみを読み込んだ空の結果を返します。
+
+        Args:
+            pdf_path (str): PDFファイルのパス。
+
+        Returns:
+            CachedExtraction: 抽出結果。
+        """
+        if not self.enabled:
+            return CachedExtraction(pdf_path, None, {"metadata": self._read_metadata(pdf_path)})
+
+        sha256 = file_sha256(pdf_path)
+        cache_path = self.cache_path(sha256)
+        data = self._load(cache_path)
+        if data is not None:
+            logger.info(f"抽出結果のキャッシュを使用します: {Path(pdf_path).name} ({sha256[:12]})")
+            return CachedExtraction(pdf_path, cache_path, data)
+
+        extraction = CachedExtraction(pdf_path, cache_path, {
+            "sha256": sha256,
+            "extractor_version": EXTRACTOR_VERSION,
+            "metadata": self._read_metadata(pdf_path),
+        })
+        extraction._dirty = True
+        return extraction
+
+    @staticmethod
+    def _read_metadata(pdf_path) -> Dict:
+        with pymupdf.open(pdf_path) as doc:
+            return {
+                "file_name": Path(pdf_path).name,
+                "file_size": os.path.getsize(pdf_path),
+                "page_count": doc.page_count,
+                "pdf_metadata": doc.metadata or {},
+                "cached_at": datetime.now().isoformat(timespec="seconds"),
+            }
@@ -1,29 +1,148 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
 import pymupdf
+from utils.environment import EnvironmentUtils as env
 from utils.logging_config import get_logger  # 修正: 絶対パスを使用
 
 logger = get_logger(__name__)
 
-def extract_text_from_pdf(pdf_path):
+# 抽出処理（ページテキスト、セクション特定、表抽出）の結果が変わる変更をした場合に更新する
+# （抽出結果のキャッシュはこのバージョンごとに保持される）
+EXTRACTOR_VERSION = 2
+
+# 並列抽出で1区間に割り当てる最大ページ数（抽出済みテキストの滞留量を抑える）
+MAX_PAGES_PER_RANGE = 16
+
+# PyMuPDF はスレッドセーフではないため、複数のスレッドから PDF を扱う場合はこのロックで直列化する
+# （要約エンジンのスレッドでページを抽出している間に、次の文書の抽出準備を行う場合など）
+pdf_lock = threading.RLock()
+
+def iter_locked(pages: Iterator[str]) -> Iterator[str]:
+    """ページを1件取り出すごとに pdf_lock を取得するイテレーター（別のスレッドから読み込む場合に使用）。"""
+    pages = iter(pages)
+    while True:
+        with pdf_lock:
+            page = next(pages, None)
+        if page is None:
+            return
+        yield page
+
+def _extract_pages(pdf_path: str, page_numbers: List[int]) -> List[str]:
     """
-    PyMuPDF を使用してPDFからテキストを抽出します。
+    ワーカープロセスで指定したページのテキストを抽出します。
+    ドキュメントはプロセス間で共有できないため、各ワーカーが自分で開きます。
 
     Args:
         pdf_path (str): PDFファイルのパス。
+        page_numbers (List[int]): 0始まりのページ番号のリスト。
 
     Returns:
-        str: 抽出されたテキスト。
+        List[str]: 指定した順のテキストのリスト。
+    """
+    with pymupdf.open(pdf_path) as doc:
+        return [doc[page_num].get_text() for page_num in page_numbers]
+
+def _split_page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    ページ範囲をほぼ均等な連続区間に分割します。
+
+    Args:
+        page_count (int): 総ページ数。
+        parts (int): 分割数。
+
+    Returns:
+        List[Tuple[int, int]]: (開始ページ, 終了ページ) のリスト。
+    """
+    parts = max(1, min(parts, page_count))
+    size, remainder = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < remainder else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def iter_pdf_pages(pdf_path, max_workers: Optional[int] = None,
+                   parallel_threshold: Optional[int] = None,
+                   pages: Optional[List[int]] = None) -> Iterator[str]:
+    """
+    PyMuPDF を使用してPDFのテキストをページ単位で順に返すジェネレーター。
+    ページ数が閾値以上の場合は、ページ範囲を分割してプロセスプールで並列に抽出し、
+    完了した区間から順番に返します。
+
+    Args:
+        pdf_path (str): PDFファイルのパス。
+        max_workers (Optional[int]): 並列抽出のプロセス数（デフォルトは [PDF] max_workers、未設定ならCPU数）。
+        parallel_threshold (Optional[int]): 並列抽出に切り替えるページ数（デフォルトは [PDF] parallel_page_threshold）。
+        pages (Optional[List[int]]): 抽出する0始まりのページ番号（デフォルトは全ページ）。
+
+    Yields:
+        str: 各ページのテキスト（ページ順）。
     """
     logger.info(f"PDF ファイルからテキストを抽出: {pdf_path}")
-    text = ""
+    if max_workers is None:
+        max_workers = env.get_config_value("PDF", "max_workers", default=None) or os.cpu_count() or 1
+    if parallel_threshold is None:
+        parallel_threshold = env.get_config_value("PDF", "parallel_page_threshold", default=50)
+
     try:
-        doc = pymupdf.open(pdf_path)
-        for page_num, page in enumerate(doc, start=1):
-            page_text = page.get_text()
-            if page_text:
-                text += page_text + "\n\n"
-            logger.debug(f"ページ {page_num}: テキスト抽出完了")
+        with pymupdf.open(pdf_path) as doc:
+            page_numbers = list(range(doc.page_count)) if pages is None else list(pages)
+            if len(page_numbers) < parallel_threshold or max_workers <= 1:
+                for page_num in page_numbers:
+                    yield doc[page_num].get_text()
+                    logger.debug(f"ページ {page_num + 1}: テキスト抽出完了")
+                return
+
+        yield from _iter_pages_in_parallel(str(pdf_path), page_numbers, max_workers)
     except Exception as e:
         logger.error(f"PyMuPDF によるテキスト抽出に失敗しました: {e}")
         raise
+
+def extract_text_from_pdf(pdf_path, max_workers: Optional[int] = None, parallel_threshold: Optional[int] = None):
+    """
+    PyMuPDF を使用してPDFからテキストを抽出します。
+
+    Args:
+        pdf_path (str): PDFファイルのパス。
+        max_workers (Optional[int]): 並列抽出のプロセス数。
+        parallel_threshold (Optional[int]): 並列抽出に切り替えるページ数。
+
+    Returns:
+        str: 抽出されたテキスト。
+    """
+    pages = iter_pdf_pages(pdf_path, max_workers, parallel_threshold)
+    text = "".join(page_text + "\n\n" for page_text in pages if page_text)
     logger.info(f"抽出されたテキストの合計文字数: {len(text)}")
     return text
+
+def _iter_pages_in_parallel(pdf_path: str, page_numbers: List[int], max_workers: int) -> Iterator[str]:
+    """
+    ページ範囲をプロセスプールで並列に抽出し、ページ順に返します。
+    プロセスプールが利用できない場合は、未出力のページを単一プロセスで抽出します。
+    """
+    # 各ワーカーに複数の範囲を割り当て、ページごとの処理量の偏りを平準化する
+    page_count = len(page_numbers)
+    parts = max(max_workers * 2, -(-page_count // MAX_PAGES_PER_RANGE))
+    ranges = _split_page_ranges(page_count, parts)
+    logger.info(f"{page_count} ページを {len(ranges)} 区間に分割し、{max_workers} プロセスで並列抽出します。")
+
+    yielded = 0
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                _extract_pages,
+                [pdf_path] * len(ranges),
+                [page_numbers[start:end] for start, end in ranges],
+            )
+            for range_pages in results:
+                for page_text in range_pages:
+                    yield page_text
+                    yielded += 1
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"並列抽出に失敗したため、単一プロセスで抽出します: {e}")
+        yield from _extract_pages(pdf_path, page_numbers[yielded:])
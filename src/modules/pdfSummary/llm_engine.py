@@ -0,0 +1,250 @@
+# src/modules/pdfSummary/llm_engine.py
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from utils.environment import EnvironmentUtils as env
+from utils.ledger import record_request
+from utils.logging_config import get_logger
+from .rate_limiter import RateLimitScheduler, is_retryable
+from .response_cache import ResponseCache
+
+logger = get_logger(__name__)
+
+class SummaryEngine:
+    """
+    AsyncOpenAI のクライアントで要約のリクエストを送るエンジン。
+    バックグラウンドのスレッドで動くイベントループ上でリクエストを実行し、
+    プロセス全体で同時に送信中のリクエスト数をセマフォで制限します。
+    同期的な呼び出し元のために、コルーチンの完了を待つ run() を提供します。
+    応答のキャッシュを指定した場合、同一のリクエストは API に送信せずキャッシュから返します。
+    送信は RateLimitScheduler で RPM/TPM の上限内に抑え、429 などの一時的なエラーはバックオフして再試行します。
+    """
+
+    def __init__(self, client, max_concurrency: int = 8, cache: Optional[ResponseCache] = None,
+                 scheduler: Optional[RateLimitScheduler] = None):
+        """
+        Args:
+            client: AsyncOpenAI のクライアント（chat.completions.with_raw_response.create がコルーチンを返すもの）
+            max_concurrency (int): プロセス全体で同時に送信するリクエストの上限
+            cache (Optional[ResponseCache]): 応答のキャッシュ（None の場合はキャッシュしない）
+            scheduler (Optional[RateLimitScheduler]): レート制限のスケジューラー（None の場合はヘッダーで判明した上限のみ適用）
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.scheduler = scheduler or RateLimitScheduler()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="summary-engine", daemon=True)
+        self._thread.start()
+        self._semaphore = self.run(self._create_semaphore())
+
+    async def _create_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.max_concurrency)
+
+    def run(self, coroutine: Awaitable) -> Any:
+        """
+        コルーチンをエンジンのイベントループで実行し、結果を返すまで待ちます（同期的な呼び出し元用）。
+
+        Args:
+            coroutine (Awaitable): 実行するコルーチン
+
+        Returns:
+            Any: コルーチンの結果
+        """
+        return self.submit(coroutine).result()
+
+    def submit(self, coroutine: Awaitable) -> concurrent.futures.Future:
+        """
+        コルーチンをエンジンのイベントループで開始し、完了を待たずに Future を返します。
+        呼び出し元のコンテキスト（処理中の文書など）はコルーチンに引き継がれます。
+
+        Args:
+            coroutine (Awaitable): 実行するコルーチン
+
+        Returns:
+            concurrent.futures.Future: コルーチンの結果を受け取る Future
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def complete(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                       temperature: float = 0.7, input_tokens: Optional[int] = None) -> str:
+        """
+        チャットのリクエストを送り、応答のテキストを返します。
+
+        Args:
+            model (str): OpenAI モデル名
+            messages (List[Dict[str, str]]): メッセージ
+            max_tokens (int): 最大出力トークン数
+            temperature (float): 温度
+            input_tokens (Optional[int]): tiktoken で見積もった入力のトークン数（TPM の判定に使用）
+
+        Returns:
+            str: 応答のテキスト
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ResponseCache.make_key(model, messages, temperature, max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("同一のリクエストの応答をキャッシュから使用します。")
+                record_request(model, source="cache")
+                return cached
+
+        # OpenAI は入力と最大出力トークン数の合計で TPM を計上する
+        estimated_tokens = (input_tokens or 0) + max_tokens
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(estimated_tokens)
+            try:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    raw_response = await self.client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                    )
+                    latency = time.perf_counter() - started
+                break
+            except Exception as e:
+                if attempt >= self.scheduler.max_retries or not is_retryable(e):
+                    raise
+                response = getattr(e, "response", None)
+                delay = self.scheduler.backoff_seconds(attempt, getattr(response, "headers", None))
+                self.scheduler.pause(delay)
+                self.scheduler.stats["retries"] += 1
+                attempt += 1
+                logger.warning(f"OpenAI API の呼び出しに失敗したため、{delay:.1f} 秒後に再試行します（{attempt} 回目）: {e}")
+
+        self.scheduler.update_from_headers(raw_response.headers)
+        response = raw_response.parse()
+        content = response.choices[0].message.content.strip()
+        # 処理中の文書のレジャーにトークン数とレイテンシを記録
+        record_request(model, response.usage, latency)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, model, content)
+        return content
+
+    async def gather(self, coroutines: List[Awaitable], limit: Optional[int] = None) -> List[Any]:
+        """
+        複数のコルーチンを並行に実行し、入力と同じ順序で結果を返します。
+
+        Args:
+            coroutines (List[Awaitable]): 実行するコルーチン
+            limit (Optional[int]): この呼び出しで同時に実行する数の上限（プロセス全体の上限とは別）
+
+        Returns:
+            List[Any]: 各コルーチンの結果
+        """
+        if limit is None:
+            return list(await asyncio.gather(*coroutines))
+
+        semaphore = asyncio.Semaphore(limit)
+
+        async def limited(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        return list(await asyncio.gather(*(limited(coroutine) for coroutine in coroutines)))
+
+    async def map(self, func: Callable[[Any], Awaitable], items: Iterable, limit: Optional[int] = None) -> List[Any]:
+        """
+        同期のイテレーターから要素を順に（別スレッドで）取り出して func のコルーチンを並行に実行し、
+        入力と同じ順序で結果を返します。実行中のコルーチンが上限に達している間は次の要素を取り出さないため、
+        チャンク分割などの前処理は要約の進み具合に合わせて進み、全体を保持しません。
+
+        Args:
+            func (Callable[[Any], Awaitable]): 各要素に適用するコルーチン関数
+            items (Iterable): 要素（取り出しに時間のかかるジェネレーターでもよい）
+            limit (Optional[int]): この呼び出しで同時に実行する数の上限（プロセス全体の上限とは別）
+
+        Returns:
+            List[Any]: 各要素の結果
+        """
+        iterator = iter(items)
+        semaphore = asyncio.Semaphore(limit) if limit else None
+        end = object()
+        tasks = []
+
+        async def run(item):
+            try:
+                return await func(item)
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+        try:
+            while True:
+                if semaphore is not None:
+                    await semaphore.acquire()
+                item = await asyncio.to_thread(next, iterator, end)
+                if item is end:
+                    break
+                tasks.append(asyncio.ensure_future(run(item)))
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def close(self) -> None:
+        """クライアントを閉じ、イベントループを停止します。"""
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            try:
+                self.run(close())
+            except Exception as e:
+                logger.warning(f"OpenAI クライアントのクローズに失敗しました: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self.scheduler.log_summary()
+        if self.cache is not None:
+            self.cache.log_summary()
+            self.cache.close()
+
+_summary_engine: Optional[SummaryEngine] = None
+_summary_engine_lock = threading.Lock()
+
+def create_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None):
+    """
+    環境変数の API キーで AsyncOpenAI のクライアントを生成します（openai はここで初めてインポートされます）。
+    再試行は SummaryEngine がレート制限に合わせて行うため、クライアント自身の再試行は無効にします。
+
+    Args:
+        api_key (Optional[str]): OpenAI API キー（デフォルトは環境変数の OPENAI_API_KEY）
+        base_url (Optional[str]): API のベース URL（デフォルトは [OPENAI] base_url、未設定の場合は OpenAI）
+
+    Returns:
+        AsyncOpenAI: クライアント
+    """
+    from openai import AsyncOpenAI
+
+    base_url = base_url or env.get_config_value("OPENAI", "base_url", default=None) or None
+    return AsyncOpenAI(api_key=api_key or env.get_openai_api_key(), base_url=base_url, max_retries=0)
+
+def get_summary_engine() -> SummaryEngine:
+    """
+    プロセス内で共有する要約エンジンを返します（初回呼び出し時に生成）。
+    同時に送信するリクエストの上限は settings.ini の [OPENAI] max_concurrency、
+    RPM/TPM の上限と再試行は [OPENAI] rpm_limit / tpm_limit / max_retries です。
+    """
+    global _summary_engine
+    with _summary_engine_lock:
+        if _summary_engine is None:
+            max_concurrency = env.get_config_value("OPENAI", "max_concurrency", default=8)
+            cache = ResponseCache() if env.get_config_value("OPENAI", "response_cache", default=True) else None
+            scheduler = RateLimitScheduler(
+                rpm=env.get_config_value("OPENAI", "rpm_limit", default=None),
+                tpm=env.get_config_value("OPENAI", "tpm_limit", default=None),
+                max_retries=env.get_config_value("OPENAI", "max_retries", default=6),
+                retry_base_seconds=env.get_config_value("OPENAI", "retry_base_seconds", default=1.0),
+                retry_max_seconds=env.get_config_value("OPENAI", "retry_max_seconds", default=60.0),
+            )
+            _summary_engine = SummaryEngine(create_openai_client(), max_concurrency, cache, scheduler)
+            logger.info(f"要約エンジンを初期化しました（同時リクエスト数の上限: {max_concurrency}）。")
+        return _summary_engine
@@ -0,0 +1,144 @@
+# src/modules/pdfSummary/normalizer.py
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# ページ先頭・末尾のページ番号のみの行（例: "12", "- 12 -", "12 / 40", "P.12", "12ページ"）
+PAGE_NUMBER_PATTERN = re.compile(
+    r"^(?:-\s*\d+\s*-|\d+\s*/\s*\d+|[pP]\.?\s*\d+|\d+\s*ページ|\(\s*\d+\s*\)|\d+)$"
+)
+WHITESPACE_PATTERN = re.compile(r"[ \t　]+")
+DIGITS_PATTERN = re.compile(r"\d+")
+LETTER_PATTERN = re.compile(r"[^\W\d_]")
+
+def normalize_text(text: str) -> str:
+    """
+    テキストを NFKC で正規化し（全角英数字・半角カナなどの表記ゆれを統一）、空白の連続を1つにまとめます。
+    空行の連続も1行にまとめます。
+
+    Args:
+        text (str): 正規化するテキスト。
+
+    Returns:
+        str: 正規化したテキスト。
+    """
+    lines = []
+    for line in unicodedata.normalize("NFKC", text).splitlines():
+        line = WHITESPACE_PATTERN.sub(" ", line).strip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+def _line_key(line: str) -> str:
+    """ページごとに番号だけが変わるヘッダー・フッターを同一視するためのキー。"""
+    return DIGITS_PATTERN.sub("#", line)
+
+class TextNormalizer:
+    """
+    ページ単位のテキストから、ページ番号やすべてのページに繰り返し現れるヘッダー・フッターを取り除き、
+    表記ゆれと空白を正規化します。要約に送るトークン数を削減するため、Tokenizer の前段で使用します。
+    """
+
+    def __init__(self, count_tokens: Optional[Callable[[str], int]] = None,
+                 sample_pages: int = 8, edge_lines: int = 3, min_repeat_ratio: float = 0.5):
+        """
+        Args:
+            count_tokens (Optional[Callable[[str], int]]): トークン数を数える関数（指定した場合は削減量を記録する）
+            sample_pages (int): 繰り返し行の検出に使用する先頭ページ数
+            edge_lines (int): ヘッダー・フッターとみなすページ先頭・末尾の行数
+            min_repeat_ratio (float): 繰り返し行とみなすサンプルページ中の出現割合
+        """
+        self.count_tokens = count_tokens
+        self.sample_pages = sample_pages
+        self.edge_lines = edge_lines
+        self.min_repeat_ratio = min_repeat_ratio
+        self.stats = {"pages": 0, "chars_before": 0, "chars_after": 0, "tokens_before": 0, "tokens_after": 0}
+
+    def _edge_keys(self, lines: List[str]) -> set:
+        # 数字だけの行（表の数値など）は繰り返し行として扱わない
+        edges = lines[:self.edge_lines] + lines[-self.edge_lines:]
+        return {_line_key(line) for line in edges if LETTER_PATTERN.search(line)}
+
+    def find_repeated_lines(self, pages: List[List[str]]) -> set:
+        """
+        ページ先頭・末尾の行のうち、複数のページに繰り返し現れる行（ランニングヘッダー・フッター）を検出します。
+
+        Args:
+            pages (List[List[str]]): 正規化済みのページごとの行
+
+        Returns:
+            set: 繰り返し行のキー（数字を # に置き換えた行）
+        """
+        if len(pages) < 2:
+            return set()
+        counts = Counter(key for lines in pages for key in self._edge_keys(lines))
+        threshold = max(2, len(pages) * self.min_repeat_ratio)
+        return {key for key, count in counts.items() if count >= threshold}
+
+    def _clean_page(self, lines: List[str], repeated: set) -> str:
+        # 表のセルも1行ずつ抽出されるため、ページ番号は先頭・末尾の行に限って取り除く
+        edge_indexes = set(range(self.edge_lines)) | set(range(len(lines) - self.edge_lines, len(lines)))
+        kept = [
+            line for index, line in enumerate(lines)
+            if not (index in (0, len(lines) - 1) and PAGE_NUMBER_PATTERN.match(line))
+            and not (index in edge_indexes and _line_key(line) in repeated)
+        ]
+        return normalize_text("\n".join(kept))
+
+    def iter_pages(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        ページ単位のテキストを順に受け取り、正規化したテキストを返します。
+        繰り返し行の検出のため、先頭の sample_pages ページのみをバッファします。
+
+        Args:
+            pages (Iterable[str]): ページ単位のテキスト
+
+        Yields:
+            str: 正規化したページのテキスト
+        """
+        buffer = []
+        repeated = None
+        for page_text in pages:
+            self._record("before", page_text)
+            lines = normalize_text(page_text).splitlines()
+            if repeated is None:
+                buffer.append(lines)
+                if len(buffer) < self.sample_pages:
+                    continue
+                repeated = self.find_repeated_lines(buffer)
+                yield from self._flush(buffer, repeated)
+                buffer = []
+            else:
+                yield from self._flush([lines], repeated)
+
+        if buffer:
+            yield from self._flush(buffer, self.find_repeated_lines(buffer))
+        self.log_summary()
+
+    def _flush(self, pages: List[List[str]], repeated: set) -> Iterator[str]:
+        for lines in pages:
+            page_text = self._clean_page(lines, repeated)
+            self.stats["pages"] += 1
+            self._record("after", page_text)
+            yield page_text
+
+    def _record(self, stage: str, text: str) -> None:
+        self.stats[f"chars_{stage}"] += len(text)
+        if self.count_tokens is not None and text:
+            self.stats[f"tokens_{stage}"] += self.count_tokens(text)
+
+    def log_summary(self) -> None:
+        """正規化前後の文字数・トークン数を出力します。"""
+        stats = self.stats
+        if self.count_tokens is not None:
+            before, after, unit = stats["tokens_before"], stats["tokens_after"], "トークン"
+        else:
+            before, after, unit = stats["chars_before"], stats["chars_after"], "文字"
+        saved = (1 - after / before) * 100 if before else 0.0
+        logger.info(f"テキスト正規化: {stats['pages']} ページ, {before} → {after} {unit}（{saved:.1f}% 削減）")
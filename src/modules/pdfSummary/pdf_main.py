@@ -1,12 +1,18 @@
 # src/modules/pdfSummary/pdf_main.py
 
-import openai  # OpenAI SDK の正しいインポート方法
+from concurrent.futures import Future
 from pathlib import Path
 import json
 
 from utils.environment import EnvironmentUtils as env
 from utils.drive_handler import DriveHandler
-from .extractor import extract_text_from_pdf
+from utils.ledger import stage, timed_stage
+from .extraction_cache import ExtractionCache
+from .extractor import iter_locked, pdf_lock
+from .normalizer import TextNormalizer
+from .tables import format_tables
+from .capabilities import get_model_capabilities
+from .llm_engine import get_summary_engine
 from .tokenizer import Tokenizer
 from .summarizer import Summarizer
 
@@ -32,70 +38,99 @@ def load_prompt(file_path: str) -> list:
         logger.error(f"プロンプトのロード中にエラーが発生しました: {e}")
         raise
 
-def process_pdf(pdf_path: str, folder_id: str, drive_handler: DriveHandler = None) -> list:
+class SummarizationResources:
+    """
+    要約処理で使用するリソース（プロンプト、Tokenizer、Summarizer）。
+    実行ごとに1度だけ生成し、すべてのPDFで共有します。
     """
-    PDF を処理して要約を作成し、Google Drive に保存します。
+
+    def __init__(self, model: str, prompt_messages: list, tokenizer: Tokenizer, summarizer: Summarizer):
+        self.model = model
+        self.prompt_messages = prompt_messages
+        self.tokenizer = tokenizer
+        self.summarizer = summarizer
+
+    @classmethod
+    def from_environment(cls) -> "SummarizationResources":
+        """
+        環境変数と設定ファイルから要約処理のリソースを生成します。
+
+        Returns:
+            SummarizationResources: 生成したリソース
+        """
+        # 環境変数をロード
+        try:
+            env.load_env()
+            logger.info("環境変数を正常にロードしました。")
+        except Exception as e:
+            logger.error(f"環境変数のロード中にエラーが発生しました: {e}")
+            raise
+
+        # 必要な情報をロード
+        model = env.get_openai_model()
+        # 分割サイズと要約トークン制限は [OPENAI] のモデルごとの上限から決める
+        capabilities = get_model_capabilities(model)
+
+        # プロンプトをロード
+        prompt_path = env.get_config_value("OPENAI", "prompt_financial_report", default="config/prompt_financial_report.json")
+        prompt_file_path = env.resolve_path(prompt_path)
+        try:
+            prompt_messages = load_prompt(prompt_file_path)
+            logger.info("プロンプトを正常にロードしました。")
+        except Exception as e:
+            logger.error(f"プロンプトのロードに失敗しました: {e}")
+            raise
+
+        # 必要なインスタンスを生成（AsyncOpenAI のクライアントはプロセス内で共有する要約エンジンが保持する）
+        summarizer = Summarizer(get_summary_engine(), model, capabilities.max_summary_tokens, prompt_messages, capabilities)
+        tokenizer = Tokenizer(model, summarizer.input_budget())
+        return cls(model, prompt_messages, tokenizer, summarizer)
+
+def prepare_document(pdf_path: str, summarization: SummarizationResources):
+    """
+    PDF から要約の入力（ページ単位のテキストと財務表）を準備します。
+    抽出結果は PDF のハッシュをキーにキャッシュし、ページのテキストは要約時に順次抽出します。
 
     Args:
         pdf_path (str): PDF ファイルのパス。
-        folder_id (str): 要約を保存する Google Drive フォルダの ID。
-        drive_handler (DriveHandler, optional): 既存のDriveHandlerインスタンス。
+        summarization (SummarizationResources): 要約処理のリソース。
 
     Returns:
-        list: Google Drive に保存された要約ファイルの ID のリスト。
+        Tuple[Iterable[str], Optional[str], CachedExtraction]: ページのテキスト、整形した財務表、抽出結果のキャッシュ
     """
-    logger.info(f"PDF 処理を開始: {pdf_path}")
-
-    # 環境変数をロード
-    try:
-        env.load_env()
-        logger.info("環境変数を正常にロードしました。")
-    except Exception as e:
-        logger.error(f"環境変数のロード中にエラーが発生しました: {e}")
-        raise
-
-    # 必要な情報をロード
-    api_key = env.get_openai_api_key()
-    model = env.get_openai_model()
-    max_chunk_tokens = 2000  # 分割サイズ
-    max_summary_tokens = 2000  # 要約トークン制限
-
-    # プロンプトをロード
-    prompt_path = env.get_config_value("OPENAI", "prompt_financial_report", default="config/prompt_financial_report.json")
-    prompt_file_path = env.resolve_path(prompt_path)
-    try:
-        prompt_messages = load_prompt(prompt_file_path)
-        logger.info("プロンプトを正常にロードしました。")
-    except Exception as e:
-        logger.error(f"プロンプトのロードに失敗しました: {e}")
-        raise
-
-    # 必要なインスタンスを生成
-    openai.api_key = api_key  # OpenAI API キーを設定
-    tokenizer = Tokenizer(model, max_chunk_tokens)
-    summarizer = Summarizer(openai, model, max_summary_tokens, prompt_messages)
-
-    # DriveHandlerのインスタンス生成（既存のDriveHandlerがあれば使用）
-    if drive_handler is None:
-        service_account_file = env.get_service_account_file()
-        drive_handler = DriveHandler(str(service_account_file))
-
-    # PDFからテキストを抽出
-    try:
-        text = extract_text_from_pdf(pdf_path)
-    except Exception as e:
-        logger.error(f"PDF テキスト抽出中にエラーが発生しました: {e}")
-        raise
+    extraction = ExtractionCache().open(pdf_path)
+
+    # 要約に必要なセクションのページのみを抽出（特定できない場合は文書全体）
+    target_pages = None
+    if env.get_config_value("PDF", "section_targeting", default=True):
+        target_pages = extraction.relevant_pages()
+
+    # 財務数値の表は構造を保ったまま抽出し、本文とは別に要約へ渡す（本文からは表の領域を除く）
+    tables = None
+    tables_text = None
+    if env.get_config_value("PDF", "extract_tables", default=True):
+        tables = extraction.tables(pages=target_pages)
+        tables_text = format_tables(tables)
+
+    pages = extraction.iter_pages(target_pages, tables=tables)
+    if env.get_config_value("PDF", "normalize_text", default=True):
+        # ページ番号・繰り返しのヘッダー/フッターを除去し、表記ゆれと空白を正規化（削減したトークン数をログに出力）
+        pages = TextNormalizer(count_tokens=summarization.tokenizer.count_tokens).iter_pages(pages)
+    return pages, tables_text, extraction
+
+def save_summary(pdf_path: str, summary: str, folder_id: str, drive_handler: DriveHandler) -> list:
+    """
+    要約を Google Drive に保存します（10000 文字を超える場合は分割して保存）。
 
-    # テキストを分割し要約
-    try:
-        chunks = tokenizer.split_text_into_chunks(text)
-        summary = summarizer.summarize_text(chunks)
-    except Exception as e:
-        logger.error(f"要約処理中にエラーが発生しました: {e}")
-        raise
+    Args:
+        pdf_path (str): 要約元の PDF ファイルのパス（ファイル名に使用）。
+        summary (str): 要約。
+        folder_id (str): 要約を保存する Google Drive フォルダの ID。
+        drive_handler (DriveHandler): DriveHandler インスタンス。
 
-    # 要約をGoogle Driveに保存
+    Returns:
+        list: Google Drive に保存された要約ファイルの ID のリスト。
+    """
     try:
         file_ids = []
         if len(summary) > 10000:
@@ -117,6 +152,68 @@ def process_pdf(pdf_path: str, folder_id: str, drive_handler: DriveHandler = Non
         logger.error(f"Google Drive に保存中にエラーが発生しました: {e}")
         raise
 
+def _iter_and_save(pages, extraction):
+    """ページを返し終えた（または途中で閉じた）ときに、抽出結果をキャッシュに保存します。"""
+    try:
+        yield from pages
+    finally:
+        with pdf_lock:
+            extraction.save()
+
+def start_pdf_summary(pdf_path: str, summarization: SummarizationResources) -> Future:
+    """
+    PDF の要約を要約エンジンで開始します（要約の完了は待ちません）。
+    ページのテキストはエンジンが要約しながら順に抽出し、抽出の処理時間はページを取り出すごとに計測します。
+
+    Args:
+        pdf_path (str): PDF ファイルのパス。
+        summarization (SummarizationResources): 要約処理のリソース。
+
+    Returns:
+        Future: 要約を受け取る Future。
+    """
+    with stage("extract"), pdf_lock:
+        pages, tables_text, extraction = prepare_document(pdf_path, summarization)
+    pages = timed_stage("extract", _iter_and_save(iter_locked(pages), extraction))
+    summarizer = summarization.summarizer
+    return summarizer.engine.submit(summarizer.asummarize_pages(pages, summarization.tokenizer, tables_text=tables_text))
+
+def process_pdf(pdf_path: str, folder_id: str, drive_handler: DriveHandler = None,
+                summarization: SummarizationResources = None) -> list:
+    """
+    PDF を処理して要約を作成し、Google Drive に保存します。
+
+    Args:
+        pdf_path (str): PDF ファイルのパス。
+        folder_id (str): 要約を保存する Google Drive フォルダの ID。
+        drive_handler (DriveHandler, optional): 既存のDriveHandlerインスタンス。
+        summarization (SummarizationResources, optional): 既存の要約処理のリソース。
+
+    Returns:
+        list: Google Drive に保存された要約ファイルの ID のリスト。
+    """
+    logger.info(f"PDF 処理を開始: {pdf_path}")
+
+    # 要約処理のリソースを生成（既存のリソースがあれば使用）
+    if summarization is None:
+        summarization = SummarizationResources.from_environment()
+
+    # DriveHandlerのインスタンス生成（既存のDriveHandlerがあれば使用）
+    if drive_handler is None:
+        service_account_file = env.get_service_account_file()
+        drive_handler = DriveHandler(str(service_account_file))
+
+    # PDFからページ単位でテキストを抽出して要約（1回の呼び出しに収まらない場合のみチャンクに分割）
+    try:
+        summary = start_pdf_summary(pdf_path, summarization).result()
+    except Exception as e:
+        logger.error(f"PDF テキスト抽出・要約処理中にエラーが発生しました: {e}")
+        raise
+
+    # 要約をGoogle Driveに保存
+    with stage("save"):
+        return save_summary(pdf_path, summary, folder_id, drive_handler)
+
 def test_process_drive_file(file_id: str, drive_folder_id: str):
     """
     Google DriveのPDFファイルを処理するテスト関数
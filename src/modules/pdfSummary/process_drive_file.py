@@ -1,33 +1,42 @@
 # src/modules/pdfSummary/process_drive_file.py
 
-from .pdf_main import process_pdf
+from concurrent.futures import Future
+from typing import Optional, Tuple
+
+from .pdf_main import process_pdf, start_pdf_summary, SummarizationResources
 from utils.environment import EnvironmentUtils as env
 from utils.drive_handler import DriveHandler
+from utils.ledger import stage
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
-def process_drive_file(file_id: str, drive_folder_id: str) -> list:
+def process_drive_file(file_id: str, drive_folder_id: str, drive_handler: DriveHandler = None,
+                       summarization: SummarizationResources = None) -> list:
     """
     Google DriveのPDFファイルを処理して要約を生成し、ファイルIDのリストを返す
 
     Args:
         file_id (str): 処理対象のPDFファイルのGoogle Drive ID
         drive_folder_id (str): 保存先フォルダのGoogle Drive ID
+        drive_handler (DriveHandler, optional): 既存のDriveHandlerインスタンス
+        summarization (SummarizationResources, optional): 既存の要約処理のリソース
 
     Returns:
         list: 要約ファイルのGoogle DriveファイルIDのリスト
     """
     try:
-        # サービスアカウントファイルの取得
-        service_account_file = env.get_service_account_file()
-        drive_handler = DriveHandler(str(service_account_file))
+        # DriveHandlerのインスタンス生成（既存のDriveHandlerがあれば使用）
+        if drive_handler is None:
+            service_account_file = env.get_service_account_file()
+            drive_handler = DriveHandler(str(service_account_file))
 
         # PDFファイルをダウンロードして処理
-        local_pdf_path = drive_handler.download_pdf_from_drive(file_id)
+        with stage("download"):
+            local_pdf_path = drive_handler.download_pdf_from_drive(file_id)
         if local_pdf_path:
             # PDFの処理
-            result = process_pdf(local_pdf_path, drive_folder_id, drive_handler)
+            result = process_pdf(local_pdf_path, drive_folder_id, drive_handler, summarization)
             if result:
                 logger.info(f"処理が完了しました。結果のファイルID: {result}")
                 return result
@@ -40,3 +49,27 @@ def process_drive_file(file_id: str, drive_folder_id: str) -> list:
     except Exception as e:
         logger.error(f"エラーが発生しました: {e}")
         return []
+
+def start_drive_file(file_id: str, drive_handler: DriveHandler,
+                     summarization: SummarizationResources) -> Optional[Tuple[str, Future]]:
+    """
+    Google DriveのPDFファイルをダウンロードしてテキストを抽出し、要約を開始する（要約の完了は待たない）
+
+    Args:
+        file_id (str): 処理対象のPDFファイルのGoogle Drive ID
+        drive_handler (DriveHandler): DriveHandlerインスタンス
+        summarization (SummarizationResources): 要約処理のリソース
+
+    Returns:
+        Optional[Tuple[str, Future]]: ダウンロードしたPDFのパスと要約を受け取る Future（失敗した場合は None）
+    """
+    try:
+        with stage("download"):
+            local_pdf_path = drive_handler.download_pdf_from_drive(file_id)
+        if not local_pdf_path:
+            logger.error("PDFのダウンロードに失敗しました")
+            return None
+        return local_pdf_path, start_pdf_summary(local_pdf_path, summarization)
+    except Exception as e:
+        logger.error(f"エラーが発生しました: {e}")
+        return None
@@ -0,0 +1,217 @@
+# src/modules/pdfSummary/rate_limiter.py
+
+import asyncio
+import random
+import re
+import time
+from typing import Mapping, Optional
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 再試行する HTTP ステータス（レート制限とサーバー側の一時的なエラー）
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# "6m0s"、"1.5s"、"20ms" 形式の期間（x-ratelimit-reset-*）
+DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+def parse_duration(value) -> Optional[float]:
+    """
+    x-ratelimit-reset-* の期間（"6m0s"、"1.5s"、"20ms" など）を秒数に変換します。
+
+    Args:
+        value: ヘッダーの値（未設定の場合は None）
+
+    Returns:
+        Optional[float]: 秒数（解釈できない場合は None）
+    """
+    if value is None:
+        return None
+    parts = DURATION_PATTERN.findall(str(value))
+    if not parts:
+        return None
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    retry-after-ms / Retry-After ヘッダーから、再試行までに待つ秒数を返します（HTTP 日付形式は無視）。
+
+    Args:
+        headers (Optional[Mapping[str, str]]): レスポンスのヘッダー
+
+    Returns:
+        Optional[float]: 秒数（ヘッダーがない場合は None）
+    """
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return None
+
+class RequestTooLargeError(ValueError):
+    """1回のリクエストの見積もりトークン数が TPM の上限を超えている（待っても送信できない）"""
+
+def is_retryable(error: Exception) -> bool:
+    """エラーが再試行で回復しうるもの（レート制限、タイムアウト、接続エラー、5xx）かを判定します。"""
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(error, APIConnectionError):
+        return True
+    if not isinstance(error, APIStatusError) or error.status_code not in RETRYABLE_STATUS_CODES:
+        return False
+    # 1回のリクエストが TPM を超える場合も 429 が返るが、再試行しても成功しない
+    return "request too large" not in str(error).lower()
+
+class RateLimitScheduler:
+    """
+    OpenAI のアカウントの RPM（リクエスト数/分）と TPM（トークン数/分）の上限に合わせてリクエストを送り出すスケジューラー。
+    リクエストごとに見積もったトークン数でトークンバケットから差し引き、足りない場合は回復するまで待ちます。
+    レスポンスの x-ratelimit-* ヘッダーでサーバー側の残量と上限に合わせ、
+    429 などのエラー時は Retry-After（なければジッター付きの指数バックオフ）の間、すべての送信を止めます。
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None, max_retries: int = 6,
+                 retry_base_seconds: float = 1.0, retry_max_seconds: float = 60.0, clock=time.monotonic):
+        """
+        Args:
+            rpm (Optional[int]): 1分あたりのリクエスト数の上限（None の場合はヘッダーで判明するまで制限しない）
+            tpm (Optional[int]): 1分あたりのトークン数の上限（None の場合はヘッダーで判明するまで制限しない）
+            max_retries (int): 1リクエストあたりの再試行回数の上限
+            retry_base_seconds (float): 指数バックオフの初回の待ち時間
+            retry_max_seconds (float): 指数バックオフの待ち時間の上限
+            clock: 現在時刻（秒）を返す関数
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._clock = clock
+        self._requests = float(rpm) if rpm else 0.0
+        self._tokens = float(tpm) if tpm else 0.0
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = {"requests": 0, "retries": 0, "waited_seconds": 0.0}
+
+    def _refill(self) -> None:
+        """経過時間に応じてバケットを回復させます。"""
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60)
+
+    def _wait_seconds(self, tokens: int) -> float:
+        """リクエストを送り出せるまでに待つ秒数を返します（0 の場合はすぐに送信できる）。"""
+        self._refill()
+        wait = self._paused_until - self._clock()
+        if self.rpm:
+            wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+        if self.tpm:
+            wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+        return max(0.0, wait)
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        見積もったトークン数のリクエストを送信できるまで待ち、バケットから差し引きます。
+        待っているリクエストは到着順に送り出します。
+
+        Args:
+            tokens (int): リクエストの見積もりトークン数（入力 + 最大出力トークン数）
+
+        Raises:
+            RequestTooLargeError: 見積もりトークン数が TPM の上限を超えている場合
+        """
+        if self.tpm and tokens > self.tpm:
+            raise RequestTooLargeError(f"リクエストの見積もり {tokens} トークンが TPM の上限 {self.tpm} を超えています。")
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                wait = self._wait_seconds(tokens)
+                if wait <= 0:
+                    break
+                self.stats["waited_seconds"] += wait
+                await asyncio.sleep(wait)
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+            self.stats["requests"] += 1
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        x-ratelimit-* ヘッダーで上限と残量をサーバー側の値に合わせます。
+
+        Args:
+            headers (Optional[Mapping[str, str]]): レスポンスのヘッダー
+        """
+        if not headers:
+            return
+        self._refill()
+        for kind in ("requests", "tokens"):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            try:
+                limit = int(limit) if limit is not None else None
+                remaining = float(remaining) if remaining is not None else None
+            except ValueError:
+                continue
+
+            # 上限はアカウントの実際の値に合わせる（初めて判明した場合はバケットを満タンから始める）
+            if limit and kind == "requests":
+                if self.rpm is None:
+                    self._requests = float(limit)
+                self.rpm = limit
+            elif limit and kind == "tokens":
+                if self.tpm is None:
+                    self._tokens = float(limit)
+                self.tpm = limit
+            if remaining is not None:
+                # ローカルの見積もりよりサーバー側の残量が少ない場合のみ合わせる
+                if kind == "requests" and self.rpm:
+                    self._requests = min(self._requests, remaining)
+                elif kind == "tokens" and self.tpm:
+                    self._tokens = min(self._tokens, remaining)
+                if remaining <= 0:
+                    reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        self.pause(reset)
+
+    def pause(self, seconds: float) -> None:
+        """指定した秒数の間、すべてのリクエストの送信を止めます。"""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def backoff_seconds(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """
+        再試行までに待つ秒数を返します。Retry-After があればそれに小さなジッターを加え、
+        なければ上限付きの指数バックオフにフルジッターを適用します。
+
+        Args:
+            attempt (int): 何回目の再試行か（0 から）
+            headers (Optional[Mapping[str, str]]): エラーのレスポンスのヘッダー
+
+        Returns:
+            float: 秒数
+        """
+        retry_after = retry_after_seconds(headers)
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.retry_base_seconds)
+        return random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+
+    def log_summary(self) -> None:
+        """送信数・再試行数・待ち時間を出力します。"""
+        logger.info(
+            f"レート制限: 送信 {self.stats['requests']} 件、再試行 {self.stats['retries']} 件、"
+            f"待機 {self.stats['waited_seconds']:.1f} 秒（RPM {self.rpm}、TPM {self.tpm}）"
+        )
@@ -0,0 +1,139 @@
+# src/modules/pdfSummary/response_cache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.environment import EnvironmentUtils as env
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class ResponseCache:
+    """
+    OpenAI API の応答を保持するローカル SQLite のキャッシュ。
+    モデル、メッセージ（プロンプトと入力）、温度、最大出力トークン数のハッシュをキーとし、
+    合計サイズが上限を超えた場合は最後に使用した日時が古いものから削除します（LRU）。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_last_used_at ON responses (last_used_at);
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            db_path (Optional[Path]): データベースのパス（デフォルトは [OPENAI] response_cache_path）
+            max_bytes (Optional[int]): キャッシュの最大サイズ（デフォルトは [OPENAI] response_cache_max_mb）
+        """
+        if db_path is None:
+            db_path = Path(env.get_config_value("OPENAI", "response_cache_path", default="data/response_cache.sqlite3"))
+            if not db_path.is_absolute():
+                db_path = env.get_project_root() / db_path
+        if max_bytes is None:
+            max_bytes = int(env.get_config_value("OPENAI", "response_cache_max_mb", default=200) * 1024 * 1024)
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.connection.executescript(self.SCHEMA)
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """
+        リクエストのキャッシュキーを生成します。
+
+        Args:
+            model (str): OpenAI モデル名
+            messages (List[Dict[str, str]]): メッセージ（プロンプトと入力）
+            temperature (float): 温度
+            max_tokens (int): 最大出力トークン数
+
+        Returns:
+            str: キャッシュキー（SHA-256）
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        キャッシュ済みの応答を取得し、最後に使用した日時を更新します。
+
+        Args:
+            key (str): キャッシュキー
+
+        Returns:
+            Optional[str]: 応答（キャッシュにない場合は None）
+        """
+        with self._lock:
+            row = self.connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.connection.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+            self.stats["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """
+        応答をキャッシュに保存し、上限を超えた場合は古いものを削除します。
+
+        Args:
+            key (str): キャッシュキー
+            model (str): OpenAI モデル名
+            response (str): 応答
+        """
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_used_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict()
+            self.connection.commit()
+
+    def _evict(self) -> None:
+        """合計サイズが上限を超えている場合、上限の 90% 以下になるまで最後に使用した日時が古いものから削除します。"""
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * 0.9
+        evicted = []
+        for key, size in self.connection.execute("SELECT key, size FROM responses ORDER BY last_used_at, created_at"):
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.info(f"応答キャッシュから {len(evicted)} 件を削除しました。")
+
+    def log_summary(self) -> None:
+        """キャッシュのヒット数を出力します。"""
+        logger.info(f"応答キャッシュ: ヒット {self.stats['hits']} 件、ミス {self.stats['misses']} 件")
+
+    def close(self) -> None:
+        with self._lock:
+            self.connection.close()
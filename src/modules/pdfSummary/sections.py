@@ -0,0 +1,102 @@
+# src/modules/pdfSummary/sections.py
+
+import re
+from typing import List, Optional, Sequence
+
+import pymupdf
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 要約プロンプト（セグメント成長、新しいトピック、PL概要、市場環境）に必要なセクションの見出し
+RELEVANT_SECTION_KEYWORDS = [
+    "主要な経営指標",
+    "経営方針",
+    "経営成績",
+    "財政状態",
+    "業績",
+    "事業の内容",
+    "セグメント情報",
+    "損益計算書",
+]
+
+# 見出しとみなす行の最大文字数
+MAX_HEADING_LENGTH = 60
+# 見出しを探すページ上部の割合
+HEADING_AREA_RATIO = 0.3
+# 見出しのみで判定した場合に、見出しのあるページに続けて含めるページ数
+HEADING_FOLLOW_PAGES = 2
+# 選択したページがこの割合を超える場合は絞り込みの効果が薄いため全体を使用する
+MAX_SELECTED_RATIO = 0.8
+
+def _keyword_pattern(keywords: Sequence[str]) -> re.Pattern:
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+def _pages_from_toc(toc: list, page_count: int, pattern: re.Pattern) -> List[int]:
+    """
+    PDFのしおり（目次）から、キーワードに一致する見出しのページ範囲を求めます。
+    各見出しの範囲は、同じかより上位の階層の次の見出しが始まるページまで（ページ途中で切り替わるため含める）とします。
+    """
+    pages = set()
+    for index, (level, title, page) in enumerate(toc):
+        if page < 1 or not pattern.search(title):
+            continue
+
+        start = page - 1
+        end = page_count
+        for next_level, _, next_page in toc[index + 1:]:
+            if next_level <= level and next_page >= page:
+                end = next_page
+                break
+        pages.update(range(start, max(end, start + 1)))
+    return sorted(page for page in pages if page < page_count)
+
+def _pages_from_headings(doc, pattern: re.Pattern) -> List[int]:
+    """
+    各ページ上部の短い行からキーワードを含む見出しを探し、そのページと後続のページを選びます。
+    """
+    pages = set()
+    for page in doc:
+        rect = page.rect
+        clip = pymupdf.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * HEADING_AREA_RATIO)
+        lines = page.get_text("text", clip=clip).splitlines()
+        if any(len(line.strip()) <= MAX_HEADING_LENGTH and pattern.search(line) for line in lines):
+            pages.update(range(page.number, min(page.number + 1 + HEADING_FOLLOW_PAGES, doc.page_count)))
+    return sorted(pages)
+
+def locate_relevant_pages(pdf_path, keywords: Optional[Sequence[str]] = None) -> Optional[List[int]]:
+    """
+    要約に必要なセクションのページを特定します。
+    PDFのしおり（目次）を優先し、しおりがない場合はページ上部の見出しから判定します。
+
+    Args:
+        pdf_path (str): PDFファイルのパス。
+        keywords (Optional[Sequence[str]]): 対象セクションの見出しキーワード（デフォルトは RELEVANT_SECTION_KEYWORDS）。
+
+    Returns:
+        Optional[List[int]]: 0始まりのページ番号のリスト。
+            対象セクションが見つからない場合や、絞り込みの効果が薄い場合は None（文書全体を使用）。
+    """
+    pattern = _keyword_pattern(keywords or RELEVANT_SECTION_KEYWORDS)
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            page_count = doc.page_count
+            toc = doc.get_toc(simple=True)
+            pages = _pages_from_toc(toc, page_count, pattern) if toc else []
+            source = "しおり"
+            if not pages:
+                pages = _pages_from_headings(doc, pattern)
+                source = "見出し"
+    except Exception as e:
+        logger.warning(f"セクションの特定に失敗したため、文書全体を使用します: {e}")
+        return None
+
+    if not pages:
+        logger.info("対象セクションが見つからないため、文書全体を使用します。")
+        return None
+    if len(pages) > page_count * MAX_SELECTED_RATIO:
+        logger.info(f"対象セクションが {len(pages)}/{page_count} ページを占めるため、文書全体を使用します。")
+        return None
+
+    logger.info(f"{source}から対象セクションを特定しました: {len(pages)}/{page_count} ページ")
+    return pages
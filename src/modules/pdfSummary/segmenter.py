@@ -0,0 +1,98 @@
+# src/modules/pdfSummary/segmenter.py
+
+import re
+from typing import Iterable, Iterator, List
+
+# 文末とみなす記号（連続する記号と直後の閉じ括弧を含める。英文のピリオドは空白・改行が続く場合のみ文末とする）
+CLOSING_BRACKETS = "」』）)］\\]"
+SENTENCE_END_PATTERN = re.compile(
+    rf"[。！？!?]+[{CLOSING_BRACKETS}]*|(?<=[0-9a-zA-Z)\]])\.[{CLOSING_BRACKETS}]*(?=\s)"
+)
+# 文末記号（と閉じ括弧）で終わるテキスト
+SENTENCE_END_SUFFIX = re.compile(rf"[。！？!?.][{CLOSING_BRACKETS}]*$")
+# 段落の先頭の番号付きの見出し（"1. 概要"）。番号のピリオドは文末としない
+NUMBERED_ITEM_PATTERN = re.compile(r"^[0-9]{1,2}\.\s")
+
+# 箇条書き・見出しの行頭記号（例: "・", "●", "(1)", "①", "1.", "第1", "(a)"）
+BULLET_PATTERN = re.compile(
+    r"^(?:[・●○◎■□◆◇▶▷►※\-\*]|\(\s*[0-9a-zA-Z]{1,3}\s*\)|[①-⑳]|[0-9]{1,2}[.)]\s|第[0-9一二三四五六七八九十]+)"
+)
+# ページをまたいで次のページに持ち越す文の最大文字数（文末記号のない表などが延々と連結されるのを防ぐ）
+MAX_CARRY_CHARS = 2000
+
+ASCII_WORD_END = re.compile(r"[0-9A-Za-z,]$")
+ASCII_WORD_START = re.compile(r"^[0-9A-Za-z]")
+
+def _join_lines(lines: List[str]) -> Iterator[str]:
+    """
+    レイアウト上の改行で分断された行を段落（文の候補）に結合します。
+    空行、箇条書きの行頭記号、文末記号で終わる行の後を区切りとします。
+    """
+    paragraph = ""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if paragraph:
+                yield paragraph
+                paragraph = ""
+            continue
+        if paragraph and (BULLET_PATTERN.match(line) or SENTENCE_END_SUFFIX.search(paragraph)):
+            yield paragraph
+            paragraph = ""
+        if paragraph and ASCII_WORD_END.search(paragraph) and ASCII_WORD_START.match(line):
+            paragraph += " "
+        paragraph += line
+    if paragraph:
+        yield paragraph
+
+def _split_paragraph(paragraph: str) -> Iterator[str]:
+    """段落を文末記号の位置で文に分割します。"""
+    numbered = NUMBERED_ITEM_PATTERN.match(paragraph)
+    marker_end = numbered.end() if numbered else 0
+    start = 0
+    for match in SENTENCE_END_PATTERN.finditer(paragraph):
+        if match.end() <= marker_end:
+            continue
+        yield paragraph[start:match.end()]
+        start = match.end()
+    yield paragraph[start:]
+
+def split_sentences(text: str) -> List[str]:
+    """
+    日本語の文末記号（。！？）、改行、箇条書きの記号を考慮してテキストを文に分割します。
+
+    Args:
+        text (str): 分割するテキスト。
+
+    Returns:
+        List[str]: 文のリスト。
+    """
+    sentences = []
+    for paragraph in _join_lines(text.splitlines()):
+        sentences.extend(part.strip() for part in _split_paragraph(paragraph) if part.strip())
+    return sentences
+
+def iter_page_sentences(pages: Iterable[str]) -> Iterator[List[str]]:
+    """
+    ページ単位のテキストを順に受け取り、ページごとの文のリストを返します。
+    文末記号で終わらないページ末尾の文は、次のページの先頭と結合します。
+
+    Args:
+        pages (Iterable[str]): ページ単位のテキスト。
+
+    Yields:
+        List[str]: ページごとの文のリスト（ページをまたぐ文は次のページに含める）。
+    """
+    remainder = ""
+    for page_text in pages:
+        if not page_text:
+            continue
+        sentences = split_sentences(remainder + "\n" + page_text if remainder else page_text)
+        remainder = ""
+        if sentences and not SENTENCE_END_SUFFIX.search(sentences[-1]) and len(sentences[-1]) <= MAX_CARRY_CHARS:
+            remainder = sentences.pop()
+        if sentences:
+            yield sentences
+
+    if remainder:
+        yield [remainder]
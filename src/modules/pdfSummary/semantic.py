@@ -0,0 +1,90 @@
+# src/modules/pdfSummary/semantic.py
+
+from typing import List, Sequence
+
+import numpy as np
+
+def adjacent_similarities(embeddings, window: int = 1) -> np.ndarray:
+    """
+    隣接する文の間のコサイン類似度を計算します。
+    window が2以上の場合は、境界の前後 window 文の平均ベクトル同士の類似度を計算します（スライディングウィンドウ）。
+
+    Args:
+        embeddings: 文ごとのエンベディング（文数 × 次元）。
+        window (int): 境界の前後で平均する文の数。
+
+    Returns:
+        np.ndarray: 長さ 文数-1 の配列。i 番目は文 i と文 i+1 の間の類似度。
+    """
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    count = len(vectors)
+    if count < 2:
+        return np.zeros(0, dtype=np.float32)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.maximum(norms, 1e-12)
+
+    # 累積和で各境界の前後 window 文の合計ベクトルを一度に求める
+    cumulative = np.vstack([np.zeros((1, vectors.shape[1]), dtype=np.float32), np.cumsum(vectors, axis=0)])
+    gaps = np.arange(1, count)
+    left = cumulative[gaps] - cumulative[np.maximum(gaps - window, 0)]
+    right = cumulative[np.minimum(gaps + window, count)] - cumulative[gaps]
+
+    denominator = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+    return np.einsum("ij,ij->i", left, right) / np.maximum(denominator, 1e-12)
+
+def semantic_chunks(sentences: Sequence[str], token_counts: Sequence[int], similarities: np.ndarray,
+                    max_tokens: int, boundary_percentile: float = 20.0, min_tokens: int = 0) -> List[str]:
+    """
+    類似度が低い境界（話題の切り替わり）でチャンクを区切り、各チャンクを max_tokens 以下にまとめます。
+    上限を超える場合は、現在のチャンク内と次の文との境界のうち、最も類似度が低い境界で区切ります。
+
+    Args:
+        sentences (Sequence[str]): 文のリスト（各文は max_tokens 以下）。
+        token_counts (Sequence[int]): 各文のトークン数。
+        similarities (np.ndarray): adjacent_similarities() の結果。
+        max_tokens (int): チャンクの最大トークン数。
+        boundary_percentile (float): 類似度がこのパーセンタイル以下の境界を話題の切り替わりとみなす。
+        min_tokens (int): 話題の切り替わりで区切る場合の最小トークン数。
+
+    Returns:
+        List[str]: チャンクのリスト。
+    """
+    if not sentences:
+        return []
+    threshold = np.percentile(similarities, boundary_percentile) if len(similarities) else 0.0
+
+    chunks = []
+    current: List[int] = []
+    length = 0
+
+    def flush(indexes: List[int]) -> None:
+        if indexes:
+            chunks.append(" ".join(sentences[index] for index in indexes))
+
+    for index, tokens in enumerate(token_counts):
+        if current and similarities[index - 1] <= threshold and length >= min_tokens:
+            flush(current)
+            current, length = [], 0
+        elif current and length + tokens > max_tokens:
+            # 現在のチャンク内と次の文との境界のうち最も類似度が低い境界で区切り、以降の文は次のチャンクに持ち越す
+            # （position == len(current) は次の文との境界で、現在のチャンクをそのまま確定する）
+            prefix = np.cumsum([token_counts[i] for i in current])
+            candidates = [position for position in range(1, len(current) + 1) if prefix[position - 1] >= min_tokens]
+
+            def boundary_similarity(position: int) -> float:
+                return similarities[current[position] - 1] if position < len(current) else similarities[index - 1]
+
+            split = min(candidates, key=boundary_similarity) if candidates else len(current)
+            flush(current[:split])
+            current = current[split:]
+            length = sum(token_counts[i] for i in current)
+            if current and length + tokens > max_tokens:
+                flush(current)
+                current, length = [], 0
+
+        current.append(index)
+        length += tokens
+
+    flush(current)
+    return chunks
@@ -1,74 +1,221 @@
-import tiktoken
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import itertools
+
+from utils.environment import EnvironmentUtils as env
+from utils.ledger import stage, timed_stage
 from utils.logging_config import get_logger
+from .assets import get_encoding
+from .capabilities import ModelCapabilities, get_model_capabilities
+from .llm_engine import SummaryEngine
 
 logger = get_logger(__name__)
 
+# チャットの1メッセージあたりの書式分のトークン数
+MESSAGE_OVERHEAD_TOKENS = 4
+
 class Summarizer:
-    def __init__(self, client, model, max_summary_tokens, prompt_messages):
-        self.client = client
+    """
+    要約のリクエストを組み立てて SummaryEngine（AsyncOpenAI）で送信します。
+    非同期の asummarize_* を基本とし、既存の呼び出し元のために同期版の summarize_* を提供します。
+    """
+
+    def __init__(self, engine: SummaryEngine, model, max_summary_tokens, prompt_messages,
+                 capabilities: ModelCapabilities = None, map_parallelism: int = None):
+        self.engine = engine
         self.model = model
         self.max_summary_tokens = max_summary_tokens
         self.prompt_messages = prompt_messages
-        self.encoding = tiktoken.encoding_for_model(model)  # tiktoken のエンコーディングを取得
+        self.encoding = get_encoding(model)  # tiktoken のエンコーディングをアセットディレクトリから取得
+        self.capabilities = capabilities or get_model_capabilities(model)
+        # map-reduce 要約でチャンクを同時に要約する数
+        self.map_parallelism = map_parallelism or env.get_config_value("OPENAI", "map_parallelism", default=4)
+
+    def count_message_tokens(self, messages):
+        """チャットのメッセージのトークン数（書式分を含む概算）を返します。"""
+        return sum(len(self.encoding.encode(message["content"])) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+    def input_budget(self, tables_text=None):
+        """
+        プロンプト・財務表・出力の分を差し引いた、1回の呼び出しで本文に使用できるトークン数を返します。
+        TPM の上限が判明している場合は、1回のリクエスト（入力 + 最大出力トークン数）が TPM に収まる数に制限します
+        （TPM を超えるリクエストは待っても送信できず、429 で拒否されるため）。
+        """
+        prompt_tokens = self.count_message_tokens([*self.prompt_messages, *self._table_messages(tables_text)])
+        budget = self.capabilities.input_budget(prompt_tokens)
+        scheduler = getattr(self.engine, "scheduler", None)
+        tpm = scheduler.tpm if scheduler is not None else None
+        if tpm:
+            budget = min(budget, max(0, tpm - prompt_tokens - self.max_summary_tokens - self.capabilities.reserve_tokens))
+        return budget
+
+    def summarize_pages(self, pages, tokenizer, tables_text=None):
+        """asummarize_pages() の同期版。"""
+        return self.engine.run(self.asummarize_pages(pages, tokenizer, tables_text))
+
+    def summarize_chunk(self, chunk, tables_text=None):
+        """asummarize_chunk() の同期版。"""
+        return self.engine.run(self.asummarize_chunk(chunk, tables_text))
+
+    def summarize_text(self, chunks, tables_text=None):
+        """asummarize_text() の同期版。"""
+        return self.engine.run(self.asummarize_text(list(chunks), tables_text))
+
+    async def asummarize_pages(self, pages, tokenizer, tables_text=None):
+        """
+        ページ単位のテキストを、モデルのコンテキストウィンドウに収まる最少の呼び出し回数で要約します。
+        1回の呼び出しに収まる文書はチャンク分割を行わずにそのまま送り、
+        収まらない文書は上限まで詰めたチャンクを並行に要約してから、部分要約を階層的にまとめます（map-reduce）。
+        ページは順に読み込み、保持するのは1回の呼び出しに収まるかを判定する上限までです。
+        上限を超えた場合は、残りのページを読み込みながらチャンクに分割して要約を開始します。
+
+        Args:
+            pages (Iterable[str]): ページ単位のテキスト（抽出しながら返すジェネレーターでもよい）
+            tokenizer (Tokenizer): トークン数のカウントとチャンク分割に使用する Tokenizer
+            tables_text (str, optional): format_tables() で整形した財務表
 
-    def summarize_chunk(self, chunk):
+        Returns:
+            str: 要約
+        """
+        # トークン数のカウントとチャンク分割は CPU 処理のため、イベントループを止めないよう別スレッドで行う
+        budget = self.input_budget(tables_text)
+        pages = (page for page in pages if page)
+        buffered, total_tokens, fits = await asyncio.to_thread(self._read_within_budget, pages, tokenizer, budget)
+        if fits:
+            logger.info(f"本文 {total_tokens} トークンを1回の呼び出しで要約します（上限 {budget}）。")
+            with stage("summarize"):
+                return await self.asummarize_text(buffered, tables_text=tables_text)
+
+        # 部分要約では財務表を渡さないため、チャンクには表の分のトークンも使用できる
+        # （チャンク分割のモードは [CHUNKING] mode の設定に従う）
+        chunker = tokenizer.with_max_chunk_tokens(self.input_budget())
+        chunks = timed_stage("chunk", chunker.iter_chunks(itertools.chain(buffered, pages)))
+        logger.info(
+            f"本文が1回の呼び出しの上限 {budget} トークンを超えるため、チャンクに分けて map-reduce で要約します"
+            f"（並列数 {self.map_parallelism}）。"
+        )
+        with stage("summarize"):
+            summaries = await self.engine.map(self.asummarize_chunk, chunks, limit=self.map_parallelism)
+            return await self._reduce(summaries, tables_text)
+
+    @staticmethod
+    def _read_within_budget(pages, tokenizer, budget):
+        """
+        ページを順に読み込み、トークン数の合計が budget を超えた時点で読み込みを止めます。
+
+        Returns:
+            Tuple[List[str], int, bool]: 読み込んだページ、そのトークン数の合計、文書全体が budget に収まったか
+        """
+        buffered = []
+        total_tokens = 0
+        counted = timed_stage("chunk", ((page, tokenizer.count_tokens(page)) for page in pages))
+        try:
+            for page, token_count in counted:
+                buffered.append(page)
+                total_tokens += token_count
+                if total_tokens > budget:
+                    return buffered, total_tokens, False
+            return buffered, total_tokens, True
+        finally:
+            counted.close()
+
+    async def asummarize_chunk(self, chunk, tables_text=None):
         """
         単一のチャンクを要約します。
         """
         logger.info("チャンクを要約します。")
         try:
-            response = self.client.chat.completions.create(
+            messages = [
+                *self.prompt_messages,  # プロンプトメッセージを適用
+                *self._table_messages(tables_text),
+                {"role": "user", "content": chunk}
+            ]
+            summary = await self.engine.complete(
                 model=self.model,
-                messages=[
-                    *self.prompt_messages,  # プロンプトメッセージを適用
-                    {"role": "user", "content": chunk}
-                ],
+                messages=messages,
                 max_tokens=self.max_summary_tokens,
-                temperature=0.7
+                temperature=0.7,
+                input_tokens=self.count_message_tokens(messages)
             )
-            summary = response.choices[0].message.content.strip()
             logger.debug(f"要約結果: {summary[:100]}...")
             return summary
         except Exception as e:
             logger.error(f"チャンクの要約に失敗しました: {e}")
             raise
 
-    def summarize_text(self, chunks):
+    def _table_messages(self, tables_text):
+        """抽出済みの財務表を、本文の前に渡すメッセージに変換します。"""
+        if not tables_text:
+            return []
+        return [{
+            "role": "user",
+            "content": "以下はPDFの表から抽出した財務数値です。冒頭フォーマットの数値はこの表を優先して使用してください。\n\n" + tables_text
+        }]
+
+    async def asummarize_text(self, chunks, tables_text=None):
         """
         複数のチャンクをまとめて要約。
+
+        Args:
+            chunks (List[str]): 本文のチャンク
+            tables_text (str, optional): format_tables() で整形した財務表
         """
         logger.info("複数チャンクをまとめて要約します。")
         try:
-            response = self.client.chat.completions.create(
+            messages = [
+                *self.prompt_messages,
+                *self._table_messages(tables_text),
+                {"role": "user", "content": "\n\n".join(chunks)}
+            ]
+            summary = await self.engine.complete(
                 model=self.model,
-                messages=[
-                    *self.prompt_messages,
-                    {"role": "user", "content": "\n\n".join(chunks)}
-                ],
+                messages=messages,
                 max_tokens=self.max_summary_tokens,
-                temperature=0.7
+                temperature=0.7,
+                input_tokens=self.count_message_tokens(messages)
             )
-            summary = response.choices[0].message.content.strip()
             logger.info("要約完了。")
             return summary
         except Exception as e:
             logger.error(f"要約全体の処理に失敗しました: {e}")
             raise
 
-    def _summarize_recursive(self, summaries):
+    async def _map(self, texts):
         """
-        部分要約が長すぎる場合、さらに分割して再要約します。
+        複数のテキストを並行に要約し、入力と同じ順序で返します。
+        1文書あたりの同時実行数は map_parallelism、プロセス全体の上限は SummaryEngine のセマフォで制限されます。
         """
-        combined_summary = " ".join(summaries)
-        token_count = len(self.encoding.encode(combined_summary))  # トークン数を計算
+        return await self.engine.gather([self.asummarize_chunk(text) for text in texts], limit=self.map_parallelism)
 
-        if token_count <= self.max_summary_tokens:
-            return self.summarize_chunk(combined_summary)  # トークン数内なら要約
+    def _group_summaries(self, summaries):
+        """部分要約を、1回の呼び出しに収まる（財務表なしの上限）グループに順にまとめます。"""
+        budget = self.input_budget()
+        groups = []
+        current, current_tokens = [], 0
+        for summary in summaries:
+            tokens = len(self.encoding.encode(summary))
+            if current and current_tokens + tokens > budget:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
 
-        logger.info("再要約のため、要約をさらに分割します。")
-        midpoint = len(summaries) // 2
-        left_summary = self._summarize_recursive(summaries[:midpoint])
-        right_summary = self._summarize_recursive(summaries[midpoint:])
+    async def _reduce(self, summaries, tables_text=None):
+        """
+        部分要約をまとめて要約します。1回の呼び出しに収まらない場合は、
+        収まるグループごとに並行に再要約し、1回に収まるまで階層的に繰り返します。
+        """
+        while True:
+            combined_summary = "\n\n".join(summaries)
+            token_count = len(self.encoding.encode(combined_summary))  # トークン数を計算
+            if token_count <= self.input_budget(tables_text) or len(summaries) == 1:
+                return await self.asummarize_chunk(combined_summary, tables_text)  # トークン数内なら要約
 
-        return self.summarize_chunk(f"{left_summary} {right_summary}")
+            groups = self._group_summaries(summaries)
+            if len(groups) == len(summaries):
+                # 1件ずつしか収まらない場合も、2件ずつまとめて件数を減らす
+                groups = [summaries[index:index + 2] for index in range(0, len(summaries), 2)]
+            logger.info(f"再要約のため、{len(summaries)} 件の要約を {len(groups)} グループに分けて要約します。")
+            summaries = await self._map(["\n\n".join(group) for group in groups])
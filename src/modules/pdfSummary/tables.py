@@ -0,0 +1,139 @@
+# src/modules/pdfSummary/tables.py
+
+import re
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import pymupdf
+from utils.logging_config import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+# 要約の冒頭フォーマットで使用する財務数値の項目名
+FINANCIAL_TABLE_KEYWORDS = ["売上高", "営業利益", "経常利益"]
+
+# 表を探すページ数の上限（サマリー表は文書の先頭付近にあるため、全ページは走査しない）
+DEFAULT_SCAN_PAGES = 10
+# 要約に渡す表の上限数
+DEFAULT_MAX_TABLES = 5
+# 見出しのない列に PyMuPDF が付ける列名（Col1, Col2, ...）
+PLACEHOLDER_COLUMN_PATTERN = re.compile(r"Col\d+")
+
+def _clean_cell(value) -> str:
+    if value is None:
+        return ""
+    return " ".join(str(value).split())
+
+def _clean_table(df: "pd.DataFrame") -> "pd.DataFrame":
+    """セル内の改行・空白を詰め、空の行と列を削除します。"""
+    df = df.map(_clean_cell)
+    df.columns = [_clean_cell(column) for column in df.columns]
+    df = df.loc[(df != "").any(axis=1), [(df[column] != "").any() for column in df.columns]]
+    return df.reset_index(drop=True)
+
+def _contains_keyword(df: "pd.DataFrame", keywords: Sequence[str]) -> bool:
+    text = " ".join(df.columns) + " " + " ".join(df.to_numpy().ravel())
+    return any(keyword in text for keyword in keywords)
+
+def extract_financial_tables(pdf_path, pages: Optional[List[int]] = None,
+                             keywords: Optional[Sequence[str]] = None,
+                             scan_pages: int = DEFAULT_SCAN_PAGES,
+                             max_tables: int = DEFAULT_MAX_TABLES) -> List["pd.DataFrame"]:
+    """
+    PyMuPDF の表検出を使用して、財務数値（売上高、営業利益、経常利益）を含む表を DataFrame として抽出します。
+
+    Args:
+        pdf_path (str): PDFファイルのパス。
+        pages (Optional[List[int]]): 表を探す0始まりのページ番号（デフォルトは全ページ）。
+        keywords (Optional[Sequence[str]]): 対象とする表の項目名（デフォルトは FINANCIAL_TABLE_KEYWORDS）。
+        scan_pages (int): 表を探すページ数の上限。
+        max_tables (int): 抽出する表の上限数。
+
+    Returns:
+        List[pd.DataFrame]: 抽出した表（ページ順）。各 DataFrame の attrs["page"] に1始まりのページ番号、
+            attrs["bbox"] にページ上の表の領域を持ちます。
+    """
+    keywords = keywords or FINANCIAL_TABLE_KEYWORDS
+    tables = []
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            page_numbers = list(range(doc.page_count)) if pages is None else list(pages)
+            for page_num in page_numbers[:scan_pages]:
+                for table in doc[page_num].find_tables().tables:
+                    df = _clean_table(table.to_pandas())
+                    if df.empty or not _contains_keyword(df, keywords):
+                        continue
+                    df.attrs["page"] = page_num + 1
+                    df.attrs["bbox"] = list(table.bbox)
+                    tables.append(df)
+                    if len(tables) >= max_tables:
+                        break
+                if len(tables) >= max_tables:
+                    break
+    except Exception as e:
+        # 表の抽出は補助的な情報のため、失敗しても要約処理は継続する
+        logger.warning(f"表の抽出に失敗しました: {e}")
+        return []
+
+    logger.info(f"財務数値を含む表を {len(tables)} 件抽出しました。")
+    return tables
+
+def table_label(index: int, df: "pd.DataFrame") -> str:
+    """表の見出し（format_tables() の出力と本文中の表の位置で共通）。"""
+    return f"[表{index} p.{df.attrs.get('page', '?')}]"
+
+def page_text_without_tables(pdf_path, page_num: int, regions: Sequence[Tuple[str, Sequence[float]]]) -> str:
+    """
+    表の領域を除いたページのテキストを返します。
+    表は format_tables() で別途要約に渡すため、本文から除いて同じ数値を二重に送らないようにし、
+    表があった位置には見出し（[表1 p.2] など）を置きます。
+
+    Args:
+        pdf_path (str): PDFファイルのパス。
+        page_num (int): 0始まりのページ番号。
+        regions (Sequence[Tuple[str, Sequence[float]]]): 表の見出しと領域 (x0, y0, x1, y1) のリスト。
+
+    Returns:
+        str: ページのテキスト。
+    """
+    with pymupdf.open(pdf_path) as doc:
+        page = doc[page_num]
+        # 保存はしないため、開いたドキュメント上で表の文字のみを削除する
+        for _, bbox in regions:
+            page.add_redact_annot(pymupdf.Rect(bbox))
+        page.apply_redactions(images=pymupdf.PDF_REDACT_IMAGE_NONE, graphics=pymupdf.PDF_REDACT_LINE_ART_NONE)
+        blocks = [block for block in page.get_text("blocks") if block[6] == 0]
+
+    # 見出しは表の上端より下から始まる最初のブロックの前に置く（ブロックの順序は get_text() と同じ）
+    pending = sorted(regions, key=lambda region: region[1][1])
+    parts = []
+    for x0, y0, x1, y1, text, *_ in blocks:
+        while pending and pending[0][1][1] <= y0:
+            parts.append(pending.pop(0)[0] + "\n")
+        parts.append(text)
+    parts.extend(label + "\n" for label, _ in pending)
+    return "".join(parts)
+
+def format_tables(tables: List["pd.DataFrame"]) -> str:
+    """
+    抽出した表を、要約に渡すためのトークン数の少ないテキストに整形します。
+    各行を「|」区切りで1行に出力します（PyMuPDF が付けた仮の列名は出力しません）。
+
+    Args:
+        tables (List[pd.DataFrame]): 抽出した表。
+
+    Returns:
+        str: 整形したテキスト（表がない場合は空文字）。
+    """
+    blocks = []
+    for index, df in enumerate(tables, start=1):
+        lines = [table_label(index, df)]
+        # 見出しのない列は空欄にして列の位置を保ち、すべての列に見出しがない場合は見出し行を出力しない
+        header = ["" if PLACEHOLDER_COLUMN_PATTERN.fullmatch(column) else column for column in df.columns]
+        if any(header):
+            lines.append("|".join(header))
+        lines.extend("|".join(row) for row in df.itertuples(index=False, name=None))
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
@@ -1,14 +1,47 @@
-from sentence_transformers import SentenceTransformer, util
-import tiktoken
+import copy
+from typing import Iterable, Iterator, List, Optional, Tuple
+from utils.environment import EnvironmentUtils as env
 from utils.logging_config import get_logger
+from .assets import get_encoding
+from .embeddings import get_embedding_service
+from .segmenter import iter_page_sentences, split_sentences
+from .semantic import adjacent_similarities, semantic_chunks
 
 logger = get_logger(__name__)
 
+# チャンク分割のモード（length: トークン数のみで分割 / semantic: センテンスエンベディングを使用）
+CHUNKING_MODES = ("length", "semantic")
+
+def get_chunking_mode() -> str:
+    """settings.ini の [CHUNKING] mode を返します。"""
+    mode = str(env.get_config_value("CHUNKING", "mode", default="length")).lower()
+    if mode not in CHUNKING_MODES:
+        raise ValueError(f"[CHUNKING] mode は {', '.join(CHUNKING_MODES)} のいずれかを指定してください: {mode}")
+    return mode
+
 class Tokenizer:
-    def __init__(self, model, max_chunk_tokens):
-        self.encoding = tiktoken.encoding_for_model(model)
+    def __init__(self, model, max_chunk_tokens, mode: Optional[str] = None):
+        # エンコーディングはアセットディレクトリから読み込む
+        self.encoding = get_encoding(model)
         self.max_chunk_tokens = max_chunk_tokens
-        self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')  # センテンスエンベディングモデル
+        self.mode = mode or get_chunking_mode()
+
+    def with_max_chunk_tokens(self, max_chunk_tokens, mode: Optional[str] = None) -> "Tokenizer":
+        """
+        エンコーディングを共有したまま、チャンクの上限トークン数（とモード）を変更した Tokenizer を返します。
+        """
+        tokenizer = copy.copy(self)
+        tokenizer.max_chunk_tokens = max_chunk_tokens
+        tokenizer.mode = mode or self.mode
+        return tokenizer
+
+    @property
+    def embedding_service(self):
+        """
+        センテンスエンベディングを計算するサービス（プロセス内で共有）。
+        semantic モードで初めて使用するときに生成し、モデルもその時点で読み込まれます。
+        """
+        return get_embedding_service()
 
     def count_tokens(self, text):
         """テキスト内のトークン数をカウントします。"""
@@ -16,34 +49,133 @@ class Tokenizer:
         logger.debug(f"トークン数: {token_count}")
         return token_count
 
-    def split_text_into_chunks(self, text):
-        """意味的に近いまとまりでテキストを分割します。"""
-        logger.info("テキストを意味的に分割します。")
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        複数のテキストのトークン数を、tiktoken のバッチエンコーダーで1回の呼び出しにまとめてカウントします。
 
-        # テキストを文単位に分割
-        sentences = [sentence.strip() for sentence in text.split(".") if sentence.strip()]
-        
-        # 各文をエンコードしてセンテンスエンベディングを取得
-        embeddings = self.sentence_model.encode(sentences, convert_to_tensor=True)
+        Args:
+            texts (List[str]): テキストのリスト
+
+        Returns:
+            List[int]: 各テキストのトークン数
+        """
+        if not texts:
+            return []
+        return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+
+    def _fit_sentences(self, sentences: List[str]) -> Iterator[Tuple[str, int]]:
+        """
+        文とトークン数の組を返します。max_chunk_tokens を超える文（文末記号のない表など）は分割します。
+        """
+        for sentence, token_count in zip(sentences, self.count_tokens_batch(sentences)):
+            if token_count <= self.max_chunk_tokens:
+                yield sentence, token_count
+                continue
+
+            # トークン数に比例した文字数で分割し、分割後のトークン数を数え直す
+            parts = -(-token_count // self.max_chunk_tokens)
+            size = -(-len(sentence) // parts)
+            pieces = [sentence[index:index + size] for index in range(0, len(sentence), size)]
+            for piece, piece_count in zip(pieces, self.count_tokens_batch(pieces)):
+                if piece_count <= self.max_chunk_tokens or len(piece) <= 1:
+                    yield piece, piece_count
+                else:
+                    yield from self._fit_sentences([piece])
+
+    def iter_sentences(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        ページ単位のテキストを順に受け取り、文単位に分割して返します。
+        ページをまたぐ文は次のページの先頭と結合します。
+
+        Args:
+            pages (Iterable[str]): ページ単位のテキスト
 
-        # 意味的に近い文をグループ化する
-        clusters = []
-        current_cluster = []
-        current_cluster_length = 0
+        Yields:
+            str: 文
+        """
+        for sentences in iter_page_sentences(pages):
+            yield from sentences
 
-        for i, sentence in enumerate(sentences):
-            sentence_tokens = self.count_tokens(sentence)
+    def _pack(self, sentences: Iterable[Tuple[str, int]]) -> Iterator[str]:
+        """トークン数付きの文を、max_chunk_tokens を超えないチャンクにまとめます。"""
+        current_chunk = []
+        current_chunk_length = 0
 
-            if current_cluster_length + sentence_tokens > self.max_chunk_tokens:
-                clusters.append(" ".join(current_cluster))
-                current_cluster = []
-                current_cluster_length = 0
+        for sentence, sentence_tokens in sentences:
+            if current_chunk and current_chunk_length + sentence_tokens > self.max_chunk_tokens:
+                yield " ".join(current_chunk)
+                current_chunk = []
+                current_chunk_length = 0
 
-            current_cluster.append(sentence)
-            current_cluster_length += sentence_tokens
+            current_chunk.append(sentence)
+            current_chunk_length += sentence_tokens
+
+        if current_chunk:
+            yield " ".join(current_chunk)
+
+    def _semantic_chunks(self, sentences: List[Tuple[str, int]]) -> List[str]:
+        """
+        センテンスエンベディングの類似度が下がる箇所（話題の切り替わり）でチャンクを区切ります。
+        """
+        if not sentences:
+            return []
+        texts = [sentence for sentence, _ in sentences]
+        embeddings = self.embedding_service.embed(texts)
+        window = env.get_config_value("CHUNKING", "similarity_window", default=2)
+        similarities = adjacent_similarities(embeddings, window=window)
+        return semantic_chunks(
+            texts,
+            [token_count for _, token_count in sentences],
+            similarities,
+            max_tokens=self.max_chunk_tokens,
+            boundary_percentile=env.get_config_value("CHUNKING", "boundary_percentile", default=20),
+            min_tokens=self.max_chunk_tokens // 4,
+        )
+
+    def iter_chunks(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        ページ単位のテキストを順に受け取り、トークン数の上限に達したチャンクから順に返します。
+        length モードではテキスト全体を保持しないため、文書の長さによらずメモリ使用量は一定です。
+        semantic モードでは全文のエンベディングから区切りを決めるため、文をすべて読み込んでから返します。
+        トークン数はページごとにまとめてカウントします。
+
+        Args:
+            pages (Iterable[str]): ページ単位のテキスト
+
+        Yields:
+            str: チャンク
+        """
+        sentences = (
+            fitted
+            for page_sentences in iter_page_sentences(pages)
+            for fitted in self._fit_sentences(page_sentences)
+        )
+        if self.mode == "semantic":
+            chunks = iter(self._semantic_chunks(list(sentences)))
+        else:
+            chunks = self._pack(sentences)
+
+        chunk_count = 0
+        for chunk in chunks:
+            chunk_count += 1
+            yield chunk
+
+        logger.info(f"分割されたチャンク数: {chunk_count}")
+
+    def split_text_into_chunks(self, text):
+        """意味的に近いまとまりでテキストを分割します。"""
+        logger.info("テキストを意味的に分割します。")
+
+        # テキストを文単位に分割
+        sentences = split_sentences(text)
 
-        if current_cluster:
-            clusters.append(" ".join(current_cluster))
+        # semantic モードの場合は、センテンスエンベディングの類似度で意味的に近い文をグループ化する
+        # （トークン数は全文をまとめてカウント）
+        fitted = list(self._fit_sentences(sentences))
+        if self.mode == "semantic":
+            clusters = self._semantic_chunks(fitted)
+        else:
+            clusters = list(self._pack(fitted))
 
         logger.info(f"分割されたチャンク数: {len(clusters)}")
         return clusters
@@ -1,74 +1,162 @@
 # spreadsheet_to_edinet.py
 
 from datetime import datetime
+from typing import List, Optional, Tuple
 from utils.environment import EnvironmentUtils as env
 from utils.spreadsheet import SpreadsheetService
+from modules.app_context import AppContext
 from modules.edinet.operations import EDINETOperations
-from modules.pdfSummary.process_drive_file import process_drive_file
-from utils.drive_handler import DriveHandler
 from utils.date_utils import parse_date_string
-from modules.slack.slack_notify import SlackNotifier
+from utils.ledger import stage
 
 from utils.logging_config import get_logger
 
 # 名前付きロガーを取得
 logger = get_logger(__name__)
 
-def log_download_to_sheet(spreadsheet_service, spreadsheet_id, log_sheet_name, log_data):
+# log シートのデフォルトヘッダー
+LOG_HEADERS = [
+    'Release_Date',
+    'EDINET_code',
+    'stock_code',
+    'corp_name',
+    'doc_type',
+    'drive_raw_data_file_name',
+    'drive_raw_data_file_url',
+    'drive_summary_file_urls',
+    'timestamp',
+    'doc_id',
+]
+
+def prepare_log_sheet(spreadsheet_service, spreadsheet_id, log_sheet_name) -> List[List[str]]:
     """
-    ダウンロードしたデータをログシートに記録する。
-    ヘッダーを動的に取得し、列を特定して操作する。
+    ログシートを1度だけ読み込み、ヘッダーを整備してシートデータを返す。
+    空のシートにはデフォルトのヘッダーを書き込み、既存のシートに不足している列はヘッダー末尾に追加する。
     """
     try:
         sheet_data = spreadsheet_service.get_sheet_data(spreadsheet_id, log_sheet_name)
 
         if not sheet_data:
             logger.info(f"Log sheet '{log_sheet_name}' is empty. Initializing headers.")
-            # デフォルトのヘッダーを使用して初期化
-            default_headers = [
-                'Release_Date',
-                'EDINET_code',
-                'stock_code',
-                'corp_name',
-                'doc_type',
-                'drive_raw_data_file_name',
-                'drive_raw_data_file_url',
-                'drive_summary_file_urls',  # 新しいカラムを追加
-                'timestamp'
-            ]
             spreadsheet_service.update_sheet_data(
-                spreadsheet_id, log_sheet_name, [default_headers]
+                spreadsheet_id, log_sheet_name, [LOG_HEADERS]
             )
-            sheet_data = [default_headers]
+            return [list(LOG_HEADERS)]
 
-        # ヘッダー行を取得
         headers = sheet_data[0]
-        logger.info(f"Retrieved headers: {headers}")
+        missing_headers = [header for header in LOG_HEADERS if header not in headers]
+        if missing_headers:
+            logger.info(f"Adding missing headers to log sheet '{log_sheet_name}': {missing_headers}")
+            start_column = SpreadsheetService.column_letter(len(headers))
+            spreadsheet_service.update_sheet_data(
+                spreadsheet_id, f"{log_sheet_name}!{start_column}1", [missing_headers]
+            )
+            headers.extend(missing_headers)
 
-        # データ行を追加
-        logger.info(f"Appending log data to sheet '{log_sheet_name}'.")
-        spreadsheet_service.append_sheet_data(
-            spreadsheet_id, log_sheet_name, log_data
-        )
-        logger.info("Log data appended successfully.")
+        logger.info(f"Retrieved headers: {headers}")
+        return sheet_data
     except Exception as e:
-        logger.error(f"Failed to append log data to sheet '{log_sheet_name}': {e}")
+        logger.error(f"Failed to prepare log sheet '{log_sheet_name}': {e}")
         raise
 
-def process_spreadsheet_data(config):
+def record_and_notify(context: AppContext, log_sheet_name: str, log_headers: List[str], document: dict,
+                      summary_file_ids: List[str]) -> None:
+    """
+    処理した文書を log シート（ローカルのログストア経由）に記録し、要約を Slack に通知する。
+
+    Args:
+        context (AppContext): 実行中に共有するリソース
+        log_sheet_name (str): log シートの名前
+        log_headers (List[str]): log シートのヘッダー
+        document (dict): アップロード済みの文書の情報（release_date、edinet_code、file_id など）
+        summary_file_ids (List[str]): 要約ファイルの Google Drive ID
+    """
+    drive_handler = context.drive_handler
+    summary_urls = [f"https://drive.google.com/file/d/{fid}/view" for fid in summary_file_ids]
+
+    # ログデータの作成と記録
+    file_url = f"https://drive.google.com/file/d/{document['file_id']}/view"
+    log_record = {
+        'Release_Date': document['release_date'],
+        'EDINET_code': document['edinet_code'],
+        'stock_code': document['stock_code'],
+        'corp_name': document['corp_name'],
+        'doc_type': document['doc_type'],
+        'drive_raw_data_file_name': document['file_name'],
+        'drive_raw_data_file_url': file_url,
+        'drive_summary_file_urls': ", ".join(summary_urls),
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'doc_id': document['doc_id'],
+    }
+    context.run_log_store.record(log_record)
+    context.run_log_store.sync_to_sheet(context.spreadsheet_service, context.spreadsheet_id, log_sheet_name, log_headers)
+    logger.info(f"File uploaded to Drive with URL: {file_url}")
+
+    # Slack通知の処理を追加
+    if summary_file_ids:
+        slack_channel = env.get_config_value("SLACK", "channel_id")
+        with stage("notify"):
+            for summary_file_id in summary_file_ids:
+                try:
+                    markdown_content = drive_handler.get_file_content(summary_file_id)
+                    context.slack_notifier.send_formatted_markdown(
+                        slack_channel, markdown_content, document['ir_page_url']
+                    )
+                    logger.info(f"Slackに要約を送信しました。ファイル ID: {summary_file_id}")
+                except Exception as e:
+                    logger.error(f"Slack通知中にエラーが発生しました（ファイル ID: {summary_file_id}）: {e}")
+    else:
+        logger.warning("要約ファイルがないため、Slack通知は行いませんでした。")
+
+def finish_document(context: AppContext, log_sheet_name: str, log_headers: List[str], document: dict,
+                    started: Optional[Tuple]) -> None:
+    """
+    要約の完了を待って Google Drive に保存し、log シートへの記録と Slack 通知を行う。
+
+    Args:
+        context (AppContext): 実行中に共有するリソース
+        log_sheet_name (str): log シートの名前
+        log_headers (List[str]): log シートのヘッダー
+        document (dict): アップロード済みの文書の情報
+        started (Optional[Tuple]): start_drive_file() の戻り値（PDFのパスと要約の Future、失敗した場合は None）
+    """
+    from modules.pdfSummary.pdf_main import save_summary
+
+    with context.ledger.document(document['doc_id']):
+        summary_file_ids = []
+        if started is not None:
+            pdf_path, future = started
+            try:
+                summary = future.result()
+                with stage("save"):
+                    summary_file_ids = save_summary(pdf_path, summary, document['folder_id'], context.drive_handler)
+            except Exception as e:
+                logger.error(f"Failed to summarize PDF: {e}")
+
+        record_and_notify(context, log_sheet_name, log_headers, document, summary_file_ids)
+
+def process_spreadsheet_data(config, context: AppContext = None, batch: bool = False):
     """
     スプレッドシートデータを基に EDINET API を呼び出し、結果を Google Drive に直接保存。
     結果を log シートに記録し、要約を Slack に通知。
+
+    Args:
+        config (EDINETConfig): EDINETの設定
+        context (AppContext, optional): 実行中に共有するリソース。指定しない場合は新たに生成します。
+        batch (bool): True の場合、全文書のアップロード後に OpenAI の Batch API でまとめて要約する（過去分の取り込み用）。
+            アップロード済みの文書と送信済みのバッチは状態ファイルに記録し、中断した場合は次回の実行で再開する。
     """
     try:
         # 環境変数と設定ファイルのロード
         env.load_env()
 
-        # サービス初期化
-        spreadsheet_service = SpreadsheetService()
+        # サービス初期化（既存のコンテキストがあれば使用）
+        if context is None:
+            context = AppContext(config)
+        spreadsheet_service = context.spreadsheet_service
 
         # スプレッドシートIDとログシート名を取得
-        spreadsheet_id = spreadsheet_service.get_spreadsheet_id("SPREADSHEET", "ss_id_list")
+        spreadsheet_id = context.spreadsheet_id
         log_sheet_name = "log"
 
         # 日付範囲を取得
@@ -80,46 +168,48 @@ def process_spreadsheet_data(config):
             logger.error(f"Invalid date range configuration: {e}")
             raise
 
-        # SlackNotifier の初期化
-        slack_notifier = SlackNotifier(env_path="config/secrets.env")
-        # Slack チャンネル名を設定ファイルから取得
-        slack_channel = env.get_config_value("SLACK", "channel_id")
-
-        # list シートのデータを取得
-        list_data = spreadsheet_service.get_sheet_data(spreadsheet_id, "list")
-        if not list_data:
-            logger.error("No data found in the 'list' sheet.")
-            return
+        # log シートを起動時に1度だけ読み込み、ローカルのログストアに取り込む
+        log_sheet_data = prepare_log_sheet(spreadsheet_service, spreadsheet_id, log_sheet_name)
+        log_headers = log_sheet_data[0]
+        run_log_store = context.run_log_store
+        run_log_store.import_sheet_rows(log_sheet_data)
+        # 前回の実行で同期できなかった行を追記
+        run_log_store.sync_to_sheet(spreadsheet_service, spreadsheet_id, log_sheet_name, log_headers)
 
-        headers = list_data[0]
-        data_rows = list_data[1:]
-        if "EDINET_code" not in headers or "ir_page_url" not in headers or "check" not in headers:
-            logger.error("'EDINET_code', 'ir_page_url', or 'check' column not found in the 'list' sheet.")
-            return
+        # list シートのデータを取得（実行中に1度だけ取得したスナップショット）
+        list_snapshot = context.list_snapshot
 
-        # 必要な列のインデックスを取得
-        edinet_code_index = headers.index("EDINET_code")
-        ir_page_url_index = headers.index("ir_page_url")
-        check_index = headers.index("check")
-
-        edinet_operations = EDINETOperations()
+        edinet_operations = context.edinet_operations
+        parent_folder_id = env.get_config_value("DRIVE", "parent_folder_id")
 
         # DriveHandler の初期化
-        service_account_file = env.get_service_account_file()
-        drive_handler = DriveHandler(str(service_account_file))
-
-        for row_index, row in enumerate(data_rows, start=2):
+        drive_handler = context.drive_handler
+        ledger = context.ledger
+
+        # 取得・アップロードは文書ごとに順に行い、要約は完了を待たずに次の文書へ進む（要約の API 呼び出しのみを重ねる）
+        pending = []
+        pipeline_documents = max(1, env.get_config_value("OPENAI", "pipeline_documents", default=4))
+
+        # バッチモードでは要約待ちの文書を状態ファイルに記録する（前回中断した文書はアップロードをやり直さない）
+        batch_state = None
+        if batch:
+            from modules.pdfSummary.batch import BatchState
+            batch_state = BatchState()
+            if batch_state.documents:
+                logger.info(f"前回のバッチモードの実行から {len(batch_state.documents)} 件の要約待ちの文書を再開します。")
+
+        for row in list_snapshot.rows:
+            row_index = row.row_number
             # `check`列がTRUEでない場合はスキップ
-            check_value = row[check_index] if check_index < len(row) else "FALSE"
-            if check_value.upper() != "TRUE":
+            if not row.checked:
                 logger.info(f"Skipping row {row_index}: check value is not TRUE.")
                 continue
 
             # 必要なデータを取得
-            edinet_code = row[edinet_code_index]
-            stock_code = row[headers.index("stock_code")] if "stock_code" in headers else ""
-            corp_name = row[headers.index("corp_name")] if "corp_name" in headers else ""
-            ir_page_url = row[ir_page_url_index] if ir_page_url_index < len(row) else ""
+            edinet_code = row.edinet_code
+            stock_code = row.stock_code
+            corp_name = row.corp_name
+            ir_page_url = row.ir_page_url
 
             logger.info(f"Processing row {row_index}: EDINET_code = {edinet_code}")
 
@@ -134,80 +224,93 @@ def process_spreadsheet_data(config):
 
                 for document in documents:
                     doc_id = document.get("docID")
-                    doc_type_code = document.get("docTypeCode")
-                    release_date = document.get("submitDateTime").split(" ")[0]
-                    doc_type_name = EDINETOperations.TARGET_DOC_TYPES.get(doc_type_code, "不明")
-
-                    # ファイル名生成
-                    file_name = f"{edinet_code}_{doc_id}_{release_date.replace('-', '')}.pdf"
+                    if run_log_store.is_processed(doc_id):
+                        logger.info(f"Skipping already processed document: ID={doc_id}")
+                        continue
+                    if batch_state is not None and doc_id in batch_state.documents:
+                        logger.info(f"Skipping document already uploaded for batch: ID={doc_id}")
+                        continue
+
+                    # 文書ごとのトークン数・費用・ステージごとの処理時間をレジャーに記録する
+                    with ledger.document(doc_id):
+                        doc_type_code = document.get("docTypeCode")
+                        release_date = document.get("submitDateTime").split(" ")[0]
+                        doc_type_name = EDINETOperations.TARGET_DOC_TYPES.get(doc_type_code, "不明")
+
+                        # ファイル名生成
+                        file_name = f"{edinet_code}_{doc_id}_{release_date.replace('-', '')}.pdf"
+
+                        # フォルダの取得または作成
+                        with stage("upload"):
+                            folder_id = drive_handler.get_or_create_folder(
+                                folder_name=edinet_code,
+                                parent_folder_id=parent_folder_id
+                            )
+
+                        # ドキュメントデータを取得
+                        with stage("fetch"):
+                            doc_data = edinet_operations.fetch_document_data(doc_id, doc_type_code)
+
+                        if doc_data:
+                            # Google Drive にアップロード
+                            with stage("upload"):
+                                file_id = drive_handler.upload_file(
+                                    file_name=file_name,
+                                    file_content=doc_data,
+                                    folder_id=folder_id
+                                )
+
+                            uploaded = {
+                                'doc_id': doc_id,
+                                'release_date': release_date,
+                                'edinet_code': edinet_code,
+                                'stock_code': stock_code,
+                                'corp_name': corp_name,
+                                'doc_type': doc_type_name,
+                                'file_name': file_name,
+                                'file_id': file_id,
+                                'folder_id': folder_id,
+                                'ir_page_url': ir_page_url,
+                            }
+                            if batch_state is not None:
+                                # 要約・記録・通知は全文書のアップロード後にまとめて行う
+                                batch_state.add_document(doc_id, uploaded)
+                                continue
+
+                            # PDFの要約を開始（保存・記録・通知は要約の完了後に文書の順に行う）
+                            from modules.pdfSummary.process_drive_file import start_drive_file
+                            started = start_drive_file(file_id, drive_handler, context.summarization)
+                            pending.append((uploaded, started))
+                            while len(pending) >= pipeline_documents:
+                                finish_document(context, log_sheet_name, log_headers, *pending.pop(0))
 
-                    # フォルダの取得または作成
-                    folder_id = drive_handler.get_or_create_folder(
-                        folder_name=edinet_code,
-                        parent_folder_id=env.get_config_value("DRIVE", "parent_folder_id")
-                    )
-
-                    # ドキュメントデータを取得
-                    doc_data = edinet_operations.fetch_document_data(doc_id, doc_type_code)
-
-                    if doc_data:
-                        # Google Drive にアップロード
-                        file_id = drive_handler.upload_file(
-                            file_name=file_name,
-                            file_content=doc_data,
-                            folder_id=folder_id
-                        )
-
-                        # PDFを要約してGoogle Driveに保存
-                        try:
-                            summary_file_ids = process_drive_file(file_id, folder_id)
-                            summary_urls = [
-                                f"https://drive.google.com/file/d/{fid}/view" for fid in summary_file_ids
-                            ]
-                        except Exception as e:
-                            logger.error(f"Failed to summarize PDF: {e}")
-                            summary_file_ids = []
-                            summary_urls = []
-
-                        # ログデータの作成と記録
-                        file_url = f"https://drive.google.com/file/d/{file_id}/view"
-                        log_data = [
-                            [
-                                release_date,
-                                edinet_code,
-                                stock_code,
-                                corp_name,
-                                doc_type_name,
-                                file_name,
-                                file_url,
-                                ", ".join(summary_urls),
-                                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            ]
-                        ]
-                        log_download_to_sheet(
-                            spreadsheet_service, spreadsheet_id, log_sheet_name, log_data
-                        )
-                        logger.info(f"File uploaded to Drive with URL: {file_url}")
-
-                        # Slack通知の処理を追加
-                        if summary_file_ids:
-                            for summary_file_id in summary_file_ids:
-                                try:
-                                    markdown_content = drive_handler.get_file_content(summary_file_id)
-                                    slack_notifier.send_formatted_markdown(
-                                        slack_channel, markdown_content, ir_page_url
-                                    )
-                                    logger.info(f"Slackに要約を送信しました。ファイル ID: {summary_file_id}")
-                                except Exception as e:
-                                    logger.error(f"Slack通知中にエラーが発生しました（ファイル ID: {summary_file_id}）: {e}")
                         else:
-                            logger.warning("要約ファイルがないため、Slack通知は行いませんでした。")
-
-                    else:
-                        logger.warning(f"Failed to fetch document data: ID={doc_id}")
+                            logger.warning(f"Failed to fetch document data: ID={doc_id}")
 
             except Exception as e:
                 logger.error(f"Error processing EDINET_code {edinet_code}: {e}")
+
+        for uploaded, started in pending:
+            finish_document(context, log_sheet_name, log_headers, uploaded, started)
+
+        if batch_state is not None and batch_state.documents:
+            from modules.pdfSummary.batch import create_batch_engine, process_pdfs_in_batch
+            logger.info(f"{len(batch_state.documents)} 件の文書をバッチモードで要約します。")
+            engine = create_batch_engine(batch_state)
+            try:
+                results = process_pdfs_in_batch(
+                    dict(batch_state.documents), drive_handler, context.summarization, engine, ledger
+                )
+            finally:
+                engine.close()
+            for doc_id, summary_file_ids in results.items():
+                with ledger.document(doc_id):
+                    record_and_notify(context, log_sheet_name, log_headers, batch_state.documents[doc_id],
+                                      summary_file_ids)
+                batch_state.remove_document(doc_id)
+
+        # 文書ごとのトークン数・費用・処理時間のレポートを出力
+        ledger.log_report()
     except Exception as e:
         logger.error(f"Failed to process spreadsheet data: {e}")
         raise
\ No newline at end of file
@@ -8,6 +8,7 @@ from pathlib import Path
 from datetime import datetime
 
 from utils.logging_config import get_logger
+from utils.quota import get_quota_manager
 
 logger = get_logger(__name__)
 
@@ -20,6 +21,7 @@ class DriveHandler:
             service_account_file (str): サービスアカウントのキー JSON ファイルのパス。
         """
         self.service_account_file = service_account_file
+        self.quota = get_quota_manager()
         try:
             self.credentials = service_account.Credentials.from_service_account_file(
                 self.service_account_file,
@@ -43,7 +45,7 @@ class DriveHandler:
         """
         try:
             request = self.service.files().get_media(fileId=file_id)
-            file_content = request.execute()
+            file_content = self.quota.execute("drive", "files.get_media", request)
             content = file_content.decode("utf-8")  # Markdown ファイルは通常 UTF-8 形式
             logger.info(f"ファイル内容を取得しました。ファイルID: {file_id}")
             return content
@@ -78,11 +80,11 @@ class DriveHandler:
                 mimetype="text/markdown"
             )
 
-            file = self.service.files().create(
+            file = self.quota.execute("drive", "files.create", self.service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields="id"
-            ).execute()
+            ))
 
             file_id = file.get("id")
             logger.info(f"要約を Google Drive に保存しました。ファイル ID: {file_id}")
@@ -103,7 +105,7 @@ class DriveHandler:
         """
         try:
             # ファイルのメタデータを取得
-            file_metadata = self.service.files().get(fileId=file_id).execute()
+            file_metadata = self.quota.execute("drive", "files.get", self.service.files().get(fileId=file_id))
             file_name = file_metadata.get('name')
 
             # ダウンロード先のパスを設定
@@ -117,7 +119,7 @@ class DriveHandler:
             downloader = MediaIoBaseDownload(fh, request)
             done = False
             while not done:
-                status, done = downloader.next_chunk()
+                status, done = self.quota.call("drive", "files.get_media", downloader.next_chunk)
                 if status:
                     logger.debug(f"Download {int(status.progress() * 100)}%.")
 
@@ -149,12 +151,12 @@ class DriveHandler:
                 query += f" and '{parent_folder_id}' in parents"
 
             # フォルダを検索
-            results = self.service.files().list(
+            results = self.quota.execute("drive", "files.list", self.service.files().list(
                 q=query,
                 spaces="drive",
                 fields="files(id, name)",
                 pageSize=1
-            ).execute()
+            ))
             files = results.get("files", [])
 
             if files:
@@ -168,10 +170,10 @@ class DriveHandler:
                     "mimeType": "application/vnd.google-apps.folder",
                     "parents": [parent_folder_id] if parent_folder_id else [],
                 }
-                folder = self.service.files().create(
+                folder = self.quota.execute("drive", "files.create", self.service.files().create(
                     body=file_metadata,
                     fields="id"
-                ).execute()
+                ))
                 folder_id = folder.get("id")
                 logger.info(f"新規フォルダを作成しました。フォルダ名: '{folder_name}', フォルダID: {folder_id}")
                 return folder_id
@@ -196,12 +198,12 @@ class DriveHandler:
         try:
             # フォルダ内で同名ファイルを検索
             query = f"name='{file_name}' and '{folder_id}' in parents and trashed=false"
-            results = self.service.files().list(
+            results = self.quota.execute("drive", "files.list", self.service.files().list(
                 q=query,
                 spaces="drive",
                 fields="files(id, name)",
                 pageSize=1
-            ).execute()
+            ))
             existing_files = results.get("files", [])
 
             if existing_files:
@@ -221,11 +223,11 @@ class DriveHandler:
                 io.BytesIO(file_content),
                 mimetype=mime_type
             )
-            uploaded_file = self.service.files().create(
+            uploaded_file = self.quota.execute("drive", "files.create", self.service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields="id"
-            ).execute()
+            ))
             file_id = uploaded_file.get("id")
             logger.info(f"ファイルをアップロードしました: '{file_name}' (フォルダID: {folder_id}, ファイルID: {file_id})")
             return file_id
@@ -1,16 +1,97 @@
 #enviroment.py
 import os
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 import configparser
 
+class ConfigSnapshot:
+    """設定ファイルを1度だけ解析し、型変換済みの値を保持するスナップショット"""
+
+    def __init__(self, path: Path, mtime_ns: int, sections: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            path (Path): 設定ファイルのパス
+            mtime_ns (int): 解析時点の設定ファイルの更新時刻
+            sections (Dict[str, Dict[str, Any]]): セクション名ごとの型変換済みの設定値
+        """
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.sections = sections
+
+    @classmethod
+    def load(cls, path: Path) -> "ConfigSnapshot":
+        """
+        設定ファイルを解析してスナップショットを作成します。
+
+        Args:
+            path (Path): 設定ファイルのパス
+
+        Returns:
+            ConfigSnapshot: 作成したスナップショット
+        """
+        mtime_ns = path.stat().st_mtime_ns
+        config = configparser.ConfigParser()
+        config.read(path, encoding='utf-8')  # エンコーディングを明示的に指定
+
+        sections = {}
+        for section in config.sections():
+            values = {}
+            for key in config.options(section):
+                try:
+                    value = config.get(section, key)
+                except configparser.InterpolationError:
+                    value = config.get(section, key, raw=True)
+                values[key] = cls.convert_value(value)
+            sections[section] = values
+        return cls(path, mtime_ns, sections)
+
+    @staticmethod
+    def convert_value(value: str) -> Any:
+        """
+        設定値の文字列を int / float / bool に変換します。変換できない場合は文字列のまま返します。
+        """
+        if value.isdigit():
+            return int(value)
+        if value.replace('.', '', 1).isdigit():
+            return float(value)
+        if value.lower() in ['true', 'false']:
+            return value.lower() == 'true'
+        return value
+
+    def has_section(self, section: str) -> bool:
+        """セクションが存在するかどうかを返します。"""
+        return section in self.sections
+
+    def get(self, section: str, key: str, default: Optional[Any] = None) -> Any:
+        """
+        指定のセクションとキーの値を取得します。
+
+        Args:
+            section (str): セクション名
+            key (str): キー名
+            default (Optional[Any]): セクションまたはキーが存在しない場合のデフォルト値
+
+        Returns:
+            Any: 設定値
+        """
+        values = self.sections.get(section)
+        if values is None:
+            return default
+        return values.get(key.lower(), default)
+
 class EnvironmentUtils:
     """プロジェクト全体で使用する環境関連のユーティリティクラス"""
 
     # プロジェクトルートのデフォルト値
     BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+    # 解析済みの設定ファイルと読み込み済みの .env ファイル（更新時刻が変わるまで再利用する）
+    _config_snapshots: Dict[Path, ConfigSnapshot] = {}
+    _loaded_env_files: Dict[Path, int] = {}
+    _cache_lock = threading.Lock()
+
     @staticmethod
     def set_project_root(path: Path) -> None:
         """
@@ -44,7 +125,13 @@ class EnvironmentUtils:
         if not env_file.exists():
             raise FileNotFoundError(f"{env_file} が見つかりません。正しいパスを指定してください。")
 
-        load_dotenv(env_file)
+        # 前回の読み込みから更新されていなければ再解析しない
+        mtime_ns = env_file.stat().st_mtime_ns
+        with EnvironmentUtils._cache_lock:
+            if EnvironmentUtils._loaded_env_files.get(env_file) == mtime_ns:
+                return
+            load_dotenv(env_file)
+            EnvironmentUtils._loaded_env_files[env_file] = mtime_ns
 
     @staticmethod
     def get_env_var(key: str, default: Optional[Any] = None) -> Any:
@@ -79,6 +166,27 @@ class EnvironmentUtils:
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
         return config_path
 
+    @staticmethod
+    def get_config(file_name: str = "settings.ini") -> ConfigSnapshot:
+        """
+        解析済みの設定ファイルのスナップショットを取得します。
+        設定ファイルの更新時刻が変わった場合のみ再解析します。
+
+        Args:
+            file_name (str): 設定ファイル名
+
+        Returns:
+            ConfigSnapshot: 設定ファイルのスナップショット
+        """
+        config_path = EnvironmentUtils.get_config_file(file_name)
+        mtime_ns = config_path.stat().st_mtime_ns
+        with EnvironmentUtils._cache_lock:
+            snapshot = EnvironmentUtils._config_snapshots.get(config_path)
+            if snapshot is None or snapshot.mtime_ns != mtime_ns:
+                snapshot = ConfigSnapshot.load(config_path)
+                EnvironmentUtils._config_snapshots[config_path] = snapshot
+            return snapshot
+
     @staticmethod
     def get_config_value(section: str, key: str, default: Optional[Any] = None) -> Any:
         """
@@ -92,25 +200,7 @@ class EnvironmentUtils:
         Returns:
             Any: 設定値
         """
-        config_path = EnvironmentUtils.get_config_file()
-        config = configparser.ConfigParser()
-        config.read(config_path, encoding='utf-8')  # エンコーディングを明示的に指定
-
-        if not config.has_section(section):
-            return default
-        if not config.has_option(section, key):
-            return default
-
-        value = config.get(section, key, fallback=default)
-
-        # 型変換
-        if value.isdigit():
-            return int(value)
-        if value.replace('.', '', 1).isdigit():
-            return float(value)
-        if value.lower() in ['true', 'false']:
-            return value.lower() == 'true'
-        return value
+        return EnvironmentUtils.get_config().get(section, key, default)
 
     @staticmethod
     def resolve_path(path: str) -> Path:
@@ -0,0 +1,361 @@
+# src/utils/ledger.py
+
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from utils.environment import EnvironmentUtils as env
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# settings.ini に設定がない場合のモデルごとの料金（USD / 100万トークン: 入力 / 出力 / キャッシュされた入力）
+DEFAULT_PRICES = {
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gpt-4o-mini": (0.15, 0.60, 0.075),
+}
+# Batch API の割引率
+BATCH_DISCOUNT = 0.5
+# レポートに表示する文書数
+REPORT_TOP_DOCUMENTS = 10
+
+# 処理中の文書（レジャーと doc_id）。コルーチン・run_coroutine_threadsafe で実行する要約にも引き継がれる
+_current_document: contextvars.ContextVar[Optional[Tuple["RunLedger", str]]] = \
+    contextvars.ContextVar("ledger_document", default=None)
+# timed_stage() で計測中のイテレーターの入れ子（スレッドごと、内側の処理時間を外側から差し引くために使用）
+_timed_stages = threading.local()
+
+T = TypeVar("T")
+
+def parse_price_table(value) -> Dict[str, Tuple[float, float, float]]:
+    """
+    "gpt-4o:2.50/10.00/1.25, gpt-4o-mini:0.15/0.60/0.075" 形式の設定値を辞書に変換します
+    （キャッシュされた入力の料金を省略した場合は入力と同じ料金）。
+
+    Args:
+        value: 設定値（未設定の場合は None）
+
+    Returns:
+        Dict[str, Tuple[float, float, float]]: モデル名と料金（入力、出力、キャッシュされた入力）の対応
+    """
+    table = {}
+    for item in str(value or "").split(","):
+        if ":" not in item:
+            continue
+        model, prices = item.rsplit(":", 1)
+        values = [float(price) for price in prices.split("/")]
+        if len(values) == 2:
+            values.append(values[0])
+        table[model.strip()] = tuple(values[:3])
+    return table
+
+def _usage_value(usage, *names) -> int:
+    """usage（OpenAI のオブジェクトまたはバッチ出力の辞書）から、入れ子の値を取り出します。"""
+    value = usage
+    for name in names:
+        if value is None:
+            return 0
+        value = value.get(name) if isinstance(value, dict) else getattr(value, name, None)
+    return int(value or 0)
+
+class RunLedger:
+    """
+    文書ごとのトークン数・レイテンシ・費用と、ステージ（取得、アップロード、抽出、分割、要約、通知）ごとの
+    処理時間を記録するローカル SQLite のレジャー。実行ごとに run_id を割り当て、実行単位のレポートを出力します。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            model TEXT,
+            source TEXT NOT NULL,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            completion_tokens INTEGER NOT NULL DEFAULT 0,
+            cached_tokens INTEGER NOT NULL DEFAULT 0,
+            latency_seconds REAL,
+            cost_usd REAL NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS stages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_requests_run_id ON requests (run_id, doc_id);
+        CREATE INDEX IF NOT EXISTS idx_stages_run_id ON stages (run_id, doc_id);
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, run_id: Optional[str] = None):
+        """
+        Args:
+            db_path (Optional[Path]): データベースファイルのパス（デフォルトは settings.ini の [LOCAL_DB] ledger_path）
+            run_id (Optional[str]): 実行の ID（デフォルトは開始日時とプロセス ID）
+        """
+        if db_path is None:
+            db_path = Path(env.get_config_value("LOCAL_DB", "ledger_path", default="data/ledger.sqlite3"))
+            if not db_path.is_absolute():
+                db_path = env.get_project_root() / db_path
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = run_id or f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        self.prices = {**DEFAULT_PRICES, **parse_price_table(env.get_config_value("OPENAI", "prices"))}
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        """データベース接続を閉じます。"""
+        self.connection.close()
+
+    @contextmanager
+    def document(self, doc_id: str) -> Iterator[None]:
+        """この中で行うリクエストとステージを doc_id の記録とします。"""
+        token = _current_document.set((self, doc_id))
+        try:
+            yield
+        finally:
+            _current_document.reset(token)
+
+    def price(self, model: str) -> Optional[Tuple[float, float, float]]:
+        """モデルの料金を返します（"gpt-4o-2024-08-06" のような日付付きの名前は最長一致で判定）。"""
+        if model in self.prices:
+            return self.prices[model]
+        prefixes = [name for name in self.prices if model.startswith(name + "-")]
+        return self.prices[max(prefixes, key=len)] if prefixes else None
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int, source: str) -> float:
+        """リクエストの費用（USD）を計算します（応答キャッシュから返した場合は 0）。"""
+        price = self.price(model or "")
+        if price is None or source == "cache":
+            return 0.0
+        input_price, output_price, cached_price = price
+        cost = ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+                + completion_tokens * output_price) / 1_000_000
+        return cost * BATCH_DISCOUNT if source == "batch" else cost
+
+    def record_request(self, doc_id: str, model: str, usage: Any = None, latency_seconds: Optional[float] = None,
+                       source: str = "api") -> None:
+        """
+        OpenAI API のリクエストを記録します。
+
+        Args:
+            doc_id (str): ドキュメントID
+            model (str): OpenAI モデル名
+            usage (Any): レスポンスの usage（OpenAI のオブジェクトまたはバッチ出力の辞書）
+            latency_seconds (Optional[float]): リクエストのレイテンシ（秒）
+            source (str): api: 通常の API / batch: Batch API / cache: 応答キャッシュ
+        """
+        prompt_tokens = _usage_value(usage, "prompt_tokens")
+        completion_tokens = _usage_value(usage, "completion_tokens")
+        cached_tokens = _usage_value(usage, "prompt_tokens_details", "cached_tokens")
+        cost = self.cost(model, prompt_tokens, completion_tokens, cached_tokens, source)
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO requests (run_id, doc_id, model, source, prompt_tokens, completion_tokens, cached_tokens,"
+                " latency_seconds, cost_usd, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, doc_id, model, source, prompt_tokens, completion_tokens, cached_tokens,
+                 latency_seconds, cost, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def record_stage(self, doc_id: str, stage: str, seconds: float) -> None:
+        """ステージの処理時間を記録します。"""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO stages (run_id, doc_id, stage, seconds, created_at) VALUES (?, ?, ?, ?, ?)",
+                (self.run_id, doc_id, stage, seconds, datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def latest_run_id(self) -> Optional[str]:
+        """記録のある最新の run_id を返します。"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT MAX(run_id) AS run_id FROM (SELECT run_id FROM requests UNION SELECT run_id FROM stages)"
+            ).fetchone()
+        return row["run_id"]
+
+    def document_totals(self, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        文書ごとのトークン数・費用・処理時間の合計を返します。
+
+        Args:
+            run_id (Optional[str]): 実行の ID（デフォルトはこの実行）
+
+        Returns:
+            List[Dict[str, Any]]: 文書ごとの合計（stages はステージ名と秒数の対応）
+        """
+        run_id = run_id or self.run_id
+        with self.lock:
+            requests = self.connection.execute(
+                "SELECT doc_id, COUNT(*) AS requests, SUM(prompt_tokens) AS prompt_tokens,"
+                " SUM(completion_tokens) AS completion_tokens, SUM(cached_tokens) AS cached_tokens,"
+                " SUM(source = 'cache') AS cache_hits, SUM(cost_usd) AS cost_usd, SUM(latency_seconds) AS latency_seconds"
+                " FROM requests WHERE run_id = ? GROUP BY doc_id",
+                (run_id,),
+            ).fetchall()
+            stages = self.connection.execute(
+                "SELECT doc_id, stage, SUM(seconds) AS seconds FROM stages WHERE run_id = ? GROUP BY doc_id, stage",
+                (run_id,),
+            ).fetchall()
+
+        totals: Dict[str, Dict[str, Any]] = {}
+        empty = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0,
+                 "cache_hits": 0, "cost_usd": 0.0, "latency_seconds": 0.0}
+        for row in requests:
+            totals[row["doc_id"]] = {"doc_id": row["doc_id"], **{key: row[key] or value for key, value in empty.items()},
+                                     "stages": {}}
+        for row in stages:
+            entry = totals.setdefault(row["doc_id"], {"doc_id": row["doc_id"], **empty, "stages": {}})
+            entry["stages"][row["stage"]] = row["seconds"]
+        for entry in totals.values():
+            entry["seconds"] = sum(entry["stages"].values())
+        return list(totals.values())
+
+    def report(self, run_id: Optional[str] = None) -> str:
+        """
+        実行単位のレポート（合計、ステージ別の処理時間、費用・処理時間の多い文書）を返します。
+
+        Args:
+            run_id (Optional[str]): 実行の ID（デフォルトはこの実行）
+
+        Returns:
+            str: レポート
+        """
+        run_id = run_id or self.run_id
+        documents = self.document_totals(run_id)
+        if not documents:
+            return f"実行 {run_id} の記録はありません。"
+
+        def total(key):
+            return sum(document[key] for document in documents)
+
+        stage_totals: Dict[str, float] = {}
+        for document in documents:
+            for stage, seconds in document["stages"].items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+
+        lines = [
+            f"実行 {run_id} のレポート: 文書 {len(documents)} 件、リクエスト {total('requests')} 件"
+            f"（応答キャッシュ {total('cache_hits')} 件）",
+            f"トークン: 入力 {total('prompt_tokens')}（キャッシュ {total('cached_tokens')}）、"
+            f"出力 {total('completion_tokens')}、費用 ${total('cost_usd'):.4f}",
+            "ステージ別の処理時間: " + ", ".join(
+                f"{stage} {seconds:.1f}s" for stage, seconds in sorted(stage_totals.items(), key=lambda item: -item[1])
+            ),
+        ]
+        for title, key in (("費用の多い文書", "cost_usd"), ("処理時間の長い文書", "seconds")):
+            lines.append(f"{title}:")
+            for document in sorted(documents, key=lambda document: -document[key])[:REPORT_TOP_DOCUMENTS]:
+                slowest = max(document["stages"].items(), key=lambda item: item[1], default=None)
+                lines.append(
+                    f"  {document['doc_id']}: ${document['cost_usd']:.4f}、入力 {document['prompt_tokens']}、"
+                    f"出力 {document['completion_tokens']}、{document['seconds']:.1f}s"
+                    + (f"（最長: {slowest[0]} {slowest[1]:.1f}s）" if slowest else "")
+                )
+        return "\n".join(lines)
+
+    def log_report(self) -> None:
+        """この実行のレポートを出力します。"""
+        logger.info(self.report())
+
+def current_document() -> Optional[Tuple[RunLedger, str]]:
+    """処理中の文書（レジャーと doc_id）を返します（文書の処理中でない場合は None）。"""
+    return _current_document.get()
+
+def record_request(model: str, usage: Any = None, latency_seconds: Optional[float] = None, source: str = "api",
+                   document: Optional[Tuple[RunLedger, str]] = None) -> None:
+    """
+    処理中の文書（または指定した文書）のリクエストを記録します。文書の処理中でない場合は何もしません。
+
+    Args:
+        model (str): OpenAI モデル名
+        usage (Any): レスポンスの usage
+        latency_seconds (Optional[float]): リクエストのレイテンシ（秒）
+        source (str): api / batch / cache
+        document (Optional[Tuple[RunLedger, str]]): 記録先（デフォルトは処理中の文書）
+    """
+    document = document or _current_document.get()
+    if document is None:
+        return
+    ledger, doc_id = document
+    try:
+        ledger.record_request(doc_id, model, usage, latency_seconds, source)
+    except Exception as e:
+        logger.warning(f"レジャーへの記録に失敗しました: {e}")
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    この中の処理時間を、処理中の文書のステージとして記録します。文書の処理中でない場合は何もしません。
+
+    Args:
+        name (str): ステージ名（fetch、upload、extract、chunk、summarize、notify など）
+    """
+    document = _current_document.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if document is not None:
+            ledger, doc_id = document
+            try:
+                ledger.record_stage(doc_id, name, time.perf_counter() - started)
+            except Exception as e:
+                logger.warning(f"レジャーへの記録に失敗しました: {e}")
+
+def timed_stage(name: str, iterable: Iterable[T]) -> Iterator[T]:
+    """
+    イテレーターから要素を取り出す処理時間を、生成時に処理中の文書のステージとして記録します。
+    要素は順次取り出すため、抽出しながら要約する場合も全体を保持しません。
+    入れ子にした timed_stage() の処理時間（チャンク分割中のページの抽出など）は外側のステージに含めず、
+    取り出し終えたとき（または途中で閉じたとき）にまとめて記録します。
+
+    Args:
+        name (str): ステージ名
+        iterable (Iterable[T]): 計測するイテレーター
+
+    Yields:
+        T: iterable の要素
+    """
+    # 文書は取り出すときではなく生成時に決める（ジェネレーターの本体は最初の取り出しまで実行されないため）
+    return _timed_stage(name, iter(iterable), _current_document.get())
+
+def _timed_stage(name: str, iterator: Iterator[T], document: Optional[Tuple[RunLedger, str]]) -> Iterator[T]:
+    seconds = 0.0
+    try:
+        while True:
+            stack = _timed_stages.__dict__.setdefault("stack", [])
+            frame = [0.0]
+            stack.append(frame)
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = time.perf_counter() - started
+                stack.pop()
+                seconds += elapsed - frame[0]
+                if stack:
+                    stack[-1][0] += elapsed
+            yield item
+    finally:
+        if document is not None:
+            ledger, doc_id = document
+            try:
+                ledger.record_stage(doc_id, name, seconds)
+            except Exception as e:
+                logger.warning(f"レジャーへの記録に失敗しました: {e}")
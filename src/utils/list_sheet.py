@@ -0,0 +1,86 @@
+# src/utils/list_sheet.py
+
+from dataclasses import dataclass
+from typing import List
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+@dataclass(frozen=True)
+class ListRow:
+    """list シートの1行分のデータ"""
+    row_number: int
+    edinet_code: str
+    ir_page_url: str
+    checked: bool
+    stock_code: str
+    corp_name: str
+
+class ListSheetSnapshot:
+    """
+    実行中に1度だけ取得する list シートのスナップショット。
+    必要な列のみを values.batchGet で取得し、全ステージで共有します。
+    """
+
+    COLUMNS = ["EDINET_code", "ir_page_url", "check", "stock_code", "corp_name"]
+    REQUIRED_COLUMNS = ["EDINET_code", "ir_page_url", "check"]
+
+    def __init__(self, rows: List[ListRow]):
+        self.rows = rows
+
+    @classmethod
+    def load(cls, spreadsheet_service, spreadsheet_id: str, sheet_name: str = "list") -> "ListSheetSnapshot":
+        """
+        list シートから必要な列を取得してスナップショットを作成します。
+
+        Args:
+            spreadsheet_service (SpreadsheetService): スプレッドシートサービス
+            spreadsheet_id (str): スプレッドシートID
+            sheet_name (str): シート名
+
+        Returns:
+            ListSheetSnapshot: 取得したスナップショット
+
+        Raises:
+            ValueError: 必須列が存在しない、またはデータが空の場合
+        """
+        columns = spreadsheet_service.batch_get_columns(spreadsheet_id, sheet_name, cls.COLUMNS)
+
+        missing = [column for column in cls.REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            logger.error(f"Required columns not found in the '{sheet_name}' sheet: {', '.join(missing)}")
+            raise ValueError(f"Required columns not found in the '{sheet_name}' sheet: {', '.join(missing)}")
+
+        # 末尾の空セルは API から返されないため、最長の列を行数とする
+        row_count = max(len(values) for values in columns.values())
+        if row_count == 0:
+            logger.error(f"No data found in the '{sheet_name}' sheet.")
+            raise ValueError(f"No data found in the '{sheet_name}' sheet.")
+
+        def cell(column: str, index: int) -> str:
+            values = columns.get(column, [])
+            return values[index].strip() if index < len(values) else ""
+
+        rows = [
+            ListRow(
+                row_number=index + 2,
+                edinet_code=cell("EDINET_code", index),
+                ir_page_url=cell("ir_page_url", index),
+                checked=cell("check", index).upper() == "TRUE",
+                stock_code=cell("stock_code", index),
+                corp_name=cell("corp_name", index),
+            )
+            for index in range(row_count)
+        ]
+        logger.info(f"Loaded {len(rows)} rows from the '{sheet_name}' sheet.")
+        return cls(rows)
+
+    @property
+    def edinet_codes(self) -> List[str]:
+        """EDINETコードが入力されている全行のEDINETコード"""
+        return [row.edinet_code for row in self.rows if row.edinet_code]
+
+    def checked_rows(self) -> List[ListRow]:
+        """check 列が TRUE の行"""
+        return [row for row in self.rows if row.checked]
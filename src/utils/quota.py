@@ -0,0 +1,191 @@
+# src/utils/quota.py
+
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+from utils.environment import EnvironmentUtils as env
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class TokenBucket:
+    """1分あたりのリクエスト数を平準化するトークンバケット"""
+
+    def __init__(self, requests_per_minute: int, capacity: Optional[int] = None):
+        """
+        Args:
+            requests_per_minute (int): 1分あたりの許容リクエスト数
+            capacity (Optional[int]): 瞬間的に許容するバースト数（デフォルトは1秒分、最低1）
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = capacity or max(1, int(self.rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得します。トークンがない場合は補充されるまで待機します。
+
+        Returns:
+            float: 待機した秒数
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class QuotaManager:
+    """
+    Google Sheets / Drive API の呼び出しを API・メソッド単位で計測し、
+    トークンバケットで間隔を空け、429 や 5xx を Retry-After に従って再試行します。
+    """
+
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+    DEFAULT_REQUESTS_PER_MINUTE = {
+        "sheets": 60,
+        "drive": 300,
+    }
+
+    def __init__(self, requests_per_minute: Optional[Dict[str, int]] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 64.0):
+        """
+        Args:
+            requests_per_minute (Optional[Dict[str, int]]): API名ごとの1分あたりの許容リクエスト数
+            max_retries (int): 再試行の最大回数
+            base_delay (float): 指数バックオフの初期待機秒数
+            max_delay (float): 待機秒数の上限
+        """
+        limits = dict(self.DEFAULT_REQUESTS_PER_MINUTE)
+        limits.update(requests_per_minute or {})
+        self.buckets = {api: TokenBucket(limit) for api, limit in limits.items()}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = Counter()
+        self.retries = Counter()
+        self.throttled_seconds = Counter()
+        self.lock = threading.Lock()
+
+    def execute(self, api: str, method: str, request: Any) -> Any:
+        """
+        googleapiclient のリクエストを実行します。
+
+        Args:
+            api (str): API名（例: 'sheets', 'drive'）
+            method (str): メソッド名（例: 'values.get'）
+            request: execute() を持つ googleapiclient の HttpRequest
+
+        Returns:
+            Any: APIのレスポンス
+        """
+        return self.call(api, method, request.execute)
+
+    def call(self, api: str, method: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        任意の呼び出しをクォータ管理下で実行します。
+
+        Args:
+            api (str): API名
+            method (str): メソッド名
+            func (Callable): 実行する関数
+
+        Returns:
+            Any: 関数の戻り値
+        """
+        key = f"{api}.{method}"
+        for attempt in range(self.max_retries + 1):
+            bucket = self.buckets.get(api)
+            waited = bucket.acquire() if bucket else 0.0
+            with self.lock:
+                self.calls[key] += 1
+                self.throttled_seconds[key] += waited
+
+            try:
+                return func(*args, **kwargs)
+            except HttpError as e:
+                status = int(getattr(e.resp, "status", 0) or 0)
+                if status not in self.RETRYABLE_STATUS or attempt >= self.max_retries:
+                    raise
+
+                delay = self._retry_delay(e, attempt)
+                with self.lock:
+                    self.retries[key] += 1
+                logger.warning(f"{key} returned HTTP {status}. Retrying in {delay:.1f}s "
+                               f"({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def _retry_delay(self, error: HttpError, attempt: int) -> float:
+        """
+        Retry-After ヘッダーがあればそれに従い、なければジッター付きの指数バックオフで待機秒数を決定します。
+        """
+        retry_after = error.resp.get("retry-after") if hasattr(error.resp, "get") else None
+        if retry_after:
+            try:
+                return min(self.max_delay, float(retry_after))
+            except ValueError:
+                pass
+        return min(self.max_delay, self.base_delay * (2 ** attempt)) + random.uniform(0, 1)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        API・メソッドごとの呼び出し回数、再試行回数、スロットリングでの待機秒数を返します。
+        """
+        with self.lock:
+            return {
+                key: {
+                    "calls": self.calls[key],
+                    "retries": self.retries[key],
+                    "throttled_seconds": round(self.throttled_seconds[key], 2),
+                }
+                for key in sorted(self.calls)
+            }
+
+    def log_summary(self) -> None:
+        """実行中の呼び出し回数のサマリーをログに出力します。"""
+        summary = self.summary()
+        if not summary:
+            logger.info("Google API call summary: no calls.")
+            return
+
+        total = sum(item["calls"] for item in summary.values())
+        logger.info(f"Google API call summary: {total} calls")
+        for key, item in summary.items():
+            logger.info(f"  {key}: calls={item['calls']}, retries={item['retries']}, "
+                        f"throttled={item['throttled_seconds']}s")
+
+_quota_manager: Optional[QuotaManager] = None
+_quota_manager_lock = threading.Lock()
+
+def get_quota_manager() -> QuotaManager:
+    """
+    プロセス全体で共有する QuotaManager を取得します。
+    初回呼び出し時に settings.ini の [QUOTA] セクションから設定を読み込みます。
+
+    Returns:
+        QuotaManager: 共有インスタンス
+    """
+    global _quota_manager
+    with _quota_manager_lock:
+        if _quota_manager is None:
+            _quota_manager = QuotaManager(
+                requests_per_minute={
+                    "sheets": env.get_config_value("QUOTA", "sheets_requests_per_minute", default=60),
+                    "drive": env.get_config_value("QUOTA", "drive_requests_per_minute", default=300),
+                },
+                max_retries=env.get_config_value("QUOTA", "max_retries", default=5),
+            )
+        return _quota_manager
@@ -0,0 +1,270 @@
+# src/utils/run_log_store.py
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from utils.environment import EnvironmentUtils as env
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class RunLogStore:
+    """
+    処理済みドキュメントのログを保持するローカル SQLite データベース。
+    log シートへの追記は二次的な出力先として、未同期の行をまとめて追記します。
+    """
+
+    # log シートのヘッダーとテーブルの列の対応
+    COLUMNS = {
+        'Release_Date': 'release_date',
+        'EDINET_code': 'edinet_code',
+        'stock_code': 'stock_code',
+        'corp_name': 'corp_name',
+        'doc_type': 'doc_type',
+        'drive_raw_data_file_name': 'raw_file_name',
+        'drive_raw_data_file_url': 'raw_file_url',
+        'drive_summary_file_urls': 'summary_file_urls',
+        'timestamp': 'timestamp',
+        'doc_id': 'doc_id',
+    }
+
+    # drive_raw_data_file_name（{EDINET_code}_{doc_id}_{YYYYMMDD}.pdf）から doc_id を取り出す
+    RAW_FILE_NAME_PATTERN = re.compile(r'^[^_]+_(?P<doc_id>[^_]+)_\d{8}\.pdf$')
+
+    # メモリ上のデータベース（snapshot() で使用）
+    MEMORY = ":memory:"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS run_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doc_id TEXT UNIQUE,
+            release_date TEXT,
+            edinet_code TEXT,
+            stock_code TEXT,
+            corp_name TEXT,
+            doc_type TEXT,
+            raw_file_name TEXT,
+            raw_file_url TEXT,
+            summary_file_urls TEXT,
+            timestamp TEXT,
+            synced INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_run_log_edinet_code ON run_log (edinet_code);
+        CREATE INDEX IF NOT EXISTS idx_run_log_release_date ON run_log (release_date);
+        CREATE INDEX IF NOT EXISTS idx_run_log_doc_type ON run_log (doc_type);
+        CREATE INDEX IF NOT EXISTS idx_run_log_synced ON run_log (synced);
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path (Optional[Path]): データベースファイルのパス（デフォルトは settings.ini の [LOCAL_DB] run_log_path）
+        """
+        self.db_path = Path(db_path) if db_path is not None else self.default_path()
+        if str(self.db_path) != self.MEMORY:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+        logger.info(f"Run log store opened: {self.db_path}")
+
+    @staticmethod
+    def default_path() -> Path:
+        """settings.ini の [LOCAL_DB] run_log_path（相対パスはプロジェクトルートから解決）"""
+        db_path = Path(env.get_config_value("LOCAL_DB", "run_log_path", default="data/run_log.sqlite3"))
+        if not db_path.is_absolute():
+            db_path = env.get_project_root() / db_path
+        return db_path
+
+    @classmethod
+    def snapshot(cls, db_path: Optional[Path] = None) -> "RunLogStore":
+        """
+        データベースを読み取り専用で開き、メモリ上に複製したストアを返します。
+        複製への変更（log シートの取り込みなど）はファイルに書き込まれないため、--dry-run の判定に使用します。
+
+        Args:
+            db_path (Optional[Path]): データベースファイルのパス（デフォルトは settings.ini の [LOCAL_DB] run_log_path）
+
+        Returns:
+            RunLogStore: メモリ上のストア（ファイルがない場合は空）
+        """
+        db_path = Path(db_path) if db_path is not None else cls.default_path()
+        store = cls(Path(cls.MEMORY))
+        if db_path.exists():
+            source = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                source.backup(store.connection)
+            finally:
+                source.close()
+        return store
+
+    def close(self) -> None:
+        """データベース接続を閉じます。"""
+        self.connection.close()
+
+    def record(self, log_record: Dict[str, str]) -> None:
+        """
+        ログレコードを保存し、log シートへの未同期行として登録します。
+        同じ doc_id のレコードが既にある場合は上書きして再同期の対象にします。
+
+        Args:
+            log_record (Dict[str, str]): log シートのヘッダーをキーとしたレコード
+        """
+        values = {column: log_record.get(header, "") for header, column in self.COLUMNS.items()}
+        values['doc_id'] = values['doc_id'] or None
+        columns = ", ".join(values)
+        placeholders = ", ".join(f":{column}" for column in values)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in values if column != 'doc_id')
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"INSERT INTO run_log ({columns}, synced) VALUES ({placeholders}, 0) "
+                f"ON CONFLICT(doc_id) DO UPDATE SET {updates}, synced = 0",
+                values
+            )
+
+    def import_sheet_rows(self, sheet_data: List[List[str]]) -> int:
+        """
+        log シートの既存行を同期済みとして取り込みます。ローカルに既にある doc_id は無視しますが、
+        既存の行に要約がなく取り込む行に要約がある場合（失敗後の再試行で成功した場合）は、要約のある行で上書きします。
+        doc_id 列がない古い行はファイル名から doc_id を復元します。
+
+        Args:
+            sheet_data (List[List[str]]): ヘッダー行を含む log シートのデータ
+
+        Returns:
+            int: 新たに取り込んだ行数
+        """
+        if not sheet_data or len(sheet_data) < 2:
+            return 0
+
+        headers = sheet_data[0]
+        rows = []
+        for row in sheet_data[1:]:
+            record = {header: row[index] if index < len(row) else "" for index, header in enumerate(headers)}
+            values = {column: record.get(header, "") for header, column in self.COLUMNS.items()}
+            if not values['doc_id']:
+                match = self.RAW_FILE_NAME_PATTERN.match(values['raw_file_name'])
+                if not match:
+                    continue
+                values['doc_id'] = match.group('doc_id')
+            rows.append(values)
+
+        if not rows:
+            return 0
+
+        columns = ", ".join(rows[0])
+        placeholders = ", ".join(f":{column}" for column in rows[0])
+        updates = ", ".join(f"{column} = excluded.{column}" for column in rows[0] if column != 'doc_id')
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                f"INSERT INTO run_log ({columns}, synced) VALUES ({placeholders}, 1) "
+                f"ON CONFLICT(doc_id) DO UPDATE SET {updates}, synced = 1 "
+                f"WHERE run_log.summary_file_urls = '' AND excluded.summary_file_urls != ''",
+                rows
+            )
+            imported = self.connection.total_changes - before
+        logger.info(f"Imported {imported} rows from the log sheet into the run log store.")
+        return imported
+
+    def is_processed(self, doc_id: str) -> bool:
+        """
+        要約まで完了した doc_id かどうかを判定します。
+
+        Args:
+            doc_id (str): ドキュメントID
+
+        Returns:
+            bool: 処理済みの場合 True
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM run_log WHERE doc_id = ? AND summary_file_urls != '' LIMIT 1",
+                (doc_id,)
+            ).fetchone()
+        return row is not None
+
+    def processed_doc_ids(self) -> Set[str]:
+        """要約まで完了した doc_id の集合を返します。"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT doc_id FROM run_log WHERE doc_id IS NOT NULL AND summary_file_urls != ''"
+            ).fetchall()
+        return {row['doc_id'] for row in rows}
+
+    def find_by_company(self, edinet_code: str, since: Optional[str] = None,
+                        until: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        EDINETコードと発表日の範囲でログを検索します。
+
+        Args:
+            edinet_code (str): EDINETコード
+            since (Optional[str]): 発表日の下限（YYYY-MM-DD、この日を含む）
+            until (Optional[str]): 発表日の上限（YYYY-MM-DD、この日を含む）
+
+        Returns:
+            List[Dict[str, str]]: log シートのヘッダーをキーとしたレコードのリスト（発表日順）
+        """
+        query = "SELECT * FROM run_log WHERE edinet_code = ?"
+        params = [edinet_code]
+        if since:
+            query += " AND release_date >= ?"
+            params.append(since)
+        if until:
+            query += " AND release_date <= ?"
+            params.append(until)
+        query += " ORDER BY release_date, id"
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [self._to_log_record(row) for row in rows]
+
+    def sync_to_sheet(self, spreadsheet_service, spreadsheet_id: str, log_sheet_name: str,
+                      headers: List[str]) -> int:
+        """
+        未同期のレコードを log シートにまとめて追記し、同期済みにします。
+        追記に失敗した場合は未同期のまま残し、次回の同期で再送します。
+
+        Args:
+            spreadsheet_service (SpreadsheetService): スプレッドシートサービス
+            spreadsheet_id (str): スプレッドシートID
+            log_sheet_name (str): ログシート名
+            headers (List[str]): log シートのヘッダー（列の並び順）
+
+        Returns:
+            int: 追記した行数
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT * FROM run_log WHERE synced = 0 ORDER BY id"
+            ).fetchall()
+        if not rows:
+            return 0
+
+        log_data = [
+            [self._to_log_record(row).get(header, "") for header in headers]
+            for row in rows
+        ]
+        try:
+            spreadsheet_service.append_sheet_data(spreadsheet_id, log_sheet_name, log_data)
+        except Exception as e:
+            logger.error(f"Failed to sync {len(rows)} rows to the log sheet '{log_sheet_name}': {e}")
+            return 0
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "UPDATE run_log SET synced = 1 WHERE id = ?",
+                [(row['id'],) for row in rows]
+            )
+        logger.info(f"Synced {len(rows)} rows to the log sheet '{log_sheet_name}'.")
+        return len(rows)
+
+    def _to_log_record(self, row: sqlite3.Row) -> Dict[str, str]:
+        """テーブルの行を log シートのヘッダーをキーとしたレコードに変換します。"""
+        return {header: row[column] or "" for header, column in self.COLUMNS.items()}
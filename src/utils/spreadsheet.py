@@ -1,11 +1,12 @@
 import os
 from pathlib import Path
-from configparser import ConfigParser
+from typing import Dict, List
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 
 from utils.environment import EnvironmentUtils as env
 from utils.logging_config import get_logger
+from utils.quota import get_quota_manager
 
 class SpreadsheetService:
     """スプレッドシート操作を管理するクラス"""
@@ -37,6 +38,7 @@ class SpreadsheetService:
             raise
 
         # Google Sheets API サービスを初期化
+        self.quota = get_quota_manager()
         try:
             self.service = build("sheets", "v4", credentials=self.credentials)
             self.logger.info("Google Sheets API service initialized successfully.")
@@ -44,16 +46,10 @@ class SpreadsheetService:
             self.logger.error(f"Failed to initialize Google Sheets API service: {e}")
             raise
 
-        # ConfigParser で設定ファイルをロード
+        # 解析済みの設定ファイルのスナップショットを取得
         try:
-            config_path = env.get_config_file()
-            self.logger.info(f"Loading configuration from: {config_path}")
-            self.config = ConfigParser()
-
-            if not config_path.exists():
-                raise FileNotFoundError(f"Configuration file not found: {config_path}")
-
-            self.config.read(config_path, encoding='utf-8')  # エンコーディングを明示的に指定
+            self.config = env.get_config()
+            self.logger.info(f"Loading configuration from: {self.config.path}")
         except Exception as e:
             self.logger.error(f"Error loading configuration: {e}")
             raise
@@ -86,14 +82,84 @@ class SpreadsheetService:
         self.logger.info(f"Fetching data from Spreadsheet ID: {spreadsheet_id}, Sheet Name: {sheet_name}")
         try:
             sheet = self.service.spreadsheets()
-            result = sheet.values().get(spreadsheetId=spreadsheet_id, range=sheet_name).execute()
+            result = self.quota.execute(
+                "sheets", "values.get",
+                sheet.values().get(spreadsheetId=spreadsheet_id, range=sheet_name)
+            )
             data = result.get("values", [])
-            self.logger.debug(f"Data fetched: {data}")
+            self.logger.debug(f"Rows fetched from Sheet '{sheet_name}': {len(data)}")
             return data
         except Exception as e:
             self.logger.error(f"Error fetching data for Sheet '{sheet_name}': {e}")
             raise
 
+    def batch_get_columns(self, spreadsheet_id: str, sheet_name: str, columns: List[str]) -> Dict[str, List[str]]:
+        """
+        ヘッダー名で指定した列だけを values.batchGet でまとめて取得します。
+
+        Args:
+            spreadsheet_id (str): スプレッドシートID
+            sheet_name (str): シート名
+            columns (List[str]): 取得する列のヘッダー名
+
+        Returns:
+            Dict[str, List[str]]: ヘッダー名をキーとした列データ（ヘッダー行を除く）。
+                シートに存在しない列は含まれません。
+        """
+        self.logger.info(f"Fetching columns {columns} from Spreadsheet ID: {spreadsheet_id}, Sheet Name: {sheet_name}")
+        try:
+            values = self.service.spreadsheets().values()
+            header_result = self.quota.execute(
+                "sheets", "values.get",
+                values.get(spreadsheetId=spreadsheet_id, range=f"{sheet_name}!1:1")
+            )
+            header_rows = header_result.get("values", [])
+            headers = header_rows[0] if header_rows else []
+
+            targets = [column for column in columns if column in headers]
+            if not targets:
+                return {}
+
+            ranges = []
+            for column in targets:
+                letter = self.column_letter(headers.index(column))
+                ranges.append(f"{sheet_name}!{letter}2:{letter}")
+
+            result = self.quota.execute("sheets", "values.batchGet", values.batchGet(
+                spreadsheetId=spreadsheet_id,
+                ranges=ranges,
+                majorDimension="COLUMNS"
+            ))
+
+            column_data = {}
+            for column, value_range in zip(targets, result.get("valueRanges", [])):
+                column_values = value_range.get("values", [])
+                column_data[column] = column_values[0] if column_values else []
+
+            self.logger.debug(f"Columns fetched from Sheet '{sheet_name}': {list(column_data.keys())}")
+            return column_data
+        except Exception as e:
+            self.logger.error(f"Error fetching columns for Sheet '{sheet_name}': {e}")
+            raise
+
+    @staticmethod
+    def column_letter(index: int) -> str:
+        """
+        0始まりの列番号をA1表記の列文字に変換します。
+
+        Args:
+            index (int): 0始まりの列番号
+
+        Returns:
+            str: 列文字（例: 0 -> 'A', 27 -> 'AB'）
+        """
+        letters = ""
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            letters = chr(ord("A") + remainder) + letters
+        return letters
+
     def get_spreadsheet_id(self, section: str, option: str) -> str:
         """
         スプレッドシートIDを取得します。
@@ -109,9 +175,10 @@ class SpreadsheetService:
         try:
             if not self.config.has_section(section):
                 raise ValueError(f"Section '{section}' not found in the configuration.")
-            if not self.config.has_option(section, option):
-                raise ValueError(f"Option '{option}' not found in section '{section}'.")
             spreadsheet_id = self.config.get(section, option)
+            if spreadsheet_id is None:
+                raise ValueError(f"Option '{option}' not found in section '{section}'.")
+            spreadsheet_id = str(spreadsheet_id)
             self.logger.debug(f"Spreadsheet ID retrieved: {spreadsheet_id}")
             return spreadsheet_id
         except Exception as e:
@@ -135,16 +202,43 @@ class SpreadsheetService:
             range_ = f"{sheet_name}!A1"
             body = {"values": rows}
 
-            response = self.service.spreadsheets().values().append(
+            response = self.quota.execute("sheets", "values.append", self.service.spreadsheets().values().append(
                 spreadsheetId=spreadsheet_id,
                 range=range_,
                 valueInputOption="RAW",
                 insertDataOption="INSERT_ROWS",
                 body=body
-            ).execute()
+            ))
 
             self.logger.debug(f"Data appended successfully to Sheet: {sheet_name}, Response: {response}")
             return response
         except Exception as e:
             self.logger.error(f"Error appending data to sheet '{sheet_name}': {e}")
             raise
+
+    def update_sheet_data(self, spreadsheet_id: str, range_: str, rows: list):
+        """
+        指定された範囲の値を上書きします。
+
+        Args:
+            spreadsheet_id (str): スプレッドシートID
+            range_ (str): A1表記の範囲（シート名のみの場合はA1から書き込み）
+            rows (list): 書き込む行データのリスト
+
+        Returns:
+            dict: APIのレスポンス
+        """
+        self.logger.info(f"Updating data in Spreadsheet ID: {spreadsheet_id}, Range: {range_}")
+        try:
+            response = self.quota.execute("sheets", "values.update", self.service.spreadsheets().values().update(
+                spreadsheetId=spreadsheet_id,
+                range=range_,
+                valueInputOption="RAW",
+                body={"values": rows}
+            ))
+
+            self.logger.debug(f"Data updated successfully in Range: {range_}, Response: {response}")
+            return response
+        except Exception as e:
+            self.logger.error(f"Error updating data in range '{range_}': {e}")
+            raise
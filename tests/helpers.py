@@ -0,0 +1,132 @@
+# tests/helpers.py
+
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.capabilities import ModelCapabilities
+from modules.pdfSummary.summarizer import Summarizer
+from modules.pdfSummary.tokenizer import Tokenizer
+from utils.ledger import RunLedger
+from utils.list_sheet import ListRow, ListSheetSnapshot
+from utils.run_log_store import RunLogStore
+
+# テスト用のプロンプト（2文字 + 書式分 4 = 6 トークン）
+PROMPT_MESSAGES = [{"role": "user", "content": "指示"}]
+# テスト用の最大出力トークン数
+MAX_SUMMARY_TOKENS = 10
+
+class CharEncoding:
+    """1文字を1トークンとして数えるテスト用のエンコーディング"""
+
+    def encode(self, text):
+        return list(text)
+
+    def encode_ordinary_batch(self, texts):
+        return [list(text) for text in texts]
+
+@contextmanager
+def char_encoding():
+    """tiktoken のエンコーディングの代わりに CharEncoding を使用する（アセットをダウンロードしない）"""
+    with mock.patch("modules.pdfSummary.summarizer.get_encoding", return_value=CharEncoding()), \
+            mock.patch("modules.pdfSummary.tokenizer.get_encoding", return_value=CharEncoding()):
+        yield
+
+def create_tokenizer(max_chunk_tokens=1000, model="test-model", mode="length"):
+    """1文字を1トークンとして数える Tokenizer を生成する"""
+    with char_encoding():
+        return Tokenizer(model, max_chunk_tokens, mode=mode)
+
+def create_summarizer(engine, context_window=60, map_parallelism=None, mode="length"):
+    """
+    1文字を1トークンとして数える Summarizer と Tokenizer を生成する。
+    プロンプト 6 トークンと出力 10 トークンを除き、本文の上限は context_window - 16 トークン
+    （デフォルトは 60 - 6 - 10 = 44 トークン）。
+    """
+    capabilities = ModelCapabilities("test-model", context_window=context_window, max_output_tokens=MAX_SUMMARY_TOKENS,
+                                     max_summary_tokens=MAX_SUMMARY_TOKENS, reserve_tokens=0)
+    with char_encoding():
+        summarizer = Summarizer(engine, "test-model", MAX_SUMMARY_TOKENS, PROMPT_MESSAGES, capabilities,
+                                map_parallelism=map_parallelism)
+    return summarizer, create_tokenizer(mode=mode)
+
+def create_mock_client(**create_kwargs):
+    """
+    AsyncOpenAI 互換のモッククライアントと、その chat.completions.with_raw_response.create を返す。
+    close() は AsyncOpenAI と同じくコルーチンのため、SummaryEngine.close() で実際に待機される。
+    """
+    client = mock.MagicMock()
+    client.close = mock.AsyncMock()
+    create = client.chat.completions.with_raw_response.create = mock.AsyncMock(**create_kwargs)
+    return client, create
+
+def config_values(values):
+    """env.get_config_value の代わりに、(セクション, キー) の辞書から値を返す関数"""
+    return lambda section, key, default=None: values.get((section, key), default)
+
+def edinet_document(doc_id, edinet_code="E00001", submitted="2024-11-14 15:00"):
+    """EDINET API の書類一覧の1件"""
+    return {"docID": doc_id, "edinetCode": edinet_code, "docTypeCode": "120", "submitDateTime": submitted}
+
+class FakeSpreadsheetService:
+    """log シートの読み込み結果を返し、書き込みを記録するテスト用サービス"""
+
+    def __init__(self, log_rows):
+        self.log_rows = log_rows
+        self.appended = []
+        self.updated = []
+
+    def get_sheet_data(self, spreadsheet_id, sheet_name):
+        return [list(row) for row in self.log_rows]
+
+    def update_sheet_data(self, spreadsheet_id, range_, rows):
+        self.updated.append((range_, rows))
+
+    def append_sheet_data(self, spreadsheet_id, sheet_name, rows):
+        self.appended.extend(rows)
+
+class FakeContext:
+    """
+    AppContext のテスト用の代替。Google / EDINET はスタブ、ログストアとレジャーは一時ディレクトリの SQLite を使用し、
+    要約処理と Slack のリソースにアクセスした場合は touched に記録します。
+    """
+
+    def __init__(self, directory, edinet_codes, documents, log_rows):
+        self.spreadsheet_service = FakeSpreadsheetService(log_rows)
+        self.spreadsheet_id = "spreadsheet"
+        self.list_snapshot = ListSheetSnapshot([
+            ListRow(row_number=index + 2, edinet_code=code, ir_page_url=f"https://example.com/{code}", checked=True,
+                    stock_code="1234", corp_name=f"会社{code}")
+            for index, code in enumerate(edinet_codes)
+        ])
+        self.edinet_operations = mock.Mock()
+        self.edinet_operations.get_documents_for_date_range.side_effect = (
+            lambda start_date, end_date, edinet_codes_from_sheet:
+            [document for document in documents if document["edinetCode"] in edinet_codes_from_sheet]
+        )
+        self.edinet_operations.fetch_document_data.return_value = b"%PDF-1.7"
+        self.drive_handler = mock.Mock()
+        self.drive_handler.get_or_create_folder.return_value = "folder"
+        self.drive_handler.upload_file.side_effect = lambda file_name, file_content, folder_id: f"file-{file_name}"
+        self.run_log_store = RunLogStore(Path(directory) / "run_log.sqlite3")
+        self.ledger = RunLedger(Path(directory) / "ledger.sqlite3", run_id="test")
+        self.touched = []
+
+    @property
+    def summarization(self):
+        self.touched.append("summarization")
+        return mock.Mock()
+
+    @property
+    def slack_notifier(self):
+        self.touched.append("slack_notifier")
+        return mock.Mock()
+
+    def close(self):
+        self.run_log_store.close()
+        self.ledger.close()
@@ -0,0 +1,67 @@
+# tests/test_assets.py
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from utils.environment import EnvironmentUtils as env
+from modules.pdfSummary import assets
+from modules.pdfSummary.assets import AssetMissingError, get_sentence_model, verify_assets
+
+class TestVerifyAssets(unittest.TestCase):
+    def setUp(self):
+        self.original_root = env.get_project_root()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        (self.root / "config").mkdir()
+        (self.root / "config" / "settings.ini").write_text(
+            "[ASSETS]\nasset_dir = assets\noffline = True\n", encoding="utf-8"
+        )
+        env.set_project_root(self.root)
+
+    def tearDown(self):
+        env.set_project_root(self.original_root)
+        self.temp_dir.cleanup()
+
+    def test_missing_assets_fail_fast(self):
+        with self.assertRaises(AssetMissingError) as context:
+            verify_assets(["gpt-4o"], ["all-MiniLM-L6-v2"])
+        self.assertIn("tiktoken:gpt-4o", str(context.exception))
+        self.assertIn("sentence_transformers:all-MiniLM-L6-v2", str(context.exception))
+
+    def test_prefetched_assets_pass(self):
+        asset_dir = self.root / "assets"
+        model_dir = asset_dir / "sentence_transformers" / "all-MiniLM-L6-v2"
+        model_dir.mkdir(parents=True)
+        (model_dir / "modules.json").write_text("[]", encoding="utf-8")
+        (asset_dir / "manifest.json").write_text(
+            json.dumps({"tiktoken": {"gpt-4o": "o200k_base"}, "sentence_transformers": ["all-MiniLM-L6-v2"]}),
+            encoding="utf-8"
+        )
+
+        verify_assets(["gpt-4o"], ["all-MiniLM-L6-v2"])
+
+class TestSentenceModelSingleton(unittest.TestCase):
+    def setUp(self):
+        assets._sentence_models.clear()
+
+    def tearDown(self):
+        assets._sentence_models.clear()
+
+    def test_model_is_loaded_once_per_process(self):
+        with mock.patch.object(assets, "load_sentence_model", side_effect=lambda name: object()) as load:
+            first = get_sentence_model("all-MiniLM-L6-v2")
+            second = get_sentence_model("all-MiniLM-L6-v2")
+
+        self.assertIs(first, second)
+        load.assert_called_once_with("all-MiniLM-L6-v2")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+# tests/test_batch.py
+
+import json
+import re
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.batch import BatchEngine, BatchState
+from modules.pdfSummary.llm_engine import create_openai_client
+from modules.pdfSummary.response_cache import ResponseCache
+from tests.helpers import create_summarizer
+
+class StubBatchServer:
+    """OpenAI の Files / Batches API の最小限を再現するローカルのスタブサーバー"""
+
+    def __init__(self, polls_until_complete=2):
+        self.polls_until_complete = polls_until_complete
+        self.fail_retrieve = False
+        self.files = {}
+        self.batches = {}
+        self.created_batches = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_json(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path == "/v1/files":
+                    self.send_json(200, stub.create_file(body))
+                elif self.path == "/v1/batches":
+                    self.send_json(200, stub.create_batch(json.loads(body)))
+                else:
+                    self.send_json(404, {"error": {"message": "not found"}})
+
+            def do_GET(self):
+                content = re.fullmatch(r"/v1/files/([^/]+)/content", self.path)
+                batch = re.fullmatch(r"/v1/batches/([^/]+)", self.path)
+                if content:
+                    body = stub.files[content.group(1)].encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif batch and stub.fail_retrieve:
+                    self.send_json(500, {"error": {"message": "interrupted"}})
+                elif batch:
+                    self.send_json(200, stub.retrieve_batch(batch.group(1)))
+                else:
+                    self.send_json(404, {"error": {"message": "not found"}})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def create_file(self, body):
+        # multipart の本文から JSONL の行を取り出す
+        lines = [line for line in body.decode("utf-8").splitlines() if line.startswith('{"custom_id"')]
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = "\n".join(lines)
+        return {"id": file_id, "object": "file", "bytes": len(body), "created_at": 0,
+                "filename": "batch.jsonl", "purpose": "batch", "status": "processed"}
+
+    def create_batch(self, request):
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = {"request": request, "polls": 0}
+        self.created_batches.append(batch_id)
+        return self.batch_payload(batch_id, "in_progress")
+
+    def retrieve_batch(self, batch_id):
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        if batch["polls"] < self.polls_until_complete:
+            return self.batch_payload(batch_id, "in_progress")
+
+        output = []
+        for line in self.files[batch["request"]["input_file_id"]].splitlines():
+            item = json.loads(line)
+            content = "要約:" + item["body"]["messages"][-1]["content"][:4]
+            output.append(json.dumps({
+                "id": f"response-{item['custom_id'][:8]}",
+                "custom_id": item["custom_id"],
+                "response": {"status_code": 200, "body": {
+                    "model": item["body"]["model"],
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                }},
+                "error": None,
+            }, ensure_ascii=False))
+        output_file_id = f"file-{len(self.files)}"
+        self.files[output_file_id] = "\n".join(output)
+        return self.batch_payload(batch_id, "completed", output_file_id)
+
+    def batch_payload(self, batch_id, status, output_file_id=None):
+        request = self.batches[batch_id]["request"]
+        total = len(self.files[request["input_file_id"]].splitlines())
+        return {
+            "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+            "input_file_id": request["input_file_id"], "completion_window": request["completion_window"],
+            "status": status, "created_at": 0, "output_file_id": output_file_id, "error_file_id": None,
+            "request_counts": {"total": total, "completed": total if output_file_id else 0, "failed": 0},
+        }
+
+class TestBatchEngine(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubBatchServer()
+        self.addCleanup(self.stub.close)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.documents = {
+            "S100SHORT": ["あいうえお。"],
+            "S100LONG": ["あ" * 19 + "。", "い" * 19 + "。", "う" * 19 + "。", "え" * 19 + "。"],
+        }
+
+    def create_engine(self):
+        directory = Path(self.temp_dir.name)
+        client = create_openai_client(api_key="test", base_url=self.stub.base_url)
+        engine = BatchEngine(client, ResponseCache(directory / "cache.sqlite3", max_bytes=1024 * 1024),
+                             BatchState(directory / "state.json"), poll_interval=0, completion_window="24h")
+        self.addCleanup(engine.close)
+        return engine
+
+    def summarize(self, engine):
+        # 本文の上限は 60 - 6 - 10 = 44 トークン（S100LONG は map-reduce になる）
+        summarizer, tokenizer = create_summarizer(engine)
+        return engine.summarize_all({
+            doc_id: (lambda pages=pages: summarizer.asummarize_pages(pages, tokenizer))
+            for doc_id, pages in self.documents.items()
+        })
+
+    def test_requests_are_sent_in_one_batch_per_stage(self):
+        results = self.summarize(self.create_engine())
+
+        self.assertEqual(results["S100SHORT"], "要約:あいうえ")
+        # 部分要約（2チャンク）をまとめた再要約の結果
+        self.assertEqual(results["S100LONG"], "要約:要約:あ")
+        # 1件目: 短い文書と長い文書の部分要約 3 件 / 2件目: 再要約 1 件
+        self.assertEqual(len(self.stub.created_batches), 2)
+        input_sizes = [len(self.stub.files[self.stub.batches[batch_id]["request"]["input_file_id"]].splitlines())
+                       for batch_id in self.stub.created_batches]
+        self.assertEqual(input_sizes, [3, 1])
+        self.assertIsNone(BatchState(Path(self.temp_dir.name) / "state.json").batch)
+
+    def test_interrupted_polling_resumes_the_submitted_batch(self):
+        self.stub.fail_retrieve = True
+        with self.assertRaises(Exception):
+            self.summarize(self.create_engine())
+        state = BatchState(Path(self.temp_dir.name) / "state.json")
+        self.assertEqual(state.batch["id"], "batch-0")
+
+        self.stub.fail_retrieve = False
+        results = self.summarize(self.create_engine())
+
+        self.assertEqual(results["S100SHORT"], "要約:あいうえ")
+        self.assertEqual(results["S100LONG"], "要約:要約:あ")
+        # 送信済みのバッチは再送信せず、再要約のバッチのみ追加で送信する
+        self.assertEqual(self.stub.created_batches, ["batch-0", "batch-1"])
+
+class TestBatchState(unittest.TestCase):
+    def test_documents_persist_until_removed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "state.json"
+            BatchState(path).add_document("S100TEST", {"file_id": "file", "folder_id": "folder"})
+
+            state = BatchState(path)
+            self.assertEqual(state.documents["S100TEST"]["file_id"], "file")
+            state.remove_document("S100TEST")
+            self.assertEqual(BatchState(path).documents, {})
+
+if __name__ == "__main__":
+    unittest.main()
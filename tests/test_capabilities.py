@@ -0,0 +1,76 @@
+# tests/test_capabilities.py
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.capabilities import get_model_capabilities, parse_model_table
+from modules.pdfSummary.llm_engine import SummaryEngine
+from tests.helpers import config_values, create_mock_client, create_summarizer
+
+class TestModelCapabilities(unittest.TestCase):
+    def test_parse_model_table(self):
+        self.assertEqual(parse_model_table("gpt-4o:128000, gpt-4o-mini : 64000"), {"gpt-4o": 128000, "gpt-4o-mini": 64000})
+        self.assertEqual(parse_model_table(None), {})
+
+    def test_config_overrides_and_dated_model_names(self):
+        values = {
+            ("OPENAI", "context_windows"): "gpt-4o:100000",
+            ("OPENAI", "max_summary_tokens"): 3000,
+        }
+        with mock.patch("modules.pdfSummary.capabilities.env.get_config_value", side_effect=config_values(values)):
+            capabilities = get_model_capabilities("gpt-4o-2024-08-06")
+
+        self.assertEqual(capabilities.context_window, 100000)
+        self.assertEqual(capabilities.max_output_tokens, 16384)
+        self.assertEqual(capabilities.max_summary_tokens, 3000)
+        self.assertEqual(capabilities.input_budget(500), 100000 - 500 - 3000 - 1000)
+
+class TestSummarizePages(unittest.TestCase):
+    def setUp(self):
+        self.client, self.create = create_mock_client()
+        self.create.return_value = mock.MagicMock(headers={})
+        self.create.return_value.parse.return_value.choices = [mock.MagicMock()]
+        self.create.return_value.parse.return_value.choices[0].message.content = "要約"
+        self.engine = SummaryEngine(self.client)
+        # 本文の上限は 60 - 6 - 10 = 44 トークン
+        self.summarizer, self.tokenizer = create_summarizer(self.engine)
+
+    def tearDown(self):
+        self.engine.close()
+        self.client.close.assert_awaited_once()
+
+    def test_document_that_fits_is_sent_in_one_call(self):
+        summary = self.summarizer.summarize_pages(["あいうえお。", "かきくけこ。"], self.tokenizer)
+
+        self.assertEqual(summary, "要約")
+        self.assertEqual(self.create.call_count, 1)
+        messages = self.create.call_args.kwargs["messages"]
+        self.assertEqual(messages[-1]["content"], "あいうえお。\n\nかきくけこ。")
+
+    def test_large_document_is_packed_into_fewest_calls(self):
+        pages = ["あ" * 19 + "。", "い" * 19 + "。", "う" * 19 + "。", "え" * 19 + "。"]
+
+        self.summarizer.summarize_pages(pages, self.tokenizer)
+
+        calls = self.create.call_args_list
+        # 44 トークンの上限に 20 トークンの文を2つずつ詰めて2回、部分要約をまとめて1回
+        self.assertEqual(len(calls), 3)
+        self.assertTrue(all(call.kwargs["max_tokens"] == 10 for call in calls))
+        self.assertEqual(calls[-1].kwargs["messages"][-1]["content"], "要約\n\n要約")
+
+    def test_budget_is_capped_by_the_tpm_limit(self):
+        self.assertEqual(self.summarizer.input_budget(), 44)
+
+        # 1回のリクエスト（プロンプト 6 + 本文 + 出力 10）が TPM 40 に収まるよう、本文は 24 トークンまで
+        self.engine.scheduler.update_from_headers({"x-ratelimit-limit-tokens": "40"})
+        self.assertEqual(self.summarizer.input_budget(), 24)
+        self.assertLess(self.summarizer.input_budget(tables_text="表"), 24)
+
+if __name__ == "__main__":
+    unittest.main()
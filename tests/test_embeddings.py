@@ -0,0 +1,94 @@
+# tests/test_embeddings.py
+
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.embeddings import EmbeddingCache, EmbeddingService, sentence_hash
+
+class FakeBackend:
+    """文の長さと先頭文字のコードからベクトルを作るテスト用のバックエンド"""
+
+    cache_key = "fake-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, sentences):
+        self.calls.append(list(sentences))
+        return np.array([[len(sentence), ord(sentence[0]), 1.0] for sentence in sentences], dtype=np.float32)
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_vectors_persist_and_grow(self):
+        cache = EmbeddingCache(self.cache_dir, "fake-model")
+        cache.INITIAL_CAPACITY = 4
+        hashes = [sentence_hash(f"文{i}") for i in range(10)]
+        vectors = np.arange(30, dtype=np.float32).reshape(10, 3)
+        cache.add(hashes[:3], vectors[:3])
+        cache.add(hashes, vectors)
+        cache.close()
+
+        reopened = EmbeddingCache(self.cache_dir, "fake-model")
+        found = reopened.lookup(hashes + [sentence_hash("未登録")])
+        reopened.close()
+
+        self.assertEqual(len(found), 10)
+        np.testing.assert_array_equal(found[hashes[7]], vectors[7])
+
+class TestEmbeddingService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = FakeBackend()
+        self.cache = EmbeddingCache(Path(self.temp_dir.name), self.backend.cache_key)
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_cached_sentences_are_not_encoded_again(self):
+        service = EmbeddingService(self.backend, self.cache, max_wait_seconds=0)
+
+        first = service.embed(["売上高", "営業利益", "売上高"])
+        second = service.embed(["営業利益", "経常利益"])
+
+        self.assertEqual(self.backend.calls, [["売上高", "営業利益"], ["経常利益"]])
+        np.testing.assert_array_equal(first[0], first[2])
+        np.testing.assert_array_equal(first[1], second[0])
+
+    def test_concurrent_documents_share_a_batch(self):
+        service = EmbeddingService(self.backend, None, batch_size=100, max_wait_seconds=0.5)
+        results = {}
+
+        def embed(name, sentences):
+            results[name] = service.embed(sentences)
+
+        threads = [
+            threading.Thread(target=embed, args=("a", ["文書Aの文1", "共通の定型文"])),
+            threading.Thread(target=embed, args=("b", ["文書Bの文1", "共通の定型文"])),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.backend.calls), 1)
+        self.assertEqual(sorted(self.backend.calls[0]), sorted(["文書Aの文1", "共通の定型文", "文書Bの文1"]))
+        np.testing.assert_array_equal(results["a"][1], results["b"][1])
+
+if __name__ == "__main__":
+    unittest.main()
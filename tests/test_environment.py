@@ -0,0 +1,49 @@
+# tests/test_environment.py
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from utils.environment import EnvironmentUtils as env
+
+class TestConfigSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.original_root = env.get_project_root()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.temp_dir.name)
+        (root / "config").mkdir()
+        self.config_path = root / "config" / "settings.ini"
+        self.config_path.write_text("[SAMPLE]\ncount = 3\nratio = 0.5\nenabled = true\nname = abc\n", encoding="utf-8")
+        env.set_project_root(root)
+
+    def tearDown(self):
+        env.set_project_root(self.original_root)
+        self.temp_dir.cleanup()
+
+    def test_values_are_typed(self):
+        self.assertEqual(env.get_config_value("SAMPLE", "count"), 3)
+        self.assertEqual(env.get_config_value("SAMPLE", "ratio"), 0.5)
+        self.assertIs(env.get_config_value("SAMPLE", "enabled"), True)
+        self.assertEqual(env.get_config_value("SAMPLE", "name"), "abc")
+        self.assertEqual(env.get_config_value("SAMPLE", "missing", default="x"), "x")
+        self.assertEqual(env.get_config_value("MISSING", "count", default=1), 1)
+
+    def test_snapshot_is_reused_until_mtime_changes(self):
+        snapshot = env.get_config()
+        self.assertIs(env.get_config(), snapshot)
+
+        self.config_path.write_text("[SAMPLE]\ncount = 4\n", encoding="utf-8")
+        stat = self.config_path.stat()
+        os.utime(self.config_path, ns=(stat.st_atime_ns, snapshot.mtime_ns + 1_000_000_000))
+
+        self.assertIsNot(env.get_config(), snapshot)
+        self.assertEqual(env.get_config_value("SAMPLE", "count"), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_extraction_cache.py
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import pymupdf
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary import extraction_cache
+from modules.pdfSummary.extraction_cache import ExtractionCache
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.pdf_path = self.root / "sample.pdf"
+        doc = pymupdf.open()
+        for page_num in range(5):
+            doc.new_page().insert_text((72, 72), f"Page {page_num + 1} body text")
+        doc.save(str(self.pdf_path))
+        doc.close()
+        self.cache = ExtractionCache(cache_dir=self.root / "cache", enabled=True)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_second_open_reads_pages_from_cache(self):
+        first = self.cache.open(self.pdf_path)
+        pages = list(first.iter_pages())
+        first.save()
+
+        with mock.patch.object(extraction_cache, "iter_pdf_pages") as iter_pdf_pages:
+            second = self.cache.open(self.pdf_path)
+            self.assertEqual(list(second.iter_pages()), pages)
+            iter_pdf_pages.assert_not_called()
+
+        self.assertEqual(second.page_count, 5)
+        self.assertEqual(len(list((self.root / "cache").rglob("*.json.gz"))), 1)
+
+    def test_only_missing_pages_are_extracted(self):
+        first = self.cache.open(self.pdf_path)
+        list(first.iter_pages([1, 3]))
+        first.save()
+
+        second = self.cache.open(self.pdf_path)
+        with mock.patch.object(extraction_cache, "iter_pdf_pages", return_value=iter(["extracted"])) as iter_pdf_pages:
+            pages = list(second.iter_pages([0, 1, 3]))
+
+        iter_pdf_pages.assert_called_once_with(self.pdf_path, pages=[0])
+        self.assertEqual(pages[0], "extracted")
+        self.assertIn("Page 2 body text", pages[1])
+        self.assertIn("Page 4 body text", pages[2])
+
+    def test_table_regions_are_removed_from_page_text(self):
+        with mock.patch.object(extraction_cache, "page_text_without_tables", return_value="[表1 p.2]\n") as without_tables:
+            first = self.cache.open(self.pdf_path)
+            tables = [pd.DataFrame([["売上高", "100"]], columns=["科目", "当期"])]
+            tables[0].attrs.update(page=2, bbox=[72, 100, 272, 140])
+            pages = list(first.iter_pages([0, 1], tables=tables))
+            first.save()
+            cached = list(self.cache.open(self.pdf_path).iter_pages([0, 1], tables=tables))
+
+        without_tables.assert_called_once_with(self.pdf_path, 1, [("[表1 p.2]", [72, 100, 272, 140])])
+        self.assertIn("Page 1 body text", pages[0])
+        self.assertEqual(pages[1], "[表1 p.2]\n")
+        self.assertEqual(cached, pages)
+
+    def test_disabled_cache_does_not_write(self):
+        extraction = ExtractionCache(cache_dir=self.root / "cache", enabled=False).open(self.pdf_path)
+        self.assertEqual(len(list(extraction.iter_pages())), 5)
+        extraction.save()
+
+        self.assertFalse((self.root / "cache").exists())
+
+if __name__ == "__main__":
+    unittest.main()
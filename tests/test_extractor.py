@@ -0,0 +1,54 @@
+# tests/test_extractor.py
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pymupdf
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.extractor import extract_text_from_pdf, iter_pdf_pages, _split_page_ranges
+
+def create_pdf(path: Path, page_count: int) -> None:
+    """各ページにページ番号入りのテキストを書いたPDFを作成"""
+    doc = pymupdf.open()
+    for page_num in range(page_count):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {page_num + 1} body text")
+    doc.save(str(path))
+    doc.close()
+
+class TestExtractor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = Path(self.temp_dir.name) / "sample.pdf"
+        create_pdf(self.pdf_path, 12)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_split_page_ranges_covers_all_pages(self):
+        self.assertEqual(_split_page_ranges(10, 3), [(0, 4), (4, 7), (7, 10)])
+        self.assertEqual(_split_page_ranges(2, 8), [(0, 1), (1, 2)])
+
+    def test_parallel_extraction_matches_single_process(self):
+        single = extract_text_from_pdf(self.pdf_path, max_workers=1)
+        parallel = extract_text_from_pdf(self.pdf_path, max_workers=2, parallel_threshold=4)
+
+        self.assertEqual(single, parallel)
+        self.assertLess(parallel.index("Page 2 "), parallel.index("Page 11 "))
+
+    def test_iter_pdf_pages_yields_pages_in_order(self):
+        pages = iter_pdf_pages(self.pdf_path, max_workers=3, parallel_threshold=4)
+
+        self.assertEqual(next(pages).strip(), "Page 1 body text")
+        rest = list(pages)
+        self.assertEqual(len(rest), 11)
+        self.assertEqual([page.strip() for page in rest][-1], "Page 12 body text")
+
+if __name__ == "__main__":
+    unittest.main()
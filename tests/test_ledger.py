@@ -0,0 +1,111 @@
+# tests/test_ledger.py
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.llm_engine import SummaryEngine
+from modules.pdfSummary.response_cache import ResponseCache
+from utils.ledger import RunLedger, parse_price_table, record_request, stage, timed_stage
+from tests.helpers import create_mock_client
+
+MESSAGES = [{"role": "user", "content": "本文"}]
+
+class TestRunLedger(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.ledger = RunLedger(Path(self.temp_dir.name) / "ledger.sqlite3", run_id="run-1")
+        self.ledger.prices = {"gpt-4o": (2.0, 8.0, 1.0)}
+        self.addCleanup(self.ledger.close)
+
+    def test_parse_price_table(self):
+        self.assertEqual(parse_price_table("gpt-4o:2.50/10.00/1.25, gpt-4o-mini:0.15/0.60"),
+                         {"gpt-4o": (2.5, 10.0, 1.25), "gpt-4o-mini": (0.15, 0.6, 0.15)})
+
+    def test_cost_accounts_for_cached_tokens_batch_and_cache_hits(self):
+        # 入力 1000（うちキャッシュ 400）、出力 100
+        cost = self.ledger.cost("gpt-4o-2024-08-06", 1000, 100, 400, "api")
+        self.assertAlmostEqual(cost, (600 * 2.0 + 400 * 1.0 + 100 * 8.0) / 1_000_000)
+        self.assertAlmostEqual(self.ledger.cost("gpt-4o", 1000, 100, 400, "batch"), cost / 2)
+        self.assertEqual(self.ledger.cost("gpt-4o", 1000, 100, 400, "cache"), 0)
+
+    def test_records_are_attributed_to_the_current_document(self):
+        record_request("gpt-4o", {"prompt_tokens": 10, "completion_tokens": 5})  # 文書の処理中でないため記録しない
+        with self.ledger.document("S100A"):
+            record_request("gpt-4o", {"prompt_tokens": 1000, "completion_tokens": 100,
+                                      "prompt_tokens_details": {"cached_tokens": 400}}, latency_seconds=1.5)
+            with mock.patch("utils.ledger.time.perf_counter", side_effect=[10.0, 12.5]), stage("summarize"):
+                pass
+        with self.ledger.document("S100B"):
+            record_request("gpt-4o", source="cache")
+
+        totals = {entry["doc_id"]: entry for entry in self.ledger.document_totals()}
+        self.assertEqual(totals["S100A"]["prompt_tokens"], 1000)
+        self.assertEqual(totals["S100A"]["cached_tokens"], 400)
+        self.assertEqual(totals["S100A"]["stages"], {"summarize": 2.5})
+        self.assertEqual(totals["S100B"]["cache_hits"], 1)
+        self.assertEqual(totals["S100B"]["cost_usd"], 0)
+
+        report = self.ledger.report()
+        self.assertIn("文書 2 件、リクエスト 2 件（応答キャッシュ 1 件）", report)
+        self.assertIn("S100A", report)
+        self.assertEqual(self.ledger.latest_run_id(), "run-1")
+
+    def test_timed_stages_exclude_nested_stages(self):
+        clock = [0.0]
+
+        def pages():
+            for page in ["p1", "p2"]:
+                clock[0] += 2.0
+                yield page
+
+        def chunks(pages):
+            for page in pages:
+                clock[0] += 1.0
+                yield page.upper()
+
+        with mock.patch("utils.ledger.time.perf_counter", side_effect=lambda: clock[0]):
+            with self.ledger.document("S100A"):
+                iterator = timed_stage("chunk", chunks(timed_stage("extract", pages())))
+            # 取り出すのが文書の処理の外（要約エンジンのスレッドなど）でも、生成時の文書に記録する
+            self.assertEqual(list(iterator), ["P1", "P2"])
+
+        totals = {entry["doc_id"]: entry for entry in self.ledger.document_totals()}
+        self.assertEqual(totals["S100A"]["stages"], {"extract": 4.0, "chunk": 2.0})
+
+class TestEngineLedger(unittest.TestCase):
+    def test_engine_records_usage_and_latency_for_the_calling_document(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ledger = RunLedger(Path(temp_dir) / "ledger.sqlite3", run_id="run-1")
+            client, create = create_mock_client()
+            create.return_value = mock.MagicMock(headers={})
+            response = create.return_value.parse.return_value
+            response.choices[0].message.content = "要約"
+            response.usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30,
+                                             prompt_tokens_details=SimpleNamespace(cached_tokens=0))
+            engine = SummaryEngine(client, cache=ResponseCache(Path(temp_dir) / "cache.sqlite3", max_bytes=1024))
+
+            # 要約はエンジンのスレッドで実行されるが、呼び出し元の文書に記録される
+            with ledger.document("S100A"):
+                engine.run(engine.complete("gpt-4o", MESSAGES, 100))
+                engine.run(engine.complete("gpt-4o", MESSAGES, 100))
+            engine.close()
+
+            rows = ledger.connection.execute(
+                "SELECT doc_id, source, prompt_tokens, completion_tokens, latency_seconds FROM requests ORDER BY id"
+            ).fetchall()
+            ledger.close()
+
+        self.assertEqual([tuple(row)[:4] for row in rows], [("S100A", "api", 120, 30), ("S100A", "cache", 0, 0)])
+        self.assertIsNotNone(rows[0]["latency_seconds"])
+
+if __name__ == "__main__":
+    unittest.main()
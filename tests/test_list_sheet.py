@@ -0,0 +1,50 @@
+# tests/test_list_sheet.py
+
+import sys
+import unittest
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from utils.list_sheet import ListSheetSnapshot
+
+class FakeSpreadsheetService:
+    """batch_get_columns の結果を返すだけのテスト用サービス"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.calls = 0
+
+    def batch_get_columns(self, spreadsheet_id, sheet_name, columns):
+        self.calls += 1
+        return {key: value for key, value in self.columns.items() if key in columns}
+
+class TestListSheetSnapshot(unittest.TestCase):
+    def test_rows_are_typed_and_padded(self):
+        service = FakeSpreadsheetService({
+            "EDINET_code": ["E00001", "E00002", "E00003"],
+            "ir_page_url": ["https://example.com/1", "", "https://example.com/3"],
+            "check": ["TRUE", "false"],
+            "corp_name": ["A社"],
+        })
+        snapshot = ListSheetSnapshot.load(service, "sheet-id")
+
+        self.assertEqual(service.calls, 1)
+        self.assertEqual(len(snapshot.rows), 3)
+        self.assertEqual(snapshot.rows[0].row_number, 2)
+        self.assertTrue(snapshot.rows[0].checked)
+        self.assertFalse(snapshot.rows[2].checked)
+        self.assertEqual(snapshot.rows[2].corp_name, "")
+        self.assertEqual(snapshot.rows[1].stock_code, "")
+        self.assertEqual(snapshot.edinet_codes, ["E00001", "E00002", "E00003"])
+        self.assertEqual([row.edinet_code for row in snapshot.checked_rows()], ["E00001"])
+
+    def test_missing_required_column_raises(self):
+        service = FakeSpreadsheetService({"EDINET_code": ["E00001"], "check": ["TRUE"]})
+        with self.assertRaises(ValueError):
+            ListSheetSnapshot.load(service, "sheet-id")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# tests/test_main.py
+
+import io
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+import main
+from modules.spreadsheet_to_edinet import LOG_HEADERS
+from tests.helpers import FakeContext, config_values, edinet_document
+from utils.run_log_store import RunLogStore
+
+CONFIG = {
+    ("DATE_RANGE", "start_date"): "2024-11-01",
+    ("DATE_RANGE", "end_date"): "2024-11-30",
+}
+
+class TestParseArgs(unittest.TestCase):
+    def test_list_modes(self):
+        self.assertTrue(main.parse_args(["--list-only"]).list_only)
+        args = main.parse_args(["--dry-run"])
+        self.assertTrue(args.dry_run)
+        self.assertFalse(args.list_only)
+        self.assertEqual(args.command, "run")
+
+    def test_list_modes_are_mutually_exclusive(self):
+        with self.assertRaises(SystemExit), redirect_stdout(io.StringIO()), mock.patch("sys.stderr", io.StringIO()):
+            main.parse_args(["--list-only", "--dry-run"])
+
+class TestListFilings(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+        # log シートでは S100SHET、ローカルのログストアでは S100LOCL が処理済み
+        sheet_record = {'EDINET_code': "E00001", 'drive_summary_file_urls': "https://drive.google.com/file/d/s/view",
+                        'doc_id': "S100SHET"}
+        log_rows = [LOG_HEADERS, [sheet_record.get(header, "") for header in LOG_HEADERS]]
+        documents = [
+            edinet_document("S100NEW1", "E00001", "2024-11-20 15:00"),
+            edinet_document("S100SHET", "E00001", "2024-11-05 15:00"),
+            edinet_document("S100LOCL", "E00002", "2024-11-10 15:00"),
+        ]
+        self.context = FakeContext(self.directory, ["E00001", "E00002"], documents, log_rows)
+        self.addCleanup(self.context.close)
+
+        self.local_db = self.directory / "local.sqlite3"
+        local_store = RunLogStore(self.local_db)
+        local_store.record({'doc_id': "S100LOCL", 'drive_summary_file_urls': "https://drive.google.com/file/d/l/view"})
+        local_store.close()
+
+        patcher = mock.patch("main.env")
+        env = patcher.start()
+        self.addCleanup(patcher.stop)
+        env.get_config_value.side_effect = config_values(CONFIG)
+
+        snapshot = RunLogStore.snapshot
+        patcher = mock.patch("main.RunLogStore.snapshot", side_effect=lambda: snapshot(self.local_db))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def list_filings(self, dry_run):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main.list_filings(None, context=self.context, dry_run=dry_run)
+        return [line.split("\t") for line in output.getvalue().splitlines()]
+
+    def assert_nothing_is_processed(self):
+        # 要約・Slack のリソースには触れず、取得・アップロード・書き込みも行わない
+        self.assertEqual(self.context.touched, [])
+        self.assertEqual(self.context.drive_handler.method_calls, [])
+        self.context.edinet_operations.fetch_document_data.assert_not_called()
+        self.assertEqual(self.context.spreadsheet_service.updated, [])
+        self.assertEqual(self.context.spreadsheet_service.appended, [])
+
+    def test_list_only_prints_filings_in_submission_order(self):
+        lines = self.list_filings(dry_run=False)
+
+        self.assertEqual(lines, [
+            ["2024-11-05", "E00001", "会社E00001", "有価証券報告書", "S100SHET"],
+            ["2024-11-10", "E00002", "会社E00002", "有価証券報告書", "S100LOCL"],
+            ["2024-11-20", "E00001", "会社E00001", "有価証券報告書", "S100NEW1"],
+            ["3 filings between 2024-11-01 and 2024-11-30"],
+        ])
+        self.assert_nothing_is_processed()
+
+    def test_dry_run_marks_processed_and_new_filings(self):
+        lines = self.list_filings(dry_run=True)
+
+        self.assertEqual([(line[4], line[5]) for line in lines[:-1]],
+                         [("S100SHET", "processed"), ("S100LOCL", "processed"), ("S100NEW1", "new")])
+        self.assert_nothing_is_processed()
+        # log シートの取り込みはメモリ上の複製に対して行い、ローカルのデータベースには書き込まない
+        local_store = RunLogStore(self.local_db)
+        self.addCleanup(local_store.close)
+        self.assertEqual(local_store.processed_doc_ids(), {"S100LOCL"})
+
+if __name__ == "__main__":
+    unittest.main()
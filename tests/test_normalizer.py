@@ -0,0 +1,50 @@
+# tests/test_normalizer.py
+
+import sys
+import unittest
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.normalizer import TextNormalizer, normalize_text
+
+def make_page(page_num: int, body: str) -> str:
+    return f"株式会社サンプル　第{page_num}期 四半期報告書\n\n{body}\n\n－ {page_num} －\n"
+
+class TestNormalizeText(unittest.TestCase):
+    def test_nfkc_and_whitespace(self):
+        self.assertEqual(
+            normalize_text("売上高　　１２３，４５６千円\t（前年同期比 ＋７．３％）\n\n\n\nｶﾌﾞｼｷｶﾞｲｼｬ  "),
+            "売上高 123,456千円 (前年同期比 +7.3%)\n\nカブシキガイシャ",
+        )
+
+class TestTextNormalizer(unittest.TestCase):
+    def test_removes_running_headers_and_page_numbers(self):
+        bodies = ["事業の概況について", "セグメント別の業績", "財政状態の分析", "キャッシュ・フロー", "今後の見通し"]
+        pages = [make_page(page_num, f"{body}。\n417") for page_num, body in enumerate(bodies, start=1)]
+        normalizer = TextNormalizer(sample_pages=3)
+
+        result = list(normalizer.iter_pages(pages))
+
+        self.assertEqual(len(result), 5)
+        self.assertEqual(result[0], "事業の概況について。\n417")
+        self.assertEqual(result[4], "今後の見通し。\n417")
+        self.assertEqual(normalizer.stats["pages"], 5)
+        self.assertLess(normalizer.stats["chars_after"], normalizer.stats["chars_before"])
+
+    def test_keeps_lines_that_do_not_repeat(self):
+        pages = ["表紙タイトル\n本文A", "目次\n本文B"]
+
+        self.assertEqual(list(TextNormalizer().iter_pages(pages)), ["表紙タイトル\n本文A", "目次\n本文B"])
+
+    def test_counts_tokens_before_and_after(self):
+        normalizer = TextNormalizer(count_tokens=len, sample_pages=2)
+        list(normalizer.iter_pages([make_page(1, "本文A"), make_page(2, "本文B")]))
+
+        self.assertEqual(normalizer.stats["tokens_before"], normalizer.stats["chars_before"])
+        self.assertEqual(normalizer.stats["tokens_after"], len("本文A") * 2)
+
+if __name__ == "__main__":
+    unittest.main()
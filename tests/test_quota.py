@@ -0,0 +1,126 @@
+# tests/test_quota.py
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from googleapiclient.errors import HttpError
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from utils.quota import QuotaManager, TokenBucket
+
+class FakeClock:
+    """time.sleep で進むテスト用の時計（utils.quota の time モジュールを置き換える）"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class FakeResponse(dict):
+    """HttpError.resp（httplib2.Response）の代わりに使うレスポンス"""
+
+    def __init__(self, status, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+        self.reason = "error"
+
+def http_error(status, headers=None):
+    return HttpError(FakeResponse(status, headers), b'{"error": {"message": "error"}}')
+
+class FailingCall:
+    """指定したエラーを順に送出し、尽きたら "ok" を返す呼び出し"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+class QuotaTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        for target, value in (("utils.quota.time", self.clock), ("utils.quota.random.uniform", lambda a, b: 0.0)):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+class TestTokenBucket(QuotaTestCase):
+    def test_requests_are_spaced_by_the_rate(self):
+        bucket = TokenBucket(60)
+        acquired_at = []
+        for _ in range(3):
+            bucket.acquire()
+            acquired_at.append(self.clock.now)
+
+        self.assertEqual(acquired_at, [0.0, 1.0, 2.0])
+
+    def test_capacity_allows_a_burst(self):
+        bucket = TokenBucket(120, capacity=2)
+        waits = [bucket.acquire() for _ in range(3)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.5])
+
+class TestQuotaManager(QuotaTestCase):
+    def test_retry_after_is_honoured(self):
+        quota = QuotaManager(requests_per_minute={"sheets": 60})
+        call = FailingCall(http_error(429, {"retry-after": "7"}))
+
+        self.assertEqual(quota.call("sheets", "values.get", call), "ok")
+
+        self.assertEqual(call.count, 2)
+        self.assertEqual(self.clock.sleeps, [7.0])
+
+    def test_retries_stop_at_the_limit(self):
+        quota = QuotaManager(max_retries=2, base_delay=1.0)
+        call = FailingCall(*(http_error(503) for _ in range(5)))
+
+        with self.assertRaises(HttpError):
+            quota.call("drive", "files.create", call)
+
+        self.assertEqual(call.count, 3)
+        # 指数バックオフ（ジッターは 0 に固定）
+        self.assertEqual(self.clock.sleeps, [1.0, 2.0])
+        self.assertEqual(quota.summary()["drive.files.create"]["retries"], 2)
+
+    def test_non_retryable_errors_pass_through(self):
+        quota = QuotaManager()
+        call = FailingCall(http_error(404))
+
+        with self.assertRaises(HttpError):
+            quota.call("drive", "files.get", call)
+
+        self.assertEqual(call.count, 1)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(quota.summary()["drive.files.get"]["retries"], 0)
+
+    def test_summary_counts_calls_per_api_and_method(self):
+        quota = QuotaManager(requests_per_minute={"sheets": 60})
+        request = mock.Mock()
+        request.execute.return_value = {"values": []}
+
+        quota.execute("sheets", "values.get", request)
+        quota.execute("sheets", "values.get", request)
+        quota.call("drive", "files.create", FailingCall(http_error(500)))
+
+        self.assertEqual(quota.summary(), {
+            "drive.files.create": {"calls": 2, "retries": 1, "throttled_seconds": 0.0},
+            "sheets.values.get": {"calls": 2, "retries": 0, "throttled_seconds": 1.0},
+        })
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+# tests/test_rate_limiter.py
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import httpx
+import openai
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.llm_engine import SummaryEngine
+from modules.pdfSummary.rate_limiter import (
+    RateLimitScheduler, RequestTooLargeError, is_retryable, parse_duration, retry_after_seconds
+)
+from tests.helpers import create_mock_client
+
+class FakeClock:
+    """asyncio.sleep で進むテスト用の時計"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return openai.RateLimitError("rate limited", response=httpx.Response(429, headers=headers, request=request), body=None)
+
+class TestHeaders(unittest.TestCase):
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("6m0s"), 360)
+        self.assertAlmostEqual(parse_duration("1.5s"), 1.5)
+        self.assertAlmostEqual(parse_duration("20ms"), 0.02)
+        self.assertIsNone(parse_duration(None))
+        self.assertIsNone(parse_duration("soon"))
+
+    def test_retry_after_prefers_milliseconds(self):
+        self.assertAlmostEqual(retry_after_seconds({"retry-after-ms": "250", "retry-after": "1"}), 0.25)
+        self.assertEqual(retry_after_seconds({"retry-after": "3"}), 3)
+        self.assertIsNone(retry_after_seconds({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"}))
+        self.assertIsNone(retry_after_seconds(None))
+
+class TestRateLimitScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("modules.pdfSummary.rate_limiter.asyncio.sleep", self.clock.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_requests_wait_for_token_budget(self):
+        scheduler = RateLimitScheduler(rpm=60, tpm=1000, clock=self.clock)
+
+        async def acquire_all():
+            for _ in range(3):
+                await scheduler.acquire(400)
+
+        asyncio.run(acquire_all())
+
+        # 2件で 800 トークンを使い、3件目は残り 200 → 400 に回復するまで 200 * 60 / 1000 = 12 秒待つ
+        self.assertEqual(len(self.clock.sleeps), 1)
+        self.assertAlmostEqual(self.clock.now, 12)
+
+    def test_request_larger_than_tpm_is_rejected(self):
+        scheduler = RateLimitScheduler(tpm=1000, clock=self.clock)
+
+        with self.assertRaises(RequestTooLargeError):
+            asyncio.run(scheduler.acquire(1001))
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_headers_update_limits_and_pause_until_reset(self):
+        scheduler = RateLimitScheduler(clock=self.clock)
+        scheduler.update_from_headers({
+            "x-ratelimit-limit-requests": "100",
+            "x-ratelimit-limit-tokens": "5000",
+            "x-ratelimit-remaining-requests": "99",
+            "x-ratelimit-remaining-tokens": "0",
+            "x-ratelimit-reset-tokens": "1.5s",
+        })
+
+        self.assertEqual((scheduler.rpm, scheduler.tpm), (100, 5000))
+        asyncio.run(scheduler.acquire(10))
+        self.assertGreaterEqual(self.clock.now, 1.5)
+
+    def test_backoff_uses_retry_after_or_jittered_exponential(self):
+        scheduler = RateLimitScheduler(retry_base_seconds=1, retry_max_seconds=8)
+
+        self.assertGreaterEqual(scheduler.backoff_seconds(0, {"retry-after": "5"}), 5)
+        self.assertLessEqual(scheduler.backoff_seconds(0, {"retry-after": "5"}), 6)
+        for attempt in range(10):
+            self.assertLessEqual(scheduler.backoff_seconds(attempt), min(8, 2 ** attempt))
+
+class TestRetryable(unittest.TestCase):
+    def test_request_too_large_is_not_retried(self):
+        self.assertTrue(is_retryable(rate_limit_error({})))
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        too_large = openai.RateLimitError(
+            "Request too large for gpt-4o on tokens per min (TPM): Limit 30000, Requested 45000.",
+            response=httpx.Response(429, request=request), body=None,
+        )
+        self.assertFalse(is_retryable(too_large))
+
+class TestEngineRetry(unittest.TestCase):
+    def create_engine(self, side_effect, max_retries=3):
+        client, create = create_mock_client(side_effect=side_effect)
+        scheduler = RateLimitScheduler(max_retries=max_retries, retry_base_seconds=0.01)
+        engine = SummaryEngine(client, scheduler=scheduler)
+        self.addCleanup(engine.close)
+        return engine, create
+
+    def test_rate_limited_request_is_retried(self):
+        raw_response = mock.MagicMock(headers={"x-ratelimit-limit-tokens": "30000"})
+        raw_response.parse.return_value.choices[0].message.content = " 要約 "
+        engine, create = self.create_engine([rate_limit_error({"retry-after-ms": "10"}), raw_response])
+
+        summary = engine.run(engine.complete("gpt-4o", [{"role": "user", "content": "本文"}], 100, input_tokens=10))
+
+        self.assertEqual(summary, "要約")
+        self.assertEqual(create.await_count, 2)
+        self.assertEqual(engine.scheduler.stats["retries"], 1)
+        self.assertEqual(engine.scheduler.tpm, 30000)
+
+    def test_gives_up_after_max_retries(self):
+        engine, create = self.create_engine(rate_limit_error({"retry-after-ms": "1"}), max_retries=2)
+
+        with self.assertRaises(openai.RateLimitError):
+            engine.run(engine.complete("gpt-4o", [{"role": "user", "content": "本文"}], 100))
+        self.assertEqual(create.await_count, 3)
+
+    def test_non_retryable_error_is_raised_immediately(self):
+        engine, create = self.create_engine(ValueError("bad request"))
+
+        with self.assertRaises(ValueError):
+            engine.run(engine.complete("gpt-4o", [{"role": "user", "content": "本文"}], 100))
+        self.assertEqual(create.await_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# tests/test_response_cache.py
+
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.llm_engine import SummaryEngine
+from modules.pdfSummary.response_cache import ResponseCache
+from tests.helpers import create_mock_client
+
+MESSAGES = [{"role": "user", "content": "指示"}, {"role": "user", "content": "本文"}]
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "response_cache.sqlite3"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_depends_on_every_request_parameter(self):
+        key = ResponseCache.make_key("gpt-4o", MESSAGES, 0.7, 2000)
+
+        self.assertEqual(key, ResponseCache.make_key("gpt-4o", [dict(message) for message in MESSAGES], 0.7, 2000))
+        self.assertNotEqual(key, ResponseCache.make_key("gpt-4o-mini", MESSAGES, 0.7, 2000))
+        self.assertNotEqual(key, ResponseCache.make_key("gpt-4o", MESSAGES[:1], 0.7, 2000))
+        self.assertNotEqual(key, ResponseCache.make_key("gpt-4o", MESSAGES, 0.2, 2000))
+        self.assertNotEqual(key, ResponseCache.make_key("gpt-4o", MESSAGES, 0.7, 1000))
+
+    def test_responses_persist_across_instances(self):
+        cache = ResponseCache(self.db_path, max_bytes=1024)
+        cache.put("key", "gpt-4o", "要約")
+        cache.close()
+
+        reopened = ResponseCache(self.db_path, max_bytes=1024)
+        self.assertEqual(reopened.get("key"), "要約")
+        self.assertIsNone(reopened.get("missing"))
+        reopened.close()
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResponseCache(self.db_path, max_bytes=25)
+        cache.put("old", "gpt-4o", "a" * 10)
+        time.sleep(0.01)
+        cache.put("recent", "gpt-4o", "b" * 10)
+        time.sleep(0.01)
+        cache.get("old")
+        time.sleep(0.01)
+        cache.put("new", "gpt-4o", "c" * 10)
+
+        self.assertEqual(cache.get("old"), "a" * 10)
+        self.assertIsNone(cache.get("recent"))
+        self.assertEqual(cache.get("new"), "c" * 10)
+        cache.close()
+
+class TestEngineCache(unittest.TestCase):
+    def test_identical_requests_are_not_sent_twice(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            client, create = create_mock_client()
+            create.return_value = mock.MagicMock(headers={})
+            create.return_value.parse.return_value.choices[0].message.content = "要約"
+            engine = SummaryEngine(client, cache=ResponseCache(Path(temp_dir) / "cache.sqlite3", max_bytes=1024))
+
+            first = engine.run(engine.complete("gpt-4o", MESSAGES, 2000))
+            second = engine.run(engine.complete("gpt-4o", MESSAGES, 2000))
+            engine.run(engine.complete("gpt-4o", MESSAGES, 2000, temperature=0.2))
+            engine.close()
+
+        self.assertEqual(first, second)
+        self.assertEqual(create.await_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_run_log_store.py
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from utils.run_log_store import RunLogStore
+
+HEADERS = ['Release_Date', 'EDINET_code', 'drive_raw_data_file_name', 'drive_summary_file_urls', 'doc_id']
+
+class FakeSpreadsheetService:
+    """append_sheet_data の呼び出しを記録するテスト用サービス"""
+
+    def __init__(self, fail=False):
+        self.appended = []
+        self.fail = fail
+
+    def append_sheet_data(self, spreadsheet_id, sheet_name, rows):
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        self.appended.extend(rows)
+
+class TestRunLogStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = RunLogStore(Path(self.temp_dir.name) / "run_log.sqlite3")
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_import_sheet_rows_recovers_doc_id_from_file_name(self):
+        sheet_data = [
+            HEADERS,
+            ['2024-11-14', 'E00001', 'E00001_S100AAAA_20241114.pdf', 'https://drive/1'],
+            ['2024-11-15', 'E00002', 'E00002_S100BBBB_20241115.pdf', '', 'S100BBBB'],
+        ]
+        self.assertEqual(self.store.import_sheet_rows(sheet_data), 2)
+        # 2回目の取り込みでは重複しない
+        self.assertEqual(self.store.import_sheet_rows(sheet_data), 0)
+
+        self.assertTrue(self.store.is_processed('S100AAAA'))
+        # 要約がない行は再処理の対象
+        self.assertFalse(self.store.is_processed('S100BBBB'))
+        self.assertEqual(self.store.processed_doc_ids(), {'S100AAAA'})
+
+    def test_successful_retry_row_overrides_failed_row(self):
+        sheet_data = [
+            HEADERS,
+            ['2024-11-14', 'E00001', 'E00001_S100A_20241114.pdf', '', 'S100A'],
+            ['2024-11-14', 'E00001', 'E00001_S100A_20241114.pdf', 'https://drive/1', 'S100A'],
+            ['2024-11-14', 'E00001', 'E00001_S100A_20241114.pdf', '', 'S100A'],
+        ]
+        self.store.import_sheet_rows(sheet_data)
+
+        # 失敗した行の後に成功した行があれば処理済み（その後の失敗した行で上書きされない）
+        self.assertTrue(self.store.is_processed('S100A'))
+        self.assertEqual(self.store.find_by_company('E00001')[0]['drive_summary_file_urls'], 'https://drive/1')
+
+    def test_snapshot_does_not_write_to_the_database(self):
+        self.store.record({'doc_id': 'S100LOCAL', 'drive_summary_file_urls': 'https://drive/1'})
+        db_path = Path(self.temp_dir.name) / "run_log.sqlite3"
+
+        snapshot = RunLogStore.snapshot(db_path)
+        snapshot.import_sheet_rows([HEADERS, ['2024-11-14', 'E00001', 'E00001_S100SHEET_20241114.pdf', 'https://drive/2']])
+
+        self.assertEqual(snapshot.processed_doc_ids(), {'S100LOCAL', 'S100SHEET'})
+        self.assertEqual(self.store.processed_doc_ids(), {'S100LOCAL'})
+        snapshot.close()
+        # ファイルがない場合は空のストアを返し、ファイルを作成しない
+        missing = Path(self.temp_dir.name) / "missing.sqlite3"
+        self.assertEqual(RunLogStore.snapshot(missing).processed_doc_ids(), set())
+        self.assertFalse(missing.exists())
+
+    def test_sync_to_sheet_appends_only_pending_rows(self):
+        service = FakeSpreadsheetService()
+        self.store.record({'Release_Date': '2024-11-14', 'EDINET_code': 'E00001',
+                           'drive_summary_file_urls': 'https://drive/1', 'doc_id': 'S100AAAA'})
+
+        self.assertEqual(self.store.sync_to_sheet(service, 'sheet-id', 'log', HEADERS), 1)
+        self.assertEqual(service.appended, [['2024-11-14', 'E00001', '', 'https://drive/1', 'S100AAAA']])
+        self.assertEqual(self.store.sync_to_sheet(service, 'sheet-id', 'log', HEADERS), 0)
+
+    def test_failed_sync_is_retried(self):
+        self.store.record({'EDINET_code': 'E00001', 'doc_id': 'S100AAAA'})
+        self.assertEqual(self.store.sync_to_sheet(FakeSpreadsheetService(fail=True), 'sheet-id', 'log', HEADERS), 0)
+        self.assertEqual(self.store.sync_to_sheet(FakeSpreadsheetService(), 'sheet-id', 'log', HEADERS), 1)
+
+    def test_find_by_company_filters_release_date(self):
+        for doc_id, release_date in [('S1', '2024-05-10'), ('S2', '2024-08-09'), ('S3', '2024-11-14')]:
+            self.store.record({'Release_Date': release_date, 'EDINET_code': 'E00001', 'doc_id': doc_id})
+        self.store.record({'Release_Date': '2024-08-09', 'EDINET_code': 'E00002', 'doc_id': 'S4'})
+
+        records = self.store.find_by_company('E00001', since='2024-07-01', until='2024-12-31')
+        self.assertEqual([record['doc_id'] for record in records], ['S2', 'S3'])
+
+if __name__ == "__main__":
+    unittest.main()
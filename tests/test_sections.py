@@ -0,0 +1,69 @@
+# tests/test_sections.py
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pymupdf
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.extractor import iter_pdf_pages
+from modules.pdfSummary.sections import locate_relevant_pages
+
+def create_pdf(path: Path, headings: list, toc: list = None) -> None:
+    """各ページの上部に見出しを書いたPDFを作成（toc を指定した場合はしおりも設定）"""
+    doc = pymupdf.open()
+    for page_num, heading in enumerate(headings):
+        page = doc.new_page()
+        page.insert_text((72, 72), heading, fontname="japan")
+        page.insert_text((72, 400), f"Page {page_num + 1} body text")
+    if toc:
+        doc.set_toc(toc)
+    doc.save(str(path))
+    doc.close()
+
+class TestSections(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = Path(self.temp_dir.name) / "sample.pdf"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_toc_selects_section_until_next_heading(self):
+        create_pdf(self.pdf_path, ["表紙"] * 10, toc=[
+            [1, "第一部 企業情報", 1],
+            [2, "企業の概況", 2],
+            [2, "経営方針、経営環境及び対処すべき課題等", 4],
+            [2, "設備の状況", 6],
+            [1, "第二部 提出会社の保証会社等の情報", 9],
+        ])
+
+        self.assertEqual(locate_relevant_pages(self.pdf_path), [3, 4, 5])
+
+    def test_headings_are_used_without_toc(self):
+        headings = ["表紙", "目次", "沿革", "セグメント情報", "", "", "", "株式の状況", "役員の状況", "監査報告書"]
+        create_pdf(self.pdf_path, headings)
+
+        self.assertEqual(locate_relevant_pages(self.pdf_path), [3, 4, 5])
+
+    def test_falls_back_to_whole_document(self):
+        create_pdf(self.pdf_path, ["表紙", "株式の状況", "役員の状況", "監査報告書"])
+
+        self.assertIsNone(locate_relevant_pages(self.pdf_path))
+
+    def test_iter_pdf_pages_extracts_only_selected_pages(self):
+        create_pdf(self.pdf_path, [""] * 6)
+
+        pages = list(iter_pdf_pages(self.pdf_path, max_workers=1, pages=[1, 4]))
+
+        self.assertEqual(len(pages), 2)
+        self.assertIn("Page 2 body text", pages[0])
+        self.assertIn("Page 5 body text", pages[1])
+
+if __name__ == "__main__":
+    unittest.main()
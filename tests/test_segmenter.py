@@ -0,0 +1,85 @@
+# tests/test_segmenter.py
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.segmenter import iter_page_sentences, split_sentences
+from tests.helpers import create_tokenizer
+
+class TestSplitSentences(unittest.TestCase):
+    def test_japanese_sentence_endings(self):
+        self.assertEqual(
+            split_sentences("売上高は増加しました。営業利益は？減少！Revenue rose 3.5% in FY2024. Costs fell."),
+            ["売上高は増加しました。", "営業利益は？", "減少！", "Revenue rose 3.5% in FY2024.", "Costs fell."],
+        )
+
+    def test_layout_line_breaks_are_joined(self):
+        self.assertEqual(
+            split_sentences("当社グループの売上高は前年同期と比べ\n増加しました。\n\n経営方針\n・新規出店\n・人材採用の強化"),
+            ["当社グループの売上高は前年同期と比べ増加しました。", "経営方針", "・新規出店", "・人材採用の強化"],
+        )
+
+    def test_closing_brackets_stay_with_the_sentence(self):
+        self.assertEqual(
+            split_sentences("「増収となりました。」と述べた。（前期は減収でした。）"),
+            ["「増収となりました。」", "と述べた。", "（前期は減収でした。）"],
+        )
+
+    def test_repeated_terminators_end_one_sentence(self):
+        self.assertEqual(split_sentences("売上高は3.5%増加！！次に？!"), ["売上高は3.5%増加！！", "次に？!"])
+
+    def test_numbered_heading_is_not_a_sentence_end(self):
+        self.assertEqual(
+            split_sentences("次に\n・セグメントA\n1. 概要\n2. Sales rose. Costs fell."),
+            ["次に", "・セグメントA", "1. 概要", "2. Sales rose.", "Costs fell."],
+        )
+
+    def test_sentence_ending_with_bracket_is_not_carried(self):
+        self.assertEqual(list(iter_page_sentences(["「増収です。」", "次のページ。"])), [["「増収です。」"], ["次のページ。"]])
+
+    def test_sentence_carried_across_pages(self):
+        pages = ["前期の業績は。当期の売上高は前年同期と比べ", "増加しました。以上"]
+
+        self.assertEqual(
+            list(iter_page_sentences(pages)),
+            [["前期の業績は。"], ["当期の売上高は前年同期と比べ増加しました。"], ["以上"]],
+        )
+
+class TestTokenizerChunks(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = create_tokenizer(max_chunk_tokens=10, model="gpt-4o")
+
+    def test_chunks_respect_max_tokens(self):
+        pages = ["あいうえお。かきくけこ。さしすせそ。", "たちつてと。" + "な" * 25]
+
+        chunks = list(self.tokenizer.iter_chunks(pages))
+
+        self.assertTrue(all(len(chunk.replace(" ", "")) <= 10 for chunk in chunks))
+        self.assertEqual("".join(chunks).replace(" ", ""), "".join(pages))
+
+    def test_tokens_are_counted_in_batches(self):
+        encoding = self.tokenizer.encoding
+        with mock.patch.object(encoding, "encode", wraps=encoding.encode) as encode:
+            self.tokenizer.split_text_into_chunks("あいう。えお。かき。くけこ。")
+
+        encode.assert_not_called()
+
+    def test_semantic_mode_uses_sentence_embeddings(self):
+        class TopicService:
+            def embed(self, sentences):
+                return [[1.0, 0.0] if sentence.startswith("売上") else [0.0, 1.0] for sentence in sentences]
+
+        self.tokenizer.mode = "semantic"
+        with mock.patch("modules.pdfSummary.tokenizer.get_embedding_service", return_value=TopicService()):
+            chunks = list(self.tokenizer.iter_chunks(["売上増。売上減。人材難。人材増。"]))
+
+        self.assertEqual(chunks, ["売上増。 売上減。", "人材難。 人材増。"])
+
+if __name__ == "__main__":
+    unittest.main()
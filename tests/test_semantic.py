@@ -0,0 +1,68 @@
+# tests/test_semantic.py
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.semantic import adjacent_similarities, semantic_chunks
+
+# 2つの話題（x軸方向とy軸方向）の文のエンベディング
+TOPIC_A = [1.0, 0.1, 0.0]
+TOPIC_B = [0.0, 0.1, 1.0]
+
+class TestAdjacentSimilarities(unittest.TestCase):
+    def test_matches_pairwise_cosine(self):
+        embeddings = np.random.default_rng(0).normal(size=(6, 4))
+
+        similarities = adjacent_similarities(embeddings, window=1)
+
+        expected = [
+            embeddings[i] @ embeddings[i + 1] / (np.linalg.norm(embeddings[i]) * np.linalg.norm(embeddings[i + 1]))
+            for i in range(5)
+        ]
+        np.testing.assert_allclose(similarities, expected, rtol=1e-5)
+
+    def test_window_averages_neighbours(self):
+        embeddings = [TOPIC_A, TOPIC_A, TOPIC_A, TOPIC_B, TOPIC_B, TOPIC_B]
+
+        similarities = adjacent_similarities(embeddings, window=2)
+
+        self.assertEqual(int(np.argmin(similarities)), 2)
+        self.assertEqual(len(adjacent_similarities([TOPIC_A])), 0)
+
+class TestSemanticChunks(unittest.TestCase):
+    def test_boundaries_follow_topic_shift(self):
+        sentences = ["a1", "a2", "a3", "b1", "b2", "b3"]
+        similarities = adjacent_similarities([TOPIC_A] * 3 + [TOPIC_B] * 3, window=1)
+
+        chunks = semantic_chunks(sentences, [1] * 6, similarities, max_tokens=10, boundary_percentile=0)
+
+        self.assertEqual(chunks, ["a1 a2 a3", "b1 b2 b3"])
+
+    def test_max_tokens_is_respected(self):
+        sentences = [f"s{i}" for i in range(10)]
+        embeddings = [TOPIC_A] * 4 + [TOPIC_B] * 6
+        similarities = adjacent_similarities(embeddings, window=1)
+
+        chunks = semantic_chunks(sentences, [3] * 10, similarities, max_tokens=12, boundary_percentile=0, min_tokens=3)
+
+        self.assertEqual(chunks[0], "s0 s1 s2 s3")
+        self.assertTrue(all(len(chunk.split()) * 3 <= 12 for chunk in chunks))
+        self.assertEqual(" ".join(chunks).split(), sentences)
+
+    def test_overflow_can_split_before_the_incoming_sentence(self):
+        # b|c と d|e は上限を超える文との境界で、チャンク内の境界（0.91）より類似度が低い
+        similarities = np.array([0.91, 0.76, 0.91, 0.74, 0.55])
+
+        chunks = semantic_chunks(list("abcdef"), [5] * 6, similarities, max_tokens=12)
+
+        self.assertEqual(chunks, ["a b", "c d", "e", "f"])
+
+if __name__ == "__main__":
+    unittest.main()
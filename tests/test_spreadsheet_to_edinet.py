@@ -0,0 +1,80 @@
+# tests/test_spreadsheet_to_edinet.py
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.spreadsheet_to_edinet import LOG_HEADERS, process_spreadsheet_data
+from tests.helpers import FakeContext, config_values, edinet_document
+
+CONFIG = {
+    ("DATE_RANGE", "start_date"): "2024-11-01",
+    ("DATE_RANGE", "end_date"): "2024-11-30",
+    ("DRIVE", "parent_folder_id"): "parent",
+    ("OPENAI", "pipeline_documents"): 1,
+    ("SLACK", "channel_id"): "channel",
+}
+
+def log_row(doc_id, summary_urls):
+    """log シートの1行（LOG_HEADERS の順）"""
+    record = {
+        'Release_Date': "2024-11-14",
+        'EDINET_code': "E00001",
+        'drive_raw_data_file_name': f"E00001_{doc_id}_20241114.pdf",
+        'drive_summary_file_urls': summary_urls,
+        'doc_id': doc_id,
+    }
+    return [record.get(header, "") for header in LOG_HEADERS]
+
+class TestProcessSpreadsheetData(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        log_rows = [
+            LOG_HEADERS,
+            log_row("S100DONE", "https://drive.google.com/file/d/summary/view"),
+            # 前回の実行で要約に失敗した文書（要約の URL がない）
+            log_row("S100FAIL", ""),
+        ]
+        documents = [edinet_document("S100DONE"), edinet_document("S100FAIL")]
+        self.context = FakeContext(directory.name, ["E00001"], documents, log_rows)
+        self.addCleanup(self.context.close)
+
+        patcher = mock.patch("modules.spreadsheet_to_edinet.env")
+        env = patcher.start()
+        self.addCleanup(patcher.stop)
+        env.get_config_value.side_effect = config_values(CONFIG)
+
+        # ダウンロードは失敗させ、要約は開始しない
+        self.context.drive_handler.download_pdf_from_drive.return_value = None
+
+    def test_processed_documents_are_skipped_before_any_work(self):
+        process_spreadsheet_data(None, context=self.context)
+
+        drive_handler = self.context.drive_handler
+        edinet_operations = self.context.edinet_operations
+        edinet_operations.fetch_document_data.assert_called_once_with("S100FAIL", "120")
+        drive_handler.get_or_create_folder.assert_called_once_with(folder_name="E00001", parent_folder_id="parent")
+        drive_handler.upload_file.assert_called_once()
+        self.assertEqual(drive_handler.upload_file.call_args.kwargs["file_name"], "E00001_S100FAIL_20241114.pdf")
+        drive_handler.download_pdf_from_drive.assert_called_once_with("file-E00001_S100FAIL_20241114.pdf")
+        # 処理済みの文書はレジャーにも記録されない
+        self.assertEqual([entry["doc_id"] for entry in self.context.ledger.document_totals()], ["S100FAIL"])
+
+    def test_failed_documents_are_retried_and_logged_again(self):
+        process_spreadsheet_data(None, context=self.context)
+
+        appended = self.context.spreadsheet_service.appended
+        self.assertEqual([row[LOG_HEADERS.index('doc_id')] for row in appended], ["S100FAIL"])
+        self.assertFalse(self.context.run_log_store.is_processed("S100FAIL"))
+        # 要約がないため Slack には通知しない
+        self.assertNotIn("slack_notifier", self.context.touched)
+
+if __name__ == "__main__":
+    unittest.main()
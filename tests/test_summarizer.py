@@ -0,0 +1,140 @@
+# tests/test_summarizer.py
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.llm_engine import SummaryEngine
+from modules.pdfSummary.tokenizer import Tokenizer
+from tests.helpers import create_summarizer
+
+class RecordingClient:
+    """同時に処理中の呼び出し数と入力を記録する、AsyncOpenAI 互換のテスト用クライアント"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.inputs = []
+        self.closed = False
+        self.chat = mock.MagicMock()
+        self.chat.completions.with_raw_response.create = self.create
+
+    async def create(self, model, messages, max_tokens, temperature):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.inputs.append(messages[-1]["content"])
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        raw_response = mock.MagicMock(headers={})
+        raw_response.parse.return_value.choices[0].message.content = "要" * 8
+        return raw_response
+
+    async def close(self):
+        self.closed = True
+
+class TestMapReduce(unittest.TestCase):
+    def tearDown(self):
+        self.engine.close()
+        self.assertTrue(self.engine.client.closed)
+
+    def create_summarizer(self, client, context_window, map_parallelism, max_concurrency=8, mode="length"):
+        self.engine = SummaryEngine(client, max_concurrency)
+        return create_summarizer(self.engine, context_window, map_parallelism, mode=mode)
+
+    def test_chunks_are_summarized_concurrently(self):
+        client = RecordingClient()
+        # 本文の上限は 60 - 6 - 10 = 44 トークン
+        summarizer, tokenizer = self.create_summarizer(client, context_window=60, map_parallelism=4)
+        pages = [character * 39 + "。" for character in "あいうえ"]
+
+        summarizer.summarize_pages(pages, tokenizer)
+
+        self.assertEqual(len(client.inputs), 5)
+        self.assertEqual(client.max_in_flight, 4)
+        self.assertEqual(client.inputs[-1], "\n\n".join(["要" * 8] * 4))
+
+    def test_configured_chunking_mode_is_used_for_map_reduce(self):
+        client = RecordingClient(delay=0)
+        summarizer, tokenizer = self.create_summarizer(client, context_window=60, map_parallelism=4, mode="semantic")
+        pages = [character * 39 + "。" for character in "あいうえ"]
+
+        # エンベディングモデルを読み込まないよう、区切りは長さのみで決める
+        with mock.patch.object(Tokenizer, "_semantic_chunks", autospec=True,
+                               side_effect=lambda self, sentences: list(self._pack(sentences))) as semantic_chunks:
+            summarizer.summarize_pages(pages, tokenizer)
+
+        semantic_chunks.assert_called_once()
+        self.assertEqual(semantic_chunks.call_args.args[0].max_chunk_tokens, 44)
+        self.assertEqual(len(client.inputs), 5)
+
+    def test_pages_are_streamed_into_the_map_step(self):
+        client = RecordingClient(delay=0)
+        summarizer, tokenizer = self.create_summarizer(client, context_window=60, map_parallelism=1)
+        pulled = []
+        pulled_at_first_call = []
+        create = client.create
+
+        async def record_first_call(**kwargs):
+            pulled_at_first_call.append(len(pulled))
+            return await create(**kwargs)
+
+        client.chat.completions.with_raw_response.create = record_first_call
+
+        def pages():
+            for character in "あいうえおかきくけこ":
+                pulled.append(character)
+                yield character * 19 + "。"
+
+        summarizer.summarize_pages(pages(), tokenizer)
+
+        # 上限（44 トークン）を超えた時点で読み込みを止め、残りのページは要約しながら読み込む
+        self.assertEqual(len(pulled), 10)
+        self.assertLess(pulled_at_first_call[0], 10)
+        self.assertEqual(client.inputs[0], "あ" * 19 + "。 " + "い" * 19 + "。")
+
+    def test_reduce_is_hierarchical_when_summaries_do_not_fit(self):
+        client = RecordingClient(delay=0)
+        # 本文の上限は 36 - 6 - 10 = 20 トークン: 8 トークンの部分要約は2件ずつしか収まらない
+        summarizer, tokenizer = self.create_summarizer(client, context_window=36, map_parallelism=2)
+        pages = [character * 19 + "。" for character in "あいうえ"]
+
+        summarizer.summarize_pages(pages, tokenizer)
+
+        # map 4回 → 2件ずつ再要約 2回 → 最終 1回
+        self.assertEqual(len(client.inputs), 7)
+        self.assertEqual(client.inputs[-1], "\n\n".join(["要" * 8] * 2))
+
+    def test_process_wide_limit_applies_across_documents(self):
+        client = RecordingClient()
+        summarizer, tokenizer = self.create_summarizer(client, context_window=60, map_parallelism=4, max_concurrency=3)
+        documents = [[character * 39 + "。" for character in "あいうえ"], [character * 39 + "。" for character in "かきくけ"]]
+
+        async def summarize_all():
+            return await asyncio.gather(*(summarizer.asummarize_pages(pages, tokenizer) for pages in documents))
+
+        summaries = self.engine.run(summarize_all())
+
+        self.assertEqual(len(summaries), 2)
+        self.assertEqual(len(client.inputs), 10)
+        self.assertEqual(client.max_in_flight, 3)
+
+    def test_submitted_documents_are_summarized_concurrently(self):
+        client = RecordingClient()
+        summarizer, tokenizer = self.create_summarizer(client, context_window=60, map_parallelism=1)
+
+        # 呼び出し元のスレッドは完了を待たずに次の文書を開始する
+        futures = [self.engine.submit(summarizer.asummarize_pages([character * 9 + "。"], tokenizer))
+                   for character in "あい"]
+
+        self.assertEqual([future.result() for future in futures], ["要" * 8] * 2)
+        self.assertEqual(client.max_in_flight, 2)
+
+if __name__ == "__main__":
+    unittest.main()
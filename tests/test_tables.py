@@ -0,0 +1,93 @@
+# tests/test_tables.py
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+import pymupdf
+
+# プロジェクトのルートディレクトリを計算し、`src` を `sys.path` に追加
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from modules.pdfSummary.tables import extract_financial_tables, format_tables, page_text_without_tables
+
+def draw_table(page, rows: list, top: float = 100) -> None:
+    """罫線付きの表をページに描画"""
+    width, height = 100, 20
+    for row_index, row in enumerate(rows):
+        for col_index, cell in enumerate(row):
+            page.insert_text((76 + width * col_index, top + height * row_index + 14), cell, fontname="japan", fontsize=10)
+    for row_index in range(len(rows) + 1):
+        page.draw_line((72, top + height * row_index), (72 + width * len(rows[0]), top + height * row_index))
+    for col_index in range(len(rows[0]) + 1):
+        page.draw_line((72 + width * col_index, top), (72 + width * col_index, top + height * len(rows)))
+
+class TestTables(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = Path(self.temp_dir.name) / "sample.pdf"
+        doc = pymupdf.open()
+        draw_table(doc.new_page(), [["項目", "従業員数", "店舗数"], ["合計", "120", "8"]])
+        page = doc.new_page()
+        page.insert_text((72, 80), "当期の業績は次のとおりです。", fontname="japan", fontsize=10)
+        draw_table(page, [
+            ["科目", "当期", "前期", "増減率"],
+            ["売上高", "3,118", "2,905", "7.3%"],
+            ["営業利益", "417", "651", "-35.9%"],
+        ])
+        page.insert_text((72, 200), "増収減益となりました。", fontname="japan", fontsize=10)
+        doc.save(str(self.pdf_path))
+        doc.close()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_extracts_only_financial_tables(self):
+        tables = extract_financial_tables(self.pdf_path)
+
+        self.assertEqual(len(tables), 1)
+        self.assertEqual(tables[0].attrs["page"], 2)
+        self.assertEqual(list(tables[0].columns), ["科目", "当期", "前期", "増減率"])
+        self.assertEqual(list(tables[0].iloc[1]), ["営業利益", "417", "651", "-35.9%"])
+
+    def test_format_tables_is_compact(self):
+        text = format_tables(extract_financial_tables(self.pdf_path))
+
+        self.assertEqual(text.splitlines(), [
+            "[表1 p.2]",
+            "科目|当期|前期|増減率",
+            "売上高|3,118|2,905|7.3%",
+            "営業利益|417|651|-35.9%",
+        ])
+
+    def test_placeholder_columns_are_not_printed(self):
+        partial = pd.DataFrame([["売上高", "3,118", "2,905"]], columns=["科目", "Col1", "Col2"])
+        partial.attrs["page"] = 3
+        untitled = pd.DataFrame([["営業利益", "417"]], columns=["Col0", "Col1"])
+        untitled.attrs["page"] = 4
+
+        self.assertEqual(format_tables([partial, untitled]).splitlines(), [
+            "[表1 p.3]",
+            "科目||",
+            "売上高|3,118|2,905",
+            "",
+            "[表2 p.4]",
+            "営業利益|417",
+        ])
+
+    def test_page_text_replaces_tables_with_labels(self):
+        table = extract_financial_tables(self.pdf_path)[0]
+
+        text = page_text_without_tables(self.pdf_path, 1, [("[表1 p.2]", table.attrs["bbox"])])
+
+        self.assertEqual(text.splitlines(), ["当期の業績は次のとおりです。", "[表1 p.2]", "増収減益となりました。"])
+
+    def test_pages_limit_the_scan(self):
+        self.assertEqual(extract_financial_tables(self.pdf_path, pages=[0]), [])
+        self.assertEqual(format_tables([]), "")
+
+if __name__ == "__main__":
+    unittest.main()